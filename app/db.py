@@ -1,8 +1,21 @@
+import asyncio
 import time
 import random
-from typing import Dict, Any, Optional, List
+from collections import Counter
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Optional, List, Tuple
 from app.models.models import SurveyQuestion
-from app.utils.surveys import get_survey_questions, get_survey_info, SURVEYS
+from app.utils.surveys import SURVEYS
+from app.storage.engine import InMemoryStorageEngine, StorageEngine, create_storage_engine
+from app.storage.response_store import ResponseStore
+from app.storage.sqlite import run_blocking_call
+from app.storage.session_store import (
+    InMemorySessionStore,
+    SessionStore,
+    StateConflictError,
+)
 
 mock_db = {
     "conversations": {},
@@ -10,12 +23,28 @@ mock_db = {
         "1": {"name": "John Doe", "email": "john.doe@example.com"},
         "2": {"name": "Jane Smith", "email": "jane.smith@example.com"},
     },
-    "survey_responses": []
+    "survey_responses": ResponseStore()
 }
 
+
+def default_engine() -> StorageEngine:
+    """Engine over the process-local `mock_db` and `SURVEYS` collections."""
+    return InMemoryStorageEngine(mock_db, SURVEYS, InMemorySessionStore(mock_db["conversations"]))
+
+
 class MockRPCDatabase:
     """Mock database with RPC-like behavior."""
 
+    def __init__(self, sessions: Optional[SessionStore] = None, engine: Optional[StorageEngine] = None):
+        """
+        Initialize the mock.
+
+        :param sessions: Store holding conversation state and leases (the engine's by default).
+        :param engine: Storage engine holding the data (process memory by default).
+        """
+        self.engine = engine if engine is not None else default_engine()
+        self.sessions = sessions if sessions is not None else self.engine.sessions
+
     @staticmethod
     def simulate_rpc_call():
         """Simulate network latency and possible failures."""
@@ -26,56 +55,478 @@ class MockRPCDatabase:
     def get_conversation_state(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve the state of a conversation."""
         self.simulate_rpc_call()
-        return mock_db["conversations"].get(conversation_id)
+        return self.sessions.get(conversation_id)
 
     def save_conversation_state(self, conversation_id: str, state: Dict[str, Any]) -> None:
         """Save or update the state of a conversation."""
         self.simulate_rpc_call()
-        mock_db["conversations"][conversation_id] = state
+        self.sessions.put(conversation_id, state)
+
+    def save_conversation_delta(self, conversation_id: str, delta: Dict[str, Any], expected_version: int) -> int:
+        """Apply an incremental conversation update and return the new version."""
+        self.simulate_rpc_call()
+        return self.sessions.apply_delta(conversation_id, delta, expected_version)
+
+    def acquire_conversation_lease(self, conversation_id: str, owner: str, ttl: float) -> bool:
+        """Take ownership of a conversation unless another session holds a live lease."""
+        self.simulate_rpc_call()
+        return self.sessions.acquire_lease(conversation_id, owner, ttl)
+
+    def renew_conversation_lease(self, conversation_id: str, owner: str, ttl: float) -> bool:
+        """Extend a conversation lease; returns False if it was lost."""
+        self.simulate_rpc_call()
+        return self.sessions.renew_lease(conversation_id, owner, ttl)
+
+    def release_conversation_lease(self, conversation_id: str, owner: str) -> None:
+        """Release a conversation lease held by `owner`."""
+        self.simulate_rpc_call()
+        self.sessions.release_lease(conversation_id, owner)
 
     def get_customer_info(self, customer_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve customer information."""
         self.simulate_rpc_call()
-        return mock_db["customers"].get(customer_id)
+        return self.engine.get_customer(customer_id)
 
     def save_survey_response(self, response: Dict[str, Any]) -> None:
         """Save a survey response."""
         self.simulate_rpc_call()
-        mock_db["survey_responses"].append(response)
+        self.engine.append_responses([response])
+
+    def save_survey_responses(self, responses: List[Dict[str, Any]]) -> None:
+        """Save a batch of survey responses in a single call."""
+        self.simulate_rpc_call()
+        self.engine.append_responses(responses)
 
     def get_survey_questions(self, survey_id: str) -> Optional[List[SurveyQuestion]]:
         """Retrieve questions for a specific survey."""
         self.simulate_rpc_call()
-        return get_survey_questions(survey_id)  
+        return self.engine.get_survey_questions(survey_id)
 
     def get_survey_info(self, survey_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve survey information."""
         self.simulate_rpc_call()
-        return get_survey_info(survey_id)  
-    
+        return self.engine.get_survey(survey_id)
+
     def get_all_survey_responses(self) -> List[Dict[str, Any]]:
         """Retrieve all survey responses."""
         self.simulate_rpc_call()
-        return mock_db["survey_responses"]
-    
+        return list(self.engine.iter_responses())
+
+    def query_survey_responses(
+        self, filters: Dict[str, Any], cursor: Optional[int], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Retrieve one filtered page of survey responses and the next page's cursor."""
+        self.simulate_rpc_call()
+        return self.engine.query_responses(filters, cursor, limit)
+
+    def scan_survey_responses(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Retrieve the responses stored from `cursor` on, with their sequence numbers, and the next cursor."""
+        self.simulate_rpc_call()
+        return self.engine.scan_responses(cursor, limit)
+
+    def get_answered_questions(self, survey_id: str, customer_id: str) -> List[Tuple[int, str]]:
+        """Retrieve the (question id, answer) pairs a customer has recorded in a survey."""
+        self.simulate_rpc_call()
+        return self.engine.answered_questions(survey_id, customer_id)
+
     def get_all_surveys(self) -> List[Dict[str, Any]]:
         """Retrieve all survey."""
         self.simulate_rpc_call()
-        return SURVEYS.values()
+        return self.engine.list_surveys()
+
+    def get_surveys_info(self, survey_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve the existing surveys among `survey_ids` in a single call."""
+        self.simulate_rpc_call()
+        return self.engine.get_surveys(survey_ids)
+
+    def save_surveys(self, surveys: Dict[str, Dict[str, Any]]) -> None:
+        """Create or replace several surveys in a single transaction."""
+        self.simulate_rpc_call()
+        self.engine.put_surveys(surveys)
 
     def create_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
         """Create a new survey."""
         self.simulate_rpc_call()
-        SURVEYS[survey_id] = survey_data
+        self.engine.put_survey(survey_id, survey_data)
 
     def update_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
         """Update an existing survey."""
         self.simulate_rpc_call()
-        SURVEYS[survey_id] = survey_data
+        self.engine.put_survey(survey_id, survey_data)
 
     def delete_survey(self, survey_id: str) -> None:
         """Delete a survey."""
         self.simulate_rpc_call()
-        if survey_id in SURVEYS:
-            del SURVEYS[survey_id]
-            
\ No newline at end of file
+        self.engine.delete_survey(survey_id)
+
+
+class AsyncSurveyStore(ABC):
+    """Awaitable storage interface used by the service layer."""
+
+    @abstractmethod
+    async def get_conversation_state(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the state of a conversation."""
+
+    @abstractmethod
+    async def save_conversation_state(self, conversation_id: str, state: Dict[str, Any]) -> None:
+        """Save or update the state of a conversation."""
+
+    @abstractmethod
+    async def save_conversation_delta(self, conversation_id: str, delta: Dict[str, Any], expected_version: int) -> int:
+        """Apply an incremental conversation update and return the new version."""
+
+    @abstractmethod
+    async def acquire_conversation_lease(self, conversation_id: str, owner: str, ttl: float) -> bool:
+        """Take ownership of a conversation unless another session holds a live lease."""
+
+    @abstractmethod
+    async def renew_conversation_lease(self, conversation_id: str, owner: str, ttl: float) -> bool:
+        """Extend a conversation lease; returns False if it was lost."""
+
+    @abstractmethod
+    async def release_conversation_lease(self, conversation_id: str, owner: str) -> None:
+        """Release a conversation lease held by `owner`."""
+
+    @abstractmethod
+    async def get_customer_info(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve customer information."""
+
+    @abstractmethod
+    async def save_survey_response(self, response: Dict[str, Any]) -> None:
+        """Save a survey response."""
+
+    @abstractmethod
+    async def save_survey_responses(self, responses: List[Dict[str, Any]]) -> None:
+        """Save a batch of survey responses in a single call."""
+
+    @abstractmethod
+    async def get_survey_questions(self, survey_id: str) -> Optional[List[SurveyQuestion]]:
+        """Retrieve questions for a specific survey."""
+
+    @abstractmethod
+    async def get_survey_info(self, survey_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve survey information."""
+
+    @abstractmethod
+    async def get_all_survey_responses(self) -> List[Dict[str, Any]]:
+        """Retrieve all survey responses."""
+
+    @abstractmethod
+    async def query_survey_responses(
+        self, filters: Dict[str, Any], cursor: Optional[int], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Retrieve one filtered page of survey responses and the next page's cursor."""
+
+    @abstractmethod
+    async def scan_survey_responses(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Retrieve the responses stored from `cursor` on, with their sequence numbers, and the next cursor."""
+
+    @abstractmethod
+    async def get_answered_questions(self, survey_id: str, customer_id: str) -> List[Tuple[int, str]]:
+        """Retrieve the (question id, answer) pairs a customer has recorded in a survey, in answer order."""
+
+    @abstractmethod
+    async def get_all_surveys(self) -> List[Dict[str, Any]]:
+        """Retrieve all surveys."""
+
+    @abstractmethod
+    async def get_surveys_info(self, survey_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve the existing surveys among `survey_ids` in a single call."""
+
+    @abstractmethod
+    async def save_surveys(self, surveys: Dict[str, Dict[str, Any]]) -> None:
+        """Create or replace several surveys in a single transaction."""
+
+    @abstractmethod
+    async def create_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        """Create a new survey."""
+
+    @abstractmethod
+    async def update_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        """Update an existing survey."""
+
+    @abstractmethod
+    async def delete_survey(self, survey_id: str) -> None:
+        """Delete a survey."""
+
+
+class AsyncMockRPCDatabase(AsyncSurveyStore):
+    """Mock database with RPC-like behavior that never blocks the event loop."""
+
+    def __init__(
+        self,
+        latency: Tuple[float, float] = (0.1, 0.5),
+        failure_rate: float = 0.1,
+        sessions: Optional[SessionStore] = None,
+        seed: Optional[int] = None,
+        engine: Optional[StorageEngine] = None,
+    ):
+        """
+        Initialize the mock with its simulated network profile.
+
+        :param latency: Range (in seconds) of the simulated call latency.
+        :param failure_rate: Probability of a call failing with a ConnectionError.
+        :param sessions: Store holding conversation state and leases (the engine's by default).
+        :param seed: Seed of the latency/failure generator, for reproducible runs.
+        :param engine: Storage engine holding the data (process memory by default).
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rpc_counts: Counter = Counter()
+        self._random = random.Random(seed)
+        self.engine = engine if engine is not None else default_engine()
+        self.sessions = sessions if sessions is not None else self.engine.sessions
+
+    async def _session_call(self, func, *args):
+        """Call the session store, off the event loop if it blocks (e.g. SQLite)."""
+        if self.sessions.blocking:
+            return await run_blocking_call(func, *args)
+        return func(*args)
+
+    async def _engine_call(self, func, *args):
+        """Call the storage engine, off the event loop if it blocks (e.g. SQLite)."""
+        if self.engine.blocking:
+            return await run_blocking_call(func, *args)
+        return func(*args)
+
+    def configure(
+        self,
+        latency: Optional[Tuple[float, float]] = None,
+        failure_rate: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        """Change the simulated network profile and reset the RPC counters."""
+        if latency is not None:
+            self.latency = latency
+        if failure_rate is not None:
+            self.failure_rate = failure_rate
+        if seed is not None:
+            self._random.seed(seed)
+        self.rpc_counts.clear()
+
+    async def simulate_rpc_call(self, operation: str = "rpc"):
+        """Simulate network latency and possible failures."""
+        self.rpc_counts[operation] += 1
+        await asyncio.sleep(self._random.uniform(*self.latency))
+        if self._random.random() < self.failure_rate:
+            raise ConnectionError("RPC call failed")
+
+    async def get_conversation_state(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the state of a conversation."""
+        await self.simulate_rpc_call("get_conversation_state")
+        return await self._session_call(self.sessions.get, conversation_id)
+
+    async def save_conversation_state(self, conversation_id: str, state: Dict[str, Any]) -> None:
+        """Save or update the state of a conversation."""
+        await self.simulate_rpc_call("save_conversation_state")
+        await self._session_call(self.sessions.put, conversation_id, state)
+
+    async def save_conversation_delta(self, conversation_id: str, delta: Dict[str, Any], expected_version: int) -> int:
+        """Apply an incremental conversation update and return the new version."""
+        await self.simulate_rpc_call("save_conversation_delta")
+        return await self._session_call(self.sessions.apply_delta, conversation_id, delta, expected_version)
+
+    async def acquire_conversation_lease(self, conversation_id: str, owner: str, ttl: float) -> bool:
+        """Take ownership of a conversation unless another session holds a live lease."""
+        await self.simulate_rpc_call("acquire_conversation_lease")
+        return await self._session_call(self.sessions.acquire_lease, conversation_id, owner, ttl)
+
+    async def renew_conversation_lease(self, conversation_id: str, owner: str, ttl: float) -> bool:
+        """Extend a conversation lease; returns False if it was lost."""
+        await self.simulate_rpc_call("renew_conversation_lease")
+        return await self._session_call(self.sessions.renew_lease, conversation_id, owner, ttl)
+
+    async def release_conversation_lease(self, conversation_id: str, owner: str) -> None:
+        """Release a conversation lease held by `owner`."""
+        await self.simulate_rpc_call("release_conversation_lease")
+        await self._session_call(self.sessions.release_lease, conversation_id, owner)
+
+    async def get_customer_info(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve customer information."""
+        await self.simulate_rpc_call("get_customer_info")
+        return await self._engine_call(self.engine.get_customer, customer_id)
+
+    async def save_survey_response(self, response: Dict[str, Any]) -> None:
+        """Save a survey response."""
+        await self.simulate_rpc_call("save_survey_response")
+        await self._engine_call(self.engine.append_responses, [response])
+
+    async def save_survey_responses(self, responses: List[Dict[str, Any]]) -> None:
+        """Save a batch of survey responses in a single call."""
+        await self.simulate_rpc_call("save_survey_responses")
+        await self._engine_call(self.engine.append_responses, responses)
+
+    async def get_survey_questions(self, survey_id: str) -> Optional[List[SurveyQuestion]]:
+        """Retrieve questions for a specific survey."""
+        await self.simulate_rpc_call("get_survey_questions")
+        return await self._engine_call(self.engine.get_survey_questions, survey_id)
+
+    async def get_survey_info(self, survey_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve survey information."""
+        await self.simulate_rpc_call("get_survey_info")
+        return await self._engine_call(self.engine.get_survey, survey_id)
+
+    async def get_all_survey_responses(self) -> List[Dict[str, Any]]:
+        """Retrieve all survey responses."""
+        await self.simulate_rpc_call("get_all_survey_responses")
+        return await self._engine_call(lambda: list(self.engine.iter_responses()))
+
+    async def query_survey_responses(
+        self, filters: Dict[str, Any], cursor: Optional[int], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Retrieve one filtered page of survey responses and the next page's cursor."""
+        await self.simulate_rpc_call("query_survey_responses")
+        return await self._engine_call(self.engine.query_responses, filters, cursor, limit)
+
+    async def scan_survey_responses(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Retrieve the responses stored from `cursor` on, with their sequence numbers, and the next cursor."""
+        await self.simulate_rpc_call("scan_survey_responses")
+        return await self._engine_call(self.engine.scan_responses, cursor, limit)
+
+    async def get_answered_questions(self, survey_id: str, customer_id: str) -> List[Tuple[int, str]]:
+        """Retrieve the (question id, answer) pairs a customer has recorded in a survey."""
+        await self.simulate_rpc_call("get_answered_questions")
+        return await self._engine_call(self.engine.answered_questions, survey_id, customer_id)
+
+    async def get_all_surveys(self) -> List[Dict[str, Any]]:
+        """Retrieve all surveys."""
+        await self.simulate_rpc_call("get_all_surveys")
+        return await self._engine_call(self.engine.list_surveys)
+
+    async def get_surveys_info(self, survey_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve the existing surveys among `survey_ids` in a single call."""
+        await self.simulate_rpc_call("get_surveys_info")
+        return await self._engine_call(self.engine.get_surveys, survey_ids)
+
+    async def save_surveys(self, surveys: Dict[str, Dict[str, Any]]) -> None:
+        """Create or replace several surveys in a single transaction."""
+        await self.simulate_rpc_call("save_surveys")
+        await self._engine_call(self.engine.put_surveys, surveys)
+
+    async def create_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        """Create a new survey."""
+        await self.simulate_rpc_call("create_survey")
+        await self._engine_call(self.engine.put_survey, survey_id, survey_data)
+
+    async def update_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        """Update an existing survey."""
+        await self.simulate_rpc_call("update_survey")
+        await self._engine_call(self.engine.put_survey, survey_id, survey_data)
+
+    async def delete_survey(self, survey_id: str) -> None:
+        """Delete a survey."""
+        await self.simulate_rpc_call("delete_survey")
+        await self._engine_call(self.engine.delete_survey, survey_id)
+
+
+class ThreadPoolSurveyStore(AsyncSurveyStore):
+    """Adapter exposing a blocking backend (e.g. MockRPCDatabase) through the async interface."""
+
+    def __init__(self, backend: Any, max_workers: Optional[int] = None):
+        """
+        Wrap a synchronous backend.
+
+        :param backend: Object implementing the MockRPCDatabase method set.
+        :param max_workers: Size of the thread pool running the blocking calls.
+        """
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="survey-store")
+
+    async def _run(self, func, *args):
+        """Run a blocking backend call in the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def get_conversation_state(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the state of a conversation."""
+        return await self._run(self.backend.get_conversation_state, conversation_id)
+
+    async def save_conversation_state(self, conversation_id: str, state: Dict[str, Any]) -> None:
+        """Save or update the state of a conversation."""
+        await self._run(self.backend.save_conversation_state, conversation_id, state)
+
+    async def save_conversation_delta(self, conversation_id: str, delta: Dict[str, Any], expected_version: int) -> int:
+        """Apply an incremental conversation update and return the new version."""
+        return await self._run(self.backend.save_conversation_delta, conversation_id, delta, expected_version)
+
+    async def acquire_conversation_lease(self, conversation_id: str, owner: str, ttl: float) -> bool:
+        """Take ownership of a conversation unless another session holds a live lease."""
+        return await self._run(self.backend.acquire_conversation_lease, conversation_id, owner, ttl)
+
+    async def renew_conversation_lease(self, conversation_id: str, owner: str, ttl: float) -> bool:
+        """Extend a conversation lease; returns False if it was lost."""
+        return await self._run(self.backend.renew_conversation_lease, conversation_id, owner, ttl)
+
+    async def release_conversation_lease(self, conversation_id: str, owner: str) -> None:
+        """Release a conversation lease held by `owner`."""
+        await self._run(self.backend.release_conversation_lease, conversation_id, owner)
+
+    async def get_customer_info(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve customer information."""
+        return await self._run(self.backend.get_customer_info, customer_id)
+
+    async def save_survey_response(self, response: Dict[str, Any]) -> None:
+        """Save a survey response."""
+        await self._run(self.backend.save_survey_response, response)
+
+    async def save_survey_responses(self, responses: List[Dict[str, Any]]) -> None:
+        """Save a batch of survey responses in a single call."""
+        if hasattr(self.backend, "save_survey_responses"):
+            await self._run(self.backend.save_survey_responses, responses)
+        else:
+            for response in responses:
+                await self._run(self.backend.save_survey_response, response)
+
+    async def get_survey_questions(self, survey_id: str) -> Optional[List[SurveyQuestion]]:
+        """Retrieve questions for a specific survey."""
+        return await self._run(self.backend.get_survey_questions, survey_id)
+
+    async def get_survey_info(self, survey_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve survey information."""
+        return await self._run(self.backend.get_survey_info, survey_id)
+
+    async def get_all_survey_responses(self) -> List[Dict[str, Any]]:
+        """Retrieve all survey responses."""
+        return await self._run(self.backend.get_all_survey_responses)
+
+    async def query_survey_responses(
+        self, filters: Dict[str, Any], cursor: Optional[int], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Retrieve one filtered page of survey responses and the next page's cursor."""
+        return await self._run(self.backend.query_survey_responses, filters, cursor, limit)
+
+    async def scan_survey_responses(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Retrieve the responses stored from `cursor` on, with their sequence numbers, and the next cursor."""
+        return await self._run(self.backend.scan_survey_responses, cursor, limit)
+
+    async def get_answered_questions(self, survey_id: str, customer_id: str) -> List[Tuple[int, str]]:
+        """Retrieve the (question id, answer) pairs a customer has recorded in a survey."""
+        return await self._run(self.backend.get_answered_questions, survey_id, customer_id)
+
+    async def get_all_surveys(self) -> List[Dict[str, Any]]:
+        """Retrieve all surveys."""
+        return list(await self._run(self.backend.get_all_surveys))
+
+    async def get_surveys_info(self, survey_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve the existing surveys among `survey_ids` in a single call."""
+        return await self._run(self.backend.get_surveys_info, survey_ids)
+
+    async def save_surveys(self, surveys: Dict[str, Dict[str, Any]]) -> None:
+        """Create or replace several surveys in a single transaction."""
+        await self._run(self.backend.save_surveys, surveys)
+
+    async def create_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        """Create a new survey."""
+        await self._run(self.backend.create_survey, survey_id, survey_data)
+
+    async def update_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        """Update an existing survey."""
+        await self._run(self.backend.update_survey, survey_id, survey_data)
+
+    async def delete_survey(self, survey_id: str) -> None:
+        """Delete a survey."""
+        await self._run(self.backend.delete_survey, survey_id)
+
+
+# Storage instance shared by every service in this worker
+store = AsyncMockRPCDatabase(engine=create_storage_engine(mock_db, SURVEYS))
@@ -1,8 +1,68 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import chatbot_router, admin_router
+from app.routers import chatbot_router, admin_router, health_router, metrics_router
+from app.services.admin_service import AdminService, response_exporter
+from app.services.chatbot_service import ChatbotService, response_writer
+from app.utils.readiness import readiness
+from app.utils.storage_scheduler import BULK, StorageScheduler
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
-# Include the chatbot and admin router
+# Time (in seconds) between warm-up attempts while storage is unreachable
+WARMUP_RETRY_DELAY = float(os.environ.get("WARMUP_RETRY_DELAY", "2"))
+
+
+async def retry_until_available(name: str, func):
+    """Run a startup step, retrying it until storage answers."""
+    while True:
+        try:
+            return await func()
+        except ConnectionError as e:
+            logger.warning(f"{name} failed: {e}. Retrying in {WARMUP_RETRY_DELAY}s.")
+            await asyncio.sleep(WARMUP_RETRY_DELAY)
+
+
+async def refresh_survey_stats() -> int:
+    """Count the stored responses up front, as bulk work, so the first stats request reads only new ones."""
+    with StorageScheduler.priority(BULK):
+        return await AdminService.refresh_survey_stats()
+
+
+async def warm_up():
+    """Warm the worker up and count the stored survey responses, then report it ready."""
+    readiness.mark_not_ready("warming_up")
+    summary, responses = await asyncio.gather(
+        retry_until_available("Warm-up", ChatbotService.warm_up),
+        retry_until_available("Survey statistics refresh", refresh_survey_stats),
+    )
+    readiness.mark_ready({**summary, "responses": responses})
+    logger.info(f"Worker warmed up: {readiness.snapshot()}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown hooks."""
+    # Serve health checks right away, but report ready only once warmed up
+    warm_up_task = asyncio.create_task(warm_up())
+    if response_exporter is not None:
+        response_exporter.start()
+    yield
+    readiness.mark_not_ready("shutting_down")
+    warm_up_task.cancel()
+    await asyncio.gather(warm_up_task, return_exceptions=True)
+    if response_exporter is not None:
+        await response_exporter.close()
+    # Drain queued survey responses before the worker exits
+    await response_writer.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Include the chatbot, admin, health and metrics routers
 app.include_router(chatbot_router.router)
-app.include_router(admin_router.router)
\ No newline at end of file
+app.include_router(admin_router.router)
+app.include_router(health_router.router)
+app.include_router(metrics_router.router)
@@ -1,19 +1,72 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, model_validator
+from typing import Any, Dict, List, Literal, Optional, Union
+
+# A flow target: the id of a later question, or "end" to complete the survey
+FlowTarget = Union[int, Literal["end"]]
 
 class SurveyQuestion(BaseModel):
     id: int
     question: str
-    options: List[str]
+    options: List[str] = []
+    # "choice" questions are answered with an option number, "text" questions with free text
+    type: Literal["choice", "text"] = "choice"
+    # Option -> question to continue with; other options (and text answers) follow `next`
+    branches: Dict[str, FlowTarget] = {}
+    # Question to continue with by default (the following question when omitted)
+    next: Optional[FlowTarget] = None
+
+    @model_validator(mode="after")
+    def check_options(self) -> "SurveyQuestion":
+        if self.type == "choice" and not self.options:
+            raise ValueError("Choice questions need at least one option")
+        unknown = set(self.branches) - set(self.options)
+        if unknown:
+            raise ValueError(f"Branches reference unknown options: {sorted(unknown)}")
+        return self
 
 class SurveyResponse(BaseModel):
     customer_id: str
     question_id: int
     answer: str
+    survey_id: Optional[str] = None
 
 class ConversationState(BaseModel):
     customer_id: str
     current_question: Optional[int] = None
     completed: bool = False
     responses: List[SurveyResponse] = []
-    survey_id: str
\ No newline at end of file
+    survey_id: str
+    version: int = 0
+
+    def to_record(self) -> Dict[str, Any]:
+        """Serialize to the compact storage format (cursor fields plus an answer log)."""
+        return {
+            "customer_id": self.customer_id,
+            "survey_id": self.survey_id,
+            "current_question": self.current_question,
+            "completed": self.completed,
+            "version": self.version,
+            "answers": [[response.question_id, response.answer] for response in self.responses],
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "ConversationState":
+        """Rebuild a conversation state from its compact storage format."""
+        if "answers" not in record:
+            return cls(**record)  # Legacy full snapshot
+        return cls(
+            customer_id=record["customer_id"],
+            survey_id=record["survey_id"],
+            current_question=record["current_question"],
+            completed=record["completed"],
+            version=record["version"],
+            responses=[
+                SurveyResponse(
+                    customer_id=record["customer_id"],
+                    question_id=question_id,
+                    answer=answer,
+                    survey_id=record["survey_id"],
+                )
+                for question_id, answer in record["answers"]
+            ],
+        )
@@ -1,26 +1,87 @@
-from fastapi import APIRouter
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 from app.services.admin_service import AdminService
+from app.utils.response_cache import CachedBody, etag_matches
+from app.utils.storage_scheduler import BULK, StorageScheduler
+
+
+async def bulk_priority():
+    """Admin requests (streamed bodies included) queue behind chatbot turns for storage slots."""
+    StorageScheduler.use_priority(BULK)
 
 # Initialize router
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(bulk_priority)])
+
+
+def conditional_json(cached: CachedBody, if_none_match: Optional[str]) -> Response:
+    """Serve a cached JSON body, or 304 if the client already holds this version."""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
 
 # Admin Controls
 @router.get("/admin/survey_responses", response_model=List[Dict[str, Any]])
-async def get_all_survey_responses():
-    """Retrieve all survey responses."""
-    return await AdminService.get_all_survey_responses()
+async def get_all_survey_responses(
+    response: Response,
+    survey_id: Optional[str] = None,
+    customer_id: Optional[str] = None,
+    question_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """
+    Retrieve survey responses, optionally filtered by survey, customer and question.
+
+    JSON results are paginated: pass the `X-Next-Cursor` response header back as `cursor`
+    to get the next page. `format=ndjson` streams every matching response instead.
+    """
+    filters = {
+        field: value
+        for field, value in (("survey_id", survey_id), ("customer_id", customer_id), ("question_id", question_id))
+        if value is not None
+    }
+    if format == "ndjson":
+        return StreamingResponse(
+            AdminService.stream_survey_responses(filters, cursor), media_type="application/x-ndjson"
+        )
+    rows, next_cursor = await AdminService.get_survey_responses(filters, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 @router.get("/admin/surveys", response_model=List[Dict[str, Any]])
-async def get_all_surveys():
-    """Retrieve all surveys."""
-    return await AdminService.get_all_surveys()
+async def get_all_surveys(if_none_match: Optional[str] = Header(None)):
+    """Retrieve all surveys; supports conditional requests through ETag / If-None-Match."""
+    return conditional_json(await AdminService.get_all_surveys_body(), if_none_match)
+
+@router.get("/admin/surveys/{survey_id}", response_model=Dict[str, Any])
+async def get_survey(survey_id: str, if_none_match: Optional[str] = Header(None)):
+    """Retrieve one survey; supports conditional requests through ETag / If-None-Match."""
+    return conditional_json(await AdminService.get_survey_body(survey_id), if_none_match)
+
+@router.get("/admin/surveys/{survey_id}/stats", response_model=Dict[str, Any])
+async def get_survey_stats(survey_id: str):
+    """Retrieve live answer counts for every question of a survey."""
+    return await AdminService.get_survey_stats(survey_id)
 
 @router.post("/admin/surveys")
 async def create_survey(survey_data: Dict[str, Any]):
     """Create a new survey."""
     return await AdminService.create_survey(survey_data)
 
+@router.post("/admin/surveys:batch")
+async def create_surveys(surveys: List[Dict[str, Any]]):
+    """Create many surveys in one transaction, reporting the outcome of each."""
+    return await AdminService.batch_write_surveys(surveys, create=True)
+
+@router.put("/admin/surveys:batch")
+async def update_surveys(surveys: List[Dict[str, Any]]):
+    """Update many existing surveys in one transaction, reporting the outcome of each."""
+    return await AdminService.batch_write_surveys(surveys, create=False)
+
 @router.put("/admin/surveys/{survey_id}")
 async def update_survey(survey_id: str, survey_data: Dict[str, Any]):
     """Update an existing survey."""
@@ -1,9 +1,33 @@
+from typing import Optional
 from fastapi import APIRouter, WebSocket
 from app.services.chatbot_service import ChatbotService
 
 router = APIRouter()
 
+@router.websocket("/ws/mux")
+async def chatbot_mux_websocket(websocket: WebSocket):
+    """
+    Multiplexed WebSocket endpoint carrying many chatbot sessions as JSON frames.
+
+    Each frame names its session; sessions are opened with `{"type": "open", "session": ...,
+    "customer_id": ..., "survey_id": ...}` and then exchange `message` frames.
+    """
+    await ChatbotService.handle_multiplexed_connection(websocket)
+
 @router.websocket("/ws/{customer_id}/{survey_id}")
-async def chatbot_websocket(websocket: WebSocket, customer_id: str, survey_id: str):
-    """WebSocket endpoint for the chatbot."""
-    await ChatbotService.handle_websocket_interaction(websocket, customer_id, survey_id)
\ No newline at end of file
+async def chatbot_websocket(
+    websocket: WebSocket,
+    customer_id: str,
+    survey_id: str,
+    resume: bool = False,
+    resume_token: Optional[str] = None,
+):
+    """
+    WebSocket endpoint for the chatbot.
+
+    Pass `resume=true` to receive resume tokens, and a previously received `resume_token`
+    to continue a conversation without waiting for the session lookups.
+    """
+    await ChatbotService.handle_websocket_interaction(
+        websocket, customer_id, survey_id, resume_token=resume_token, issue_resume_tokens=resume
+    )
\ No newline at end of file
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.utils.readiness import readiness
+
+router = APIRouter()
+
+@router.get("/health/live")
+async def liveness():
+    """Report that the worker process is up."""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+async def readiness_check():
+    """Report whether the worker is warmed up; 503 until then so load balancers skip it."""
+    return JSONResponse(readiness.snapshot(), status_code=200 if readiness.ready else 503)
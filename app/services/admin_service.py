@@ -1,22 +1,157 @@
-from app.db import MockRPCDatabase
-from app.utils.rpc_retrier_wrapper import RPCRetrier
-from typing import List, Dict, Any
+from app.db import store
+from app.models.models import SurveyQuestion
+from app.utils.rpc_retrier_wrapper import retrier
+from app.utils.storage_scheduler import BULK, StorageScheduler
+from app.utils.response_cache import CachedBody, VersionedBodyCache
+from app.utils.response_export import create_response_exporter
+from app.utils.survey_cache import survey_cache
+from app.utils.survey_flow import compile_flow
+from app.utils.survey_stats import survey_stats
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+import asyncio
+import json
+import logging
 
-# Initialize database and retrier
-db = MockRPCDatabase()
-retrier = RPCRetrier(max_retries=3, retry_delay=1)
+# Storage and retrier are shared across services
+db = store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Largest number of surveys accepted by one batch request
+MAX_SURVEY_BATCH = 1000
+
+# Attempts at reading one page of a streamed export (each a full retrier call) before it is aborted
+STREAM_PAGE_ATTEMPTS = 3
+
+_questions_adapter = TypeAdapter(List[SurveyQuestion])
+
+# Serialized survey definitions, keyed by survey id (None for the whole catalog)
+survey_bodies = VersionedBodyCache(ttl=30.0)
+
+
+async def _scan_responses(cursor: int, limit: int):
+    """Read a page of stored responses for the export, as bulk work."""
+    with StorageScheduler.priority(BULK):
+        return await retrier.call(db.scan_survey_responses, cursor, limit)
+
+# Background export of committed responses for offline analytics (None unless configured)
+response_exporter = create_response_exporter(_scan_responses, db.engine.store_id if db.engine.durable else None)
 
 class AdminService:
     """Service layer for admin operations."""
 
     @staticmethod
-    async def get_all_survey_responses() -> List[Dict[str, Any]]:
-        """Retrieve all survey responses."""
+    def _decode_cursor(cursor: Optional[str]) -> Optional[int]:
+        """Validate an opaque pagination cursor."""
+        if cursor is None:
+            return None
+        if not cursor.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        return int(cursor)
+
+    @staticmethod
+    async def get_survey_responses(
+        filters: Dict[str, Any], cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Retrieve one page of survey responses and the cursor of the next page."""
+        position = AdminService._decode_cursor(cursor)
         try:
-            return await retrier.call(db.get_all_survey_responses)
+            rows, next_position = await retrier.call(db.query_survey_responses, filters, position, limit)
         except ConnectionError:
             raise HTTPException(status_code=500, detail="Failed to retrieve survey responses due to RPC error.")
+        return rows, (str(next_position) if next_position is not None else None)
+
+    @staticmethod
+    def stream_survey_responses(
+        filters: Dict[str, Any], cursor: Optional[str] = None, page_size: int = 1000
+    ) -> AsyncIterator[str]:
+        """
+        Yield matching survey responses as NDJSON lines, one storage page at a time.
+
+        A page that still fails after STREAM_PAGE_ATTEMPTS ends the stream with an
+        `{"error", "next_cursor"}` line; pass `next_cursor` back as `cursor` to resume.
+        """
+        position = AdminService._decode_cursor(cursor)
+
+        async def generate(position: Optional[int]) -> AsyncIterator[str]:
+            while True:
+                for attempt in range(STREAM_PAGE_ATTEMPTS):
+                    try:
+                        rows, next_position = await retrier.call(
+                            db.query_survey_responses, filters, position, page_size
+                        )
+                        break
+                    except ConnectionError:
+                        if attempt < STREAM_PAGE_ATTEMPTS - 1:
+                            await asyncio.sleep(retrier.backoff(attempt))
+                else:
+                    # Headers are already sent: end with an error line holding the cursor to resume from
+                    logger.error("Survey response export aborted due to RPC error.")
+                    yield json.dumps({
+                        "error": "Failed to retrieve survey responses due to RPC error.",
+                        "next_cursor": str(position or 0),
+                    }) + "\n"
+                    return
+                for row in rows:
+                    yield json.dumps(row) + "\n"
+                if next_position is None:
+                    return
+                position = next_position
+
+        return generate(position)
+
+    @staticmethod
+    async def get_survey_stats(survey_id: str) -> Dict[str, Any]:
+        """Retrieve answer counts for every question of a survey, including responses stored by other workers."""
+        try:
+            survey = await survey_cache.get_or_fetch(survey_id, lambda sid: retrier.call(db.get_survey_info, sid))
+        except ConnectionError:
+            raise HTTPException(status_code=500, detail="Failed to retrieve survey due to RPC error.")
+        except ValueError as e:
+            # Stored before flow rules were validated on every write path
+            raise HTTPException(status_code=500, detail=f"Invalid survey definition: {e}")
+        if survey is None:
+            raise HTTPException(status_code=404, detail="Survey not found.")
+        try:
+            await AdminService.refresh_survey_stats()
+        except ConnectionError:
+            raise HTTPException(status_code=500, detail="Failed to retrieve survey statistics due to RPC error.")
+        return survey_stats.summarize(survey)
+
+    @staticmethod
+    async def refresh_survey_stats(page_size: int = 1000) -> int:
+        """
+        Count the responses stored since the last refresh, in storage order.
+
+        Each refresh reads only the new responses. A storage failure leaves the counters at
+        the last page read, and the next refresh continues from there.
+
+        :return: The number of responses counted.
+        :raises ConnectionError: If storage could not be read.
+        """
+        count, checked = 0, set()
+        while True:
+            position = survey_stats.position
+            rows, next_position = await retrier.call(db.scan_survey_responses, position, page_size)
+            # Register each survey's options before its answers are counted, so they are never capped
+            for survey_id in {row.get("survey_id") for row in rows} - checked:
+                checked.add(survey_id)
+                if survey_id is None or survey_stats.is_declared(survey_id):
+                    continue
+                try:
+                    survey = await survey_cache.get_or_fetch(survey_id, lambda sid: retrier.call(db.get_survey_info, sid))
+                except ValueError:
+                    survey = None  # Stored before flow rules were validated; its answers are counted uncategorized
+                if survey is not None:
+                    survey_stats.declare(survey)
+            if survey_stats.record_page(position, rows, next_position):
+                count += len(rows)
+            if len(rows) < page_size:
+                return count
 
     @staticmethod
     async def get_all_surveys() -> List[Dict[str, Any]]:
@@ -26,6 +161,30 @@ class AdminService:
         except ConnectionError:
             raise HTTPException(status_code=500, detail="Failed to retrieve surveys due to RPC error.")
 
+    @staticmethod
+    async def get_all_surveys_body() -> CachedBody:
+        """Retrieve the serialized survey list, fetching it only when the catalog changed."""
+        version = survey_cache.catalog_version
+        cached = survey_bodies.get(None, version)
+        if cached is None:
+            cached = survey_bodies.put(None, version, await AdminService.get_all_surveys())
+        return cached
+
+    @staticmethod
+    async def get_survey_body(survey_id: str) -> CachedBody:
+        """Retrieve one serialized survey definition, fetching it only when the survey changed."""
+        version = survey_cache.version(survey_id)
+        cached = survey_bodies.get(survey_id, version)
+        if cached is not None:
+            return cached
+        try:
+            survey = await retrier.call(db.get_survey_info, survey_id)
+        except ConnectionError:
+            raise HTTPException(status_code=500, detail="Failed to retrieve survey due to RPC error.")
+        if not survey:
+            raise HTTPException(status_code=404, detail="Survey not found.")
+        return survey_bodies.put(survey_id, version, survey)
+
     @staticmethod
     async def create_survey(survey_data: Dict[str, Any]) -> Dict[str, str]:
         """Create a new survey."""
@@ -33,10 +192,14 @@ class AdminService:
             survey_id = survey_data.get("survey_id")
             if not survey_id:
                 raise HTTPException(status_code=400, detail="Survey ID is required.")
+            detail = AdminService._check_questions(survey_data)
+            if detail is not None:
+                raise HTTPException(status_code=400, detail=detail)
             existing_survey = await retrier.call(db.get_survey_info, survey_id)
             if existing_survey:
                 raise HTTPException(status_code=400, detail="Survey with this ID already exists.")
             await retrier.call(db.create_survey, survey_id, survey_data)
+            survey_cache.bump_version(survey_id)
             return {"message": "Survey created successfully."}
         except ConnectionError:
             raise HTTPException(status_code=500, detail="Failed to create survey due to RPC error.")
@@ -44,11 +207,15 @@ class AdminService:
     @staticmethod
     async def update_survey(survey_id: str, survey_data: Dict[str, Any]) -> Dict[str, str]:
         """Update an existing survey."""
+        detail = AdminService._check_questions(survey_data)
+        if detail is not None:
+            raise HTTPException(status_code=400, detail=detail)
         try:
             existing_survey = await retrier.call(db.get_survey_info, survey_id)
             if not existing_survey:
                 raise HTTPException(status_code=404, detail="Survey not found.")
             await retrier.call(db.update_survey, survey_id, survey_data)
+            survey_cache.bump_version(survey_id)
             return {"message": "Survey updated successfully."}
         except ConnectionError:
             raise HTTPException(status_code=500, detail="Failed to update survey due to RPC error.")
@@ -61,6 +228,77 @@ class AdminService:
             if not existing_survey:
                 raise HTTPException(status_code=404, detail="Survey not found.")
             await retrier.call(db.delete_survey, survey_id)
+            survey_cache.bump_version(survey_id)
             return {"message": "Survey deleted successfully."}
         except ConnectionError:
-            raise HTTPException(status_code=500, detail="Failed to delete survey due to RPC error.")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail="Failed to delete survey due to RPC error.")
+
+    @staticmethod
+    def _check_questions(survey_data: Dict[str, Any]) -> Optional[str]:
+        """Validate a definition's questions and flow rules; return the error detail, or None if valid."""
+        try:
+            compile_flow(_questions_adapter.validate_python(survey_data.get("questions")))
+        except ValidationError as e:
+            return f"Invalid questions: {e.errors(include_url=False, include_context=False)}"
+        except ValueError as e:
+            return f"Invalid survey flow: {e}"
+        return None
+
+    @staticmethod
+    def _validate_survey_batch(surveys: List[Dict[str, Any]]) -> List[str]:
+        """
+        Check every definition of a batch before anything is written.
+
+        :return: The survey ids, in request order.
+        :raises HTTPException: 400 listing every invalid item.
+        """
+        if not surveys:
+            raise HTTPException(status_code=400, detail="At least one survey is required.")
+        if len(surveys) > MAX_SURVEY_BATCH:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_SURVEY_BATCH} surveys per batch.")
+        errors, survey_ids, seen = [], [], set()
+        for index, survey_data in enumerate(surveys):
+            survey_id = survey_data.get("survey_id")
+            if not survey_id:
+                errors.append({"index": index, "detail": "Survey ID is required."})
+            elif survey_id in seen:
+                errors.append({"index": index, "survey_id": survey_id, "detail": "Duplicate survey ID in batch."})
+            else:
+                detail = AdminService._check_questions(survey_data)
+                if detail is not None:
+                    errors.append({"index": index, "survey_id": survey_id, "detail": detail})
+            seen.add(survey_id)
+            survey_ids.append(survey_id)
+        if errors:
+            raise HTTPException(status_code=400, detail=errors)
+        return survey_ids
+
+    @staticmethod
+    async def batch_write_surveys(surveys: List[Dict[str, Any]], create: bool) -> Dict[str, Any]:
+        """
+        Create (or update) many surveys with one existence lookup and one transactional write.
+
+        Surveys that already exist (or, for updates, do not exist) are skipped and reported in
+        the per-item results; the rest are written together.
+
+        :param create: True to create new surveys, False to update existing ones.
+        """
+        survey_ids = AdminService._validate_survey_batch(surveys)
+        try:
+            existing = await retrier.call(db.get_surveys_info, survey_ids)
+            results, to_write = [], {}
+            for survey_id, survey_data in zip(survey_ids, surveys):
+                if create and survey_id in existing:
+                    results.append({"survey_id": survey_id, "status": "error", "detail": "Survey with this ID already exists."})
+                elif not create and survey_id not in existing:
+                    results.append({"survey_id": survey_id, "status": "error", "detail": "Survey not found."})
+                else:
+                    results.append({"survey_id": survey_id, "status": "created" if create else "updated"})
+                    to_write[survey_id] = survey_data
+            if to_write:
+                await retrier.call(db.save_surveys, to_write)
+        except ConnectionError:
+            raise HTTPException(status_code=500, detail="Failed to write surveys due to RPC error.")
+        for survey_id in to_write:
+            survey_cache.bump_version(survey_id)
+        return {"written": len(to_write), "failed": len(results) - len(to_write), "results": results}
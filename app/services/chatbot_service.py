@@ -1,13 +1,128 @@
-from app.db import MockRPCDatabase
-from app.utils.rpc_retrier_wrapper import RPCRetrier
-from app.models.models import SurveyResponse, ConversationState
-from fastapi import WebSocket, HTTPException
-from typing import List, Dict, Any
+from app.db import StateConflictError, store
+from app.storage.session_store import SessionStore
+from app.utils.rpc_retrier_wrapper import retrier
+from app.utils.async_cache import AsyncTTLCache
+from app.utils.response_writer import ResponseBatchWriter
+from app.utils.resume_token import resume_tokens
+from app.utils.session_mux import MuxChannel, SessionMultiplexer
+from app.utils.admission import (
+    AdmissionRejectedError,
+    SessionAdmission,
+    SessionIdleTimeoutError,
+    SessionInterruptedError,
+    SessionSlot,
+    SessionSupersededError,
+)
+from app.utils.metrics import (
+    registry,
+    chatbot_active_sessions,
+    chatbot_idle_sessions_closed,
+    chatbot_session_resumes,
+    chatbot_surveys_abandoned,
+    chatbot_surveys_completed,
+    chatbot_turn_seconds,
+)
+from app.models.models import ConversationState, SurveyResponse
+from app.utils.turn_engine import (
+    INVALID_RESPONSE_MESSAGE,
+    ConversationSession,
+)
+from app.utils.survey_cache import CompiledQuestion, CompiledSurvey, survey_cache
+from fastapi import WebSocket, WebSocketDisconnect, HTTPException
+from pydantic import TypeAdapter, ValidationError
+from dataclasses import dataclass, field
+from typing import Tuple, Dict, Any, List, Optional
+import asyncio
 import logging
+import os
+import socket
+import time
+import uuid
 
-# Initialize database and retrier
-db = MockRPCDatabase()
-retrier = RPCRetrier(max_retries=3, retry_delay=1)
+# Storage and retrier are shared across services
+db = store
+
+# Customer profiles are cached briefly; unknown ids are remembered for a shorter time
+customer_cache = AsyncTTLCache(max_size=10_000, ttl=60.0, negative_ttl=5.0)
+
+
+def create_conversation_state_cache(sessions: SessionStore) -> AsyncTTLCache:
+    """
+    Build the cache of the conversation records this worker saved or loaded, so a reconnect
+    to the same worker resumes without re-reading storage.
+
+    Entries live `CHATBOT_STATE_CACHE_TTL` seconds: 60 by default, but 0 (disabled) when the
+    session store is shared by several workers, since a copy cached by one worker would hide
+    answers saved through another.
+    """
+    default_ttl = "0" if sessions.shared else "60"
+    return AsyncTTLCache(
+        max_size=10_000, ttl=float(os.environ.get("CHATBOT_STATE_CACHE_TTL", default_ttl)), negative_ttl=0.0
+    )
+
+
+conversation_state_cache = create_conversation_state_cache(db.sessions)
+
+_responses_adapter = TypeAdapter(List[SurveyResponse])
+
+
+async def store_survey_responses(batch: List[Dict[str, Any]]):
+    """
+    Write a batch of survey responses, validating it once at the storage boundary.
+
+    Responses that fail validation are logged and dropped, so they cannot block the queue.
+    """
+    try:
+        _responses_adapter.validate_python(batch)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors()}
+        logger.error(f"Dropping {len(invalid)} invalid survey responses: {e.errors(include_url=False)}")
+        batch = [response for index, response in enumerate(batch) if index not in invalid]
+        if not batch:
+            return
+    await retrier.call(db.save_survey_responses, batch)
+
+
+# Answers are acknowledged immediately and written to storage in batches
+response_writer = ResponseBatchWriter(
+    store_survey_responses,
+    batch_size=50,
+    flush_interval=0.5,
+    max_pending=10_000,
+)
+
+# Bounds the sessions of this worker and keeps one session per customer
+session_admission = SessionAdmission(
+    max_sessions=int(os.environ.get("CHATBOT_MAX_SESSIONS", "10000")),
+    max_waiting=int(os.environ.get("CHATBOT_MAX_WAITING_SESSIONS", "0")),
+    wait_timeout=float(os.environ.get("CHATBOT_ADMISSION_TIMEOUT", "5")),
+)
+
+# Expose cache, writer and admission counters at scrape time
+registry.callback_gauge(
+    "customer_cache_events",
+    "Customer cache counters by event.",
+    lambda: {(event,): value for event, value in customer_cache.stats.items()},
+    ("event",),
+)
+registry.callback_gauge(
+    "conversation_state_cache_events",
+    "Conversation state cache counters by event.",
+    lambda: {(event,): value for event, value in conversation_state_cache.stats.items()},
+    ("event",),
+)
+registry.callback_gauge(
+    "response_writer_events",
+    "Survey response writer counters by event.",
+    lambda: {(event,): value for event, value in response_writer.stats.items()},
+    ("event",),
+)
+registry.callback_gauge(
+    "chatbot_admission_events",
+    "Chatbot session admission counters and occupancy.",
+    lambda: {(event,): value for event, value in session_admission.stats.items()},
+    ("event",),
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,15 +131,52 @@ logger = logging.getLogger(__name__)
 # Centralized error message
 TECHNICAL_DIFFICULTIES_MESSAGE = "We are experiencing technical difficulties. Please try again later."
 
+CONVERSATION_BUSY_MESSAGE = "This survey is being answered in another session."
+
+SERVER_BUSY_MESSAGE = "The chatbot is busy right now. Please try again in a few moments."
+
+IDLE_TIMEOUT_MESSAGE = "Closing this chat due to inactivity. Reconnect to continue where you left off."
+
+SESSION_REPLACED_MESSAGE = "This chat was continued in a newer session."
+
+# Time (in seconds) a session waits for the customer's next message before it is closed
+SESSION_IDLE_TIMEOUT = float(os.environ.get("CHATBOT_IDLE_TIMEOUT", "300"))
+
+# Maximum number of sessions open at once on one multiplexed connection
+MUX_MAX_SESSIONS = int(os.environ.get("CHATBOT_MUX_MAX_SESSIONS", "1000"))
+
+# Time budget (in seconds) for all RPCs needed before the first question
+BOOTSTRAP_DEADLINE = 5.0
+
+# Lifetime (in seconds) of a session's ownership of its conversation; renewed while it is active
+CONVERSATION_LEASE_TTL = 120.0
+
+# Identifies this worker in lease owners
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class SessionBootstrap:
+    """Everything a chatbot session needs before the first question is sent."""
+    customer_info: Optional[Dict[str, Any]]
+    survey: CompiledSurvey
+    state: ConversationState
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Storage checks of a resumed session, resolving to the customer info and, if the token
+    # is behind storage, the stored state; must complete before the session writes anything
+    verification: Optional["asyncio.Future[Tuple[Dict[str, Any], Optional[ConversationState]]]"] = None
+
 
 class ChatbotService:
     """Service layer for chatbot operations."""
 
     @staticmethod
     async def get_customer_info(customer_id: str) -> Dict[str, Any]:
-        """Retrieve customer information."""
+        """Retrieve customer information, served from the profile cache when possible."""
         try:
-            customer_info = await retrier.call(db.get_customer_info, customer_id)
+            customer_info = await customer_cache.get_or_load(
+                customer_id, lambda: retrier.call(db.get_customer_info, customer_id)
+            )
             if not customer_info:
                 raise HTTPException(status_code=404, detail="Customer not found.")
             return customer_info
@@ -32,75 +184,448 @@ class ChatbotService:
             raise HTTPException(status_code=500, detail=TECHNICAL_DIFFICULTIES_MESSAGE)
 
     @staticmethod
-    async def get_survey_questions(survey_id: str) -> List[Dict[str, Any]]:
-        """Retrieve survey questions."""
+    async def get_compiled_survey(survey_id: str) -> CompiledSurvey:
+        """Retrieve the compiled survey, fetching and compiling it only on a cache miss."""
         try:
-            survey_questions = await retrier.call(db.get_survey_questions, survey_id)
-            if not survey_questions:
-                raise HTTPException(status_code=404, detail="Survey not found.")
-            return survey_questions
+            compiled = await survey_cache.get_or_fetch(survey_id, lambda sid: retrier.call(db.get_survey_info, sid))
         except ConnectionError:
             raise HTTPException(status_code=500, detail=TECHNICAL_DIFFICULTIES_MESSAGE)
+        except ValueError as e:
+            logger.error(f"Survey {survey_id} could not be compiled: {e}")
+            raise HTTPException(status_code=500, detail=TECHNICAL_DIFFICULTIES_MESSAGE)
+        if compiled is None:
+            raise HTTPException(status_code=404, detail="Survey not found.")
+        return compiled
+
+    @staticmethod
+    async def get_survey_questions(survey_id: str) -> Tuple[CompiledQuestion, ...]:
+        """Retrieve survey questions."""
+        return (await ChatbotService.get_compiled_survey(survey_id)).questions
+
+    @staticmethod
+    async def warm_up() -> Dict[str, Any]:
+        """
+        Pay the first session's one-time costs up front: compile every survey in the catalog,
+        exercise the model validators and serializers, and open the storage connections.
+
+        :return: A summary of the warm-up.
+        :raises ConnectionError: If storage could not be reached.
+        """
+        catalog_version = survey_cache.catalog_version
+        surveys, _, _ = await asyncio.gather(
+            retrier.call(db.get_all_surveys),
+            retrier.call(db.get_conversation_state, "conv_warmup"),
+            retrier.call(db.get_customer_info, "warmup"),
+        )
+        compiled = 0
+        for survey_data in surveys:
+            survey_id = survey_data.get("survey_id") or survey_data.get("id")
+            # Surveys changed by an admin write meanwhile are compiled on first use instead
+            if not survey_id or not survey_data.get("questions") or survey_cache.catalog_version != catalog_version:
+                continue
+            try:
+                survey_cache.put(survey_id, survey_data, survey_cache.version(survey_id))
+                compiled += 1
+            except ValueError as e:
+                logger.warning(f"Survey {survey_id} could not be compiled: {e}")
+
+        # Run each model's validation and serialization paths once
+        state = ConversationState(
+            customer_id="warmup",
+            survey_id="warmup",
+            current_question=1,
+            responses=[SurveyResponse(customer_id="warmup", question_id=1, answer="warmup", survey_id="warmup")],
+        )
+        ConversationState.from_record(state.to_record()).model_dump_json()
+        ConversationSession.from_state(state).to_delta()
+        return {"surveys": compiled}
+
+    @staticmethod
+    async def load_conversation_record(conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the stored conversation record, from the write-through cache when possible."""
+        return await conversation_state_cache.get_or_load(
+            conversation_id, lambda: retrier.call(db.get_conversation_state, conversation_id)
+        )
 
     @staticmethod
     async def get_or_initialize_conversation_state(
         customer_id: str, survey_id: str
     ) -> ConversationState:
-        """Retrieve or initialize the conversation state."""
+        """
+        Retrieve or initialize the conversation state.
+
+        A new conversation is not stored until its first answer is saved.
+        """
         conversation_id = f"conv_{customer_id}_{survey_id}"
+
+        def lookup_answers() -> asyncio.Future:
+            return asyncio.ensure_future(retrier.call(db.get_answered_questions, survey_id, customer_id))
+
+        # Without a cached record, the answers already recorded (only needed when no state is
+        # stored) are looked up alongside the state read rather than after it
+        answers = None if conversation_id in conversation_state_cache else lookup_answers()
         try:
-            state_data = await retrier.call(db.get_conversation_state, conversation_id)
+            state_data = await ChatbotService.load_conversation_record(conversation_id)
             if state_data:
-                state = ConversationState(**state_data)
+                state = ConversationState.from_record(state_data)
                 return state
             else:
-                # Initialize a new conversation state
-                state = ConversationState(
+                # Initialize a new conversation state, resuming where the answers already recorded
+                # for this customer (an index lookup in the response store) lead through the flow
+                recorded = dict(await (answers or lookup_answers()))
+                survey = await ChatbotService.get_compiled_survey(survey_id)
+                return ConversationState(
                     customer_id=customer_id,
-                    current_question=1,
+                    current_question=survey.flow.replay(survey.questions, recorded),
                     completed=False,
                     responses=[],
                     survey_id=survey_id,
                 )
-                await retrier.call(db.save_conversation_state, conversation_id, state.model_dump())
-                return state
         except ConnectionError:
             raise HTTPException(status_code=500, detail=TECHNICAL_DIFFICULTIES_MESSAGE)
+        finally:
+            if answers is not None:
+                answers.cancel()
+                await asyncio.gather(answers, return_exceptions=True)
 
     @staticmethod
-    async def save_conversation_state(conversation_id: str, state: ConversationState):
-        """Save the conversation state."""
+    async def save_conversation_state(conversation_id: str, state: ConversationSession):
+        """
+        Save the conversation state as a delta against the last stored version.
+
+        Only the cursor fields and answers recorded since the last successful save are sent,
+        so each save is constant-size; the first save (version 0) creates the conversation.
+        Answers from a failed save are resent next time. Saved records are written through to
+        the conversation state cache.
+
+        :raises StateConflictError: If another writer updated the conversation first.
+        """
         try:
-            await retrier.call(db.save_conversation_state, conversation_id, state.model_dump())
+            version = await retrier.call(db.save_conversation_delta, conversation_id, state.to_delta(), state.version)
+            state.mark_persisted(version)
+            conversation_state_cache.set(conversation_id, state.to_record())
         except ConnectionError:
+            # The write may or may not have been applied
+            conversation_state_cache.invalidate(conversation_id)
             logger.warning(f"Failed to save conversation state for {conversation_id}.")
+        except StateConflictError:
+            conversation_state_cache.invalidate(conversation_id)
+            logger.warning(f"Conflicting write detected for conversation {conversation_id}.")
+            raise
 
     @staticmethod
-    async def save_survey_response(response: SurveyResponse):
-        """Save a survey response."""
+    async def acquire_conversation(conversation_id: str, owner: str):
+        """Take ownership of a conversation, failing with 409 if another session holds it."""
         try:
-            await retrier.call(db.save_survey_response, response.model_dump())
+            acquired = await retrier.call(
+                db.acquire_conversation_lease, conversation_id, owner, CONVERSATION_LEASE_TTL
+            )
         except ConnectionError:
             raise HTTPException(status_code=500, detail=TECHNICAL_DIFFICULTIES_MESSAGE)
+        if not acquired:
+            raise HTTPException(status_code=409, detail=CONVERSATION_BUSY_MESSAGE)
+
+    @staticmethod
+    async def renew_conversation(conversation_id: str, owner: str) -> bool:
+        """Extend the session's ownership; returns False only if the lease was taken over."""
+        try:
+            return await retrier.call(db.renew_conversation_lease, conversation_id, owner, CONVERSATION_LEASE_TTL)
+        except ConnectionError:
+            # The version check on the next save still protects against interleaved writes
+            logger.warning(f"Failed to renew lease for conversation {conversation_id}.")
+            return True
+
+    @staticmethod
+    async def release_conversation(conversation_id: str, owner: str):
+        """Release the session's ownership so a reconnect can resume immediately."""
+        try:
+            await retrier.call(db.release_conversation_lease, conversation_id, owner)
+        except ConnectionError:
+            logger.warning(f"Failed to release lease for conversation {conversation_id}; it will expire.")
+
+    @staticmethod
+    async def save_survey_response(response: Dict[str, Any]):
+        """Queue a survey response record on the write-behind pipeline."""
+        try:
+            await response_writer.submit(response)
+        except ConnectionError:
+            raise HTTPException(status_code=500, detail=TECHNICAL_DIFFICULTIES_MESSAGE)
+
+    @staticmethod
+    async def flush_survey_responses():
+        """Write pending survey responses, e.g. when a session ends."""
+        try:
+            await response_writer.flush()
+        except ConnectionError:
+            logger.warning("Failed to flush survey responses; they remain queued.")
+
+    @staticmethod
+    async def bootstrap_session(
+        customer_id: str, survey_id: str, lease_owner: Optional[str] = None
+    ) -> SessionBootstrap:
+        """
+        Run the independent session lookups concurrently.
+
+        Time-to-first-question becomes the slowest lookup rather than the sum of all of them.
+        If any lookup fails (e.g. a 404 for an unknown customer), the others are cancelled and
+        the error is re-raised. Per-phase durations (in seconds) are recorded in `timings`.
+        When `lease_owner` is given, the conversation lease is acquired in the same round.
+        """
+        timings: Dict[str, float] = {}
+
+        async def timed(phase: str, coro):
+            start = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[phase] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with retrier.deadline(BOOTSTRAP_DEADLINE):
+            # Tasks copy the current context, so every lookup inherits the deadline
+            tasks = [
+                asyncio.ensure_future(timed("customer_info", ChatbotService.get_customer_info(customer_id))),
+                asyncio.ensure_future(timed("survey", ChatbotService.get_compiled_survey(survey_id))),
+                asyncio.ensure_future(
+                    timed("conversation_state", ChatbotService.get_or_initialize_conversation_state(customer_id, survey_id))
+                ),
+            ]
+            if lease_owner is not None:
+                conversation_id = f"conv_{customer_id}_{survey_id}"
+                tasks.append(
+                    asyncio.ensure_future(timed("lease", ChatbotService.acquire_conversation(conversation_id, lease_owner)))
+                )
+        try:
+            customer_info, survey, state = (await asyncio.gather(*tasks))[:3]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            timings["total"] = time.perf_counter() - start
+
+        logger.debug(f"Session bootstrap for customer {customer_id}, survey {survey_id}: {timings}")
+        return SessionBootstrap(customer_info, survey, state, timings)
+
+    @staticmethod
+    async def receive_message(websocket: WebSocket, slot: Optional[SessionSlot] = None) -> str:
+        """
+        Wait for the customer's next message.
+
+        :raises SessionIdleTimeoutError: If nothing arrives within SESSION_IDLE_TIMEOUT.
+        :raises SessionSupersededError: If the customer opened a newer session meanwhile.
+        """
+        receive = asyncio.ensure_future(websocket.receive_text())
+        waiters = {receive} if slot is None else {receive, slot.superseded}
+        try:
+            await asyncio.wait(waiters, timeout=SESSION_IDLE_TIMEOUT, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not receive.done():
+                receive.cancel()
+                await asyncio.gather(receive, return_exceptions=True)
+        if not receive.cancelled():
+            return receive.result()
+        if slot is not None and slot.superseded.done():
+            raise SessionSupersededError(f"Customer {slot.customer_id} opened a newer session")
+        raise SessionIdleTimeoutError(f"No message within {SESSION_IDLE_TIMEOUT}s")
+
+    @staticmethod
+    def resume_session(
+        customer_id: str, survey_id: str, token: str, lease_owner: str
+    ) -> Optional[SessionBootstrap]:
+        """
+        Rebuild a session from a resume token without waiting on storage.
+
+        The survey must still be compiled in this worker's cache with the fingerprint the token
+        was issued for. Taking the lease, loading the customer and checking that the stored
+        state still matches the token run in the background as `verification`.
+
+        :return: The bootstrap, or None if the token cannot be used (the caller falls back to
+            a full bootstrap).
+        """
+        conversation_id = f"conv_{customer_id}_{survey_id}"
+        claims = resume_tokens.verify(token)
+        if claims is None or claims.conversation_id != conversation_id:
+            return None
+        survey = survey_cache.get(survey_id)
+        if survey is None or survey.fingerprint != claims.survey_fingerprint:
+            return None
+        if not 1 <= claims.current_question <= len(survey.questions):
+            return None
+        state = ConversationState(
+            customer_id=customer_id,
+            survey_id=survey_id,
+            current_question=claims.current_question,
+            version=claims.version,
+        )
+        verification = asyncio.ensure_future(
+            ChatbotService.verify_resumed_session(conversation_id, state, lease_owner)
+        )
+        return SessionBootstrap(None, survey, state, verification=verification)
+
+    @staticmethod
+    async def verify_resumed_session(
+        conversation_id: str, state: ConversationState, lease_owner: str
+    ) -> Tuple[Dict[str, Any], Optional[ConversationState]]:
+        """
+        Check a token-resumed session against storage and take ownership of the conversation.
+
+        :return: The customer info, and the stored conversation state if it moved on since the
+            token was issued (None if the token is current).
+        :raises HTTPException: If the lease is held elsewhere (409) or storage is unavailable.
+        """
+        async def load_record():
+            try:
+                return await ChatbotService.load_conversation_record(conversation_id)
+            except ConnectionError:
+                raise HTTPException(status_code=500, detail=TECHNICAL_DIFFICULTIES_MESSAGE)
+
+        with retrier.deadline(BOOTSTRAP_DEADLINE):
+            tasks = [
+                asyncio.ensure_future(ChatbotService.get_customer_info(state.customer_id)),
+                asyncio.ensure_future(ChatbotService.acquire_conversation(conversation_id, lease_owner)),
+                asyncio.ensure_future(load_record()),
+            ]
+        try:
+            customer_info, _, record = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        if record is None:
+            # Tokens of a conversation that was never saved carry version 0
+            if state.version == 0:
+                return customer_info, None
+            logger.info(f"Conversation {conversation_id} is not stored; resume token ignored")
+            return customer_info, await ChatbotService.get_or_initialize_conversation_state(
+                state.customer_id, state.survey_id
+            )
+        if (
+            record.get("completed")
+            or record.get("version", 0) != state.version
+            or record.get("current_question") != state.current_question
+        ):
+            # E.g. the token was issued before the last answer was saved
+            logger.info(f"Conversation {conversation_id} changed since its resume token was issued")
+            return customer_info, ConversationState.from_record(record)
+        return customer_info, None
 
     @staticmethod
     async def handle_websocket_interaction(
-        websocket: WebSocket, customer_id: str, survey_id: str
+        websocket: WebSocket,
+        customer_id: str,
+        survey_id: str,
+        resume_token: Optional[str] = None,
+        issue_resume_tokens: bool = False,
     ):
-        """Handle the WebSocket interaction for the chatbot."""
+        """
+        Handle the WebSocket interaction for the chatbot.
+
+        :param resume_token: Token from a previous session; when still valid, the session
+            continues without waiting for the bootstrap lookups.
+        :param issue_resume_tokens: Send a `TOKEN: <token>` frame before each question
+            (implied by `resume_token`).
+        """
+        await websocket.accept()
+        try:
+            slot = await session_admission.acquire(customer_id)
+        except AdmissionRejectedError:
+            await websocket.send_text(f"BOT: {SERVER_BUSY_MESSAGE}")
+            await websocket.close(code=1013)
+            return
+        try:
+            await ChatbotService.run_admitted_session(
+                websocket, slot, customer_id, survey_id, resume_token, issue_resume_tokens
+            )
+        finally:
+            session_admission.release(slot)
+
+    @staticmethod
+    async def handle_multiplexed_connection(websocket: WebSocket):
+        """
+        Serve many chatbot sessions over one connection (e.g. from a messaging gateway).
+
+        Every session opened on the connection is admitted and driven exactly like a session
+        on its own socket; see SessionMultiplexer for the frame format.
+        """
         await websocket.accept()
 
-        # Retrieve customer info
-        customer_info = await ChatbotService.get_customer_info(customer_id)
+        async def run_session(channel: MuxChannel, frame: Dict[str, Any]):
+            resume_token = frame.get("resume_token")
+            await ChatbotService.handle_websocket_interaction(
+                channel,
+                frame["customer_id"],
+                frame["survey_id"],
+                resume_token=resume_token if isinstance(resume_token, str) else None,
+                issue_resume_tokens=frame.get("resume") is True,
+            )
 
-        # Retrieve survey questions
-        survey_questions = await ChatbotService.get_survey_questions(survey_id)
+        await SessionMultiplexer(websocket, run_session, max_sessions=MUX_MAX_SESSIONS).run()
 
-        # Initialize or retrieve conversation state
+    @staticmethod
+    async def run_admitted_session(
+        websocket: WebSocket,
+        slot: SessionSlot,
+        customer_id: str,
+        survey_id: str,
+        resume_token: Optional[str],
+        issue_resume_tokens: bool,
+    ):
+        """Bootstrap (or resume) the session of an admitted connection and run it."""
         conversation_id = f"conv_{customer_id}_{survey_id}"
-        state = await ChatbotService.get_or_initialize_conversation_state(customer_id, survey_id)
+        lease_owner = f"{WORKER_ID}:{uuid.uuid4().hex}"
+
+        bootstrap = None
+        if resume_token is not None:
+            issue_resume_tokens = True
+            bootstrap = ChatbotService.resume_session(customer_id, survey_id, resume_token, lease_owner)
+            chatbot_session_resumes.inc(path="fast" if bootstrap is not None else "bootstrap")
+
+        if bootstrap is None:
+            # Retrieve customer info, survey questions and conversation state concurrently,
+            # while taking ownership of the conversation
+            try:
+                bootstrap = await ChatbotService.bootstrap_session(customer_id, survey_id, lease_owner)
+            except HTTPException as e:
+                if e.status_code != 409:
+                    await ChatbotService.release_conversation(conversation_id, lease_owner)
+                await websocket.send_text(f"BOT: {e.detail}")
+                await websocket.close()
+                return
+
+        chatbot_active_sessions.inc()
+        try:
+            await ChatbotService.run_conversation(
+                websocket, bootstrap, conversation_id, lease_owner, issue_resume_tokens, slot
+            )
+        finally:
+            chatbot_active_sessions.dec()
+            await ChatbotService.release_conversation(conversation_id, lease_owner)
+
+    @staticmethod
+    async def run_conversation(
+        websocket: WebSocket,
+        bootstrap: SessionBootstrap,
+        conversation_id: str,
+        lease_owner: str,
+        issue_resume_tokens: bool = False,
+        slot: Optional[SessionSlot] = None,
+    ):
+        """Drive the survey turns of a bootstrapped session that owns its conversation."""
+        customer_info = bootstrap.customer_info
+        survey_questions = bootstrap.survey.questions
+        flow = bootstrap.survey.flow
+        state = ConversationSession.from_state(bootstrap.state)
+        verification = bootstrap.verification
+        customer_id = state.customer_id
+        lease_renewed_at = time.monotonic()
+        turn_started = None
 
         # Check if the survey is already completed
+        if not state.completed and state.current_question > len(survey_questions):
+            state.completed = True
         if state.completed:
             await websocket.send_text(
                 f"BOT: You have already completed this survey, {customer_info['name']}. Thank you!"
@@ -113,62 +638,121 @@ class ChatbotService:
                 # Send the current question
                 try:
                     question = survey_questions[state.current_question - 1]
-                    options = question.options
-                    options_text = "\n".join([f"{i + 1} - {option}" for i, option in enumerate(options)])
-                    await websocket.send_text(
-                        f"BOT: {question.question}\nHere are your options:\n{options_text}\n\nPlease reply with the number corresponding to your choice."
-                    )
+                    if issue_resume_tokens and state.saved:
+                        token = resume_tokens.issue(
+                            conversation_id, bootstrap.survey.fingerprint, state.current_question, state.version
+                        )
+                        await websocket.send_text(f"TOKEN: {token}")
+                    await websocket.send_text(question.prompt)
+                    if turn_started is not None:
+                        chatbot_turn_seconds.observe(time.perf_counter() - turn_started)
                 except IndexError:
                     await websocket.send_text("Invalid question index. Please try again later.")
                     await websocket.close()
                     return
 
                 # Receive the customer's response
-                response_data = await websocket.receive_text()
-
-                # Check if the question allows open feedback (e.g., "Yes" selected)
-                if "Yes" in options and response_data == "1" and state.current_question == len(survey_questions):
-                    await websocket.send_text("BOT: Please provide your feedback in text form.")
-                    feedback = await websocket.receive_text()
-                    response = SurveyResponse(
-                        customer_id=customer_id,
-                        question_id=question.id,
-                        answer=feedback,
-                    )
-                else:
-                    try:
-                        response_index = int(response_data) - 1
-                        if response_index < 0 or response_index >= len(options):
-                            raise ValueError
-                        response = SurveyResponse(
-                            customer_id=customer_id,
-                            question_id=question.id,
-                            answer=options[response_index],
-                        )
-                    except ValueError:
-                        await websocket.send_text(
-                            "BOT: Invalid response. Please reply with the number corresponding to your choice."
-                        )
+                response_data = await ChatbotService.receive_message(websocket, slot)
+                turn_started = time.perf_counter()
+
+                # A resumed session writes nothing until storage has confirmed its snapshot
+                if verification is not None:
+                    customer_info, stored_state = await verification
+                    verification = None
+                    if stored_state is not None:
+                        # The token was behind storage: drop the reply to its question and
+                        # continue from the stored conversation
+                        state = ConversationSession.from_state(stored_state)
+                        if state.completed or state.current_question > len(survey_questions):
+                            await websocket.send_text(
+                                f"BOT: You have already completed this survey, {customer_info['name']}. Thank you!"
+                            )
+                            await websocket.close()
+                            return
                         continue
 
-                # Save the response
-                await ChatbotService.save_survey_response(response)
-                state.responses.append(response)
+                # Keep ownership of the conversation while the customer is active
+                if time.monotonic() - lease_renewed_at > CONVERSATION_LEASE_TTL / 2:
+                    if not await ChatbotService.renew_conversation(conversation_id, lease_owner):
+                        raise StateConflictError(f"Lease on {conversation_id} was taken over")
+                    lease_renewed_at = time.monotonic()
+
+                # One table lookup decides what the reply records and where the survey goes next
+                transition = flow.step(state.current_question, response_data)
+                if transition is None:
+                    await websocket.send_text(INVALID_RESPONSE_MESSAGE)
+                    continue
+                answer = transition.answer
+                if transition.follow_up is not None:
+                    # The selected option asks for open feedback (e.g., "Yes" selected)
+                    await websocket.send_text(transition.follow_up)
+                    chatbot_turn_seconds.observe(time.perf_counter() - turn_started)
+                    answer = await ChatbotService.receive_message(websocket, slot)
+                    turn_started = time.perf_counter()
+                elif answer is None:
+                    answer = response_data
 
                 # Move to the next question or complete the survey
-                state.current_question += 1
+                response = state.record_answer(question.id, answer)
+                state.current_question = transition.next_state
                 if state.current_question > len(survey_questions):  # Check if it's the last question
                     state.completed = True
-                    await ChatbotService.save_conversation_state(conversation_id, state)
+
+                # Save the updated state, then the response: an answer rejected by a conflicting
+                # save is never recorded
+                await ChatbotService.save_conversation_state(conversation_id, state)
+                await ChatbotService.save_survey_response(response)
+
+                if state.completed:
+                    # Write the answers before telling the customer they were recorded
+                    await ChatbotService.flush_survey_responses()
                     await websocket.send_text(
                         f"BOT: Thank you for your time, {customer_info['name']}! Your response has been recorded. Have a wonderful day!"
                     )
+                    chatbot_turn_seconds.observe(time.perf_counter() - turn_started)
+                    chatbot_surveys_completed.inc()
                     break
 
-                # Save the updated state
-                await ChatbotService.save_conversation_state(conversation_id, state)
+        except StateConflictError:
+            # Another session advanced this conversation; stop rather than interleave writes
+            await ChatbotService.flush_survey_responses()
+            await websocket.send_text(f"BOT: {CONVERSATION_BUSY_MESSAGE}")
+            await websocket.close()
+
+        except HTTPException as e:
+            # A resumed session could not be verified
+            await websocket.send_text(f"BOT: {e.detail}")
+            await websocket.close()
+
+        except SessionInterruptedError as e:
+            # Checkpoint the conversation before freeing the socket
+            if isinstance(e, SessionIdleTimeoutError):
+                chatbot_idle_sessions_closed.inc()
+                message = IDLE_TIMEOUT_MESSAGE
+            else:
+                message = SESSION_REPLACED_MESSAGE
+            if verification is None and not state.saved:
+                try:
+                    await ChatbotService.save_conversation_state(conversation_id, state)
+                except StateConflictError:
+                    pass
+            await ChatbotService.flush_survey_responses()
+            await websocket.send_text(f"BOT: {message}")
+            await websocket.close()
 
         except WebSocketDisconnect:
             # Handle disconnection gracefully
-            await ChatbotService.save_conversation_state(conversation_id, state)
-            logger.info(f"WebSocket disconnected for customer {customer_id}")
\ No newline at end of file
+            chatbot_surveys_abandoned.inc()
+            if verification is None and not state.saved:
+                try:
+                    await ChatbotService.save_conversation_state(conversation_id, state)
+                except StateConflictError:
+                    pass
+            await ChatbotService.flush_survey_responses()
+            logger.info(f"WebSocket disconnected for customer {customer_id}")
+
+        finally:
+            # Stop verifying a resumed session that ended before its first answer
+            if verification is not None:
+                verification.cancel()
+                await asyncio.gather(verification, return_exceptions=True)
\ No newline at end of file
@@ -0,0 +1,347 @@
+import json
+import os
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.models.models import SurveyQuestion
+from app.storage.response_store import ResponseStore
+from app.storage.session_store import SessionStore, SQLiteSessionStore, create_session_store
+from app.storage.sqlite import DEFAULT_BUSY_TIMEOUT, SQLiteDatabase
+
+# Filters accepted by response queries, mapped to their column
+RESPONSE_FILTER_COLUMNS = {"survey_id": "survey_id", "customer_id": "customer_id", "question_id": "question_id"}
+
+# Largest number of bound parameters used in one SQLite statement
+SQLITE_MAX_PARAMS = 500
+
+
+class StorageEngine(ABC):
+    """
+    Local storage behind the RPC database: customers, surveys, survey responses and sessions.
+
+    Implementations are synchronous; `blocking` tells the async storage layer whether calls
+    must be moved off the event loop. `durable` engines keep their data across restarts and
+    workers; `store_id` identifies the data set (e.g. to tie an export checkpoint to it).
+    """
+
+    blocking = False
+    durable = False
+    sessions: SessionStore
+    store_id: str
+
+    @abstractmethod
+    def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a customer profile."""
+
+    @abstractmethod
+    def put_customers(self, customers: Dict[str, Dict[str, Any]]) -> None:
+        """Create or replace customer profiles, keyed by customer id."""
+
+    @abstractmethod
+    def get_survey(self, survey_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a survey definition."""
+
+    @abstractmethod
+    def list_surveys(self) -> List[Dict[str, Any]]:
+        """Retrieve every survey definition."""
+
+    @abstractmethod
+    def get_surveys(self, survey_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve the existing survey definitions among `survey_ids`, keyed by survey id."""
+
+    def get_survey_questions(self, survey_id: str) -> Optional[List[SurveyQuestion]]:
+        """Retrieve the questions of a survey."""
+        survey = self.get_survey(survey_id)
+        if not survey:
+            return None
+        return [SurveyQuestion(**q) for q in survey["questions"]]
+
+    @abstractmethod
+    def put_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        """Create or replace a survey definition."""
+
+    @abstractmethod
+    def put_surveys(self, surveys: Dict[str, Dict[str, Any]]) -> None:
+        """Create or replace several survey definitions atomically."""
+
+    @abstractmethod
+    def delete_survey(self, survey_id: str) -> None:
+        """Delete a survey definition (no-op if it does not exist)."""
+
+    @abstractmethod
+    def append_responses(self, responses: List[Dict[str, Any]]) -> None:
+        """Store a batch of survey responses atomically."""
+
+    @abstractmethod
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over every survey response in insertion order."""
+
+    @abstractmethod
+    def query_responses(
+        self, filters: Dict[str, Any], cursor: Optional[int], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Retrieve one filtered page of survey responses and the next page's cursor."""
+
+    @abstractmethod
+    def scan_responses(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Retrieve up to `limit` responses stored from sequence number `cursor` on, including their `seq`.
+
+        The returned cursor always points past the last response, so it can be persisted as a checkpoint.
+        """
+
+    @abstractmethod
+    def answered_questions(self, survey_id: str, customer_id: str) -> List[Tuple[int, str]]:
+        """Retrieve the (question id, answer) pairs a customer has recorded in a survey, in answer order."""
+
+
+class InMemoryStorageEngine(StorageEngine):
+    """Process-local engine over the `mock_db` collections and the `SURVEYS` definitions."""
+
+    def __init__(self, data: Dict[str, Any], surveys: Dict[str, Dict[str, Any]], sessions: SessionStore):
+        """
+        Wrap the in-memory collections.
+
+        :param data: The `mock_db` dictionary; collections are looked up on every call.
+        :param surveys: Survey definitions keyed by survey id.
+        :param sessions: Store holding conversation state and leases.
+        """
+        self.data = data
+        self.surveys = surveys
+        self.sessions = sessions
+        # The data lives and dies with this instance
+        self.store_id = uuid.uuid4().hex
+
+    @property
+    def responses(self) -> ResponseStore:
+        return self.data["survey_responses"]
+
+    def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return self.data["customers"].get(customer_id)
+
+    def put_customers(self, customers: Dict[str, Dict[str, Any]]) -> None:
+        self.data["customers"].update(customers)
+
+    def get_survey(self, survey_id: str) -> Optional[Dict[str, Any]]:
+        return self.surveys.get(survey_id)
+
+    def list_surveys(self) -> List[Dict[str, Any]]:
+        return list(self.surveys.values())
+
+    def get_surveys(self, survey_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        return {survey_id: self.surveys[survey_id] for survey_id in survey_ids if survey_id in self.surveys}
+
+    def put_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        self.surveys[survey_id] = survey_data
+
+    def put_surveys(self, surveys: Dict[str, Dict[str, Any]]) -> None:
+        self.surveys.update(surveys)
+
+    def delete_survey(self, survey_id: str) -> None:
+        self.surveys.pop(survey_id, None)
+
+    def append_responses(self, responses: List[Dict[str, Any]]) -> None:
+        self.responses.extend(responses)
+
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.responses)
+
+    def query_responses(
+        self, filters: Dict[str, Any], cursor: Optional[int], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        return self.responses.query(filters, cursor, limit)
+
+    def scan_responses(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        return self.responses.scan(cursor, limit)
+
+    def answered_questions(self, survey_id: str, customer_id: str) -> List[Tuple[int, str]]:
+        return self.responses.answered_questions(survey_id, customer_id)
+
+
+class SQLiteStorageEngine(SQLiteDatabase, StorageEngine):
+    """
+    Durable engine backed by a SQLite file in WAL mode.
+
+    Responses live on disk with one covering index per query shape, so memory use does not
+    grow with the number of stored responses and a restarted worker serves them immediately.
+    Batches are written with a single `executemany` per transaction.
+    """
+
+    blocking = True
+    durable = True
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS storage_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS customers (
+            customer_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS surveys (
+            survey_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS survey_responses (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            survey_id TEXT,
+            customer_id TEXT NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer TEXT NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS responses_by_survey ON survey_responses (survey_id, seq)",
+        "CREATE INDEX IF NOT EXISTS responses_by_customer ON survey_responses (customer_id, seq)",
+        "CREATE INDEX IF NOT EXISTS responses_by_question ON survey_responses (survey_id, question_id, seq)",
+        "CREATE INDEX IF NOT EXISTS responses_by_survey_customer "
+        "ON survey_responses (survey_id, customer_id, seq, question_id)",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+        seed_surveys: Optional[Dict[str, Dict[str, Any]]] = None,
+        seed_customers: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        """
+        Open (and create if needed) the storage database.
+
+        :param path: Path of the SQLite file shared by the workers.
+        :param busy_timeout: Time (in seconds) to wait for another writer's lock.
+        :param seed_surveys: Survey definitions loaded the first time the database is created.
+        :param seed_customers: Customer profiles loaded the first time the database is created.
+        """
+        super().__init__(path, busy_timeout)
+        self.sessions = SQLiteSessionStore(path, busy_timeout)
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO storage_meta (key, value) VALUES ('store_id', ?)", (uuid.uuid4().hex,))
+            self.store_id = conn.execute("SELECT value FROM storage_meta WHERE key = 'store_id'").fetchone()[0]
+            seeded = conn.execute("INSERT OR IGNORE INTO storage_meta (key, value) VALUES ('seeded', '1')").rowcount
+            if seeded:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO surveys (survey_id, data) VALUES (?, ?)",
+                    [(survey_id, json.dumps(data)) for survey_id, data in (seed_surveys or {}).items()],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO customers (customer_id, data) VALUES (?, ?)",
+                    [(customer_id, json.dumps(data)) for customer_id, data in (seed_customers or {}).items()],
+                )
+
+    def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT data FROM customers WHERE customer_id = ?", (customer_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_customers(self, customers: Dict[str, Dict[str, Any]]) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO customers (customer_id, data) VALUES (?, ?)",
+                [(customer_id, json.dumps(data)) for customer_id, data in customers.items()],
+            )
+
+    def get_survey(self, survey_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT data FROM surveys WHERE survey_id = ?", (survey_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def list_surveys(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute("SELECT data FROM surveys ORDER BY rowid").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def get_surveys(self, survey_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        conn = self._connection()
+        for start in range(0, len(survey_ids), SQLITE_MAX_PARAMS):
+            chunk = survey_ids[start:start + SQLITE_MAX_PARAMS]
+            rows = conn.execute(
+                f"SELECT survey_id, data FROM surveys WHERE survey_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found.update((survey_id, json.loads(data)) for survey_id, data in rows)
+        return found
+
+    def put_survey(self, survey_id: str, survey_data: Dict[str, Any]) -> None:
+        self.put_surveys({survey_id: survey_data})
+
+    def put_surveys(self, surveys: Dict[str, Dict[str, Any]]) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO surveys (survey_id, data) VALUES (?, ?)",
+                [(survey_id, json.dumps(data)) for survey_id, data in surveys.items()],
+            )
+
+    def delete_survey(self, survey_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM surveys WHERE survey_id = ?", (survey_id,))
+
+    def append_responses(self, responses: List[Dict[str, Any]]) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO survey_responses (survey_id, customer_id, question_id, answer) VALUES (?, ?, ?, ?)",
+                [
+                    (response.get("survey_id"), response["customer_id"], response["question_id"], response["answer"])
+                    for response in responses
+                ],
+            )
+
+    @staticmethod
+    def _row_to_dict(row: Tuple) -> Dict[str, Any]:
+        return {"customer_id": row[1], "survey_id": row[0], "question_id": row[2], "answer": row[3]}
+
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        cursor = self._connection().execute(
+            "SELECT survey_id, customer_id, question_id, answer FROM survey_responses ORDER BY seq"
+        )
+        return (self._row_to_dict(row) for row in cursor)
+
+    def query_responses(
+        self, filters: Dict[str, Any], cursor: Optional[int], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Return one page of responses matching every filter, in insertion order.
+
+        One extra row is fetched to find the cursor of the next page.
+        """
+        clauses, params = ["seq >= ?"], [cursor or 0]
+        for field, column in RESPONSE_FILTER_COLUMNS.items():
+            if filters.get(field) is not None:
+                clauses.append(f"{column} = ?")
+                params.append(filters[field])
+        params.append(limit + 1)
+        rows = self._connection().execute(
+            "SELECT survey_id, customer_id, question_id, answer, seq FROM survey_responses "
+            f"WHERE {' AND '.join(clauses)} ORDER BY seq LIMIT ?",
+            params,
+        ).fetchall()
+        next_cursor = rows[limit][4] if len(rows) > limit else None
+        return [self._row_to_dict(row) for row in rows[:limit]], next_cursor
+
+    def scan_responses(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        rows = self._connection().execute(
+            "SELECT survey_id, customer_id, question_id, answer, seq FROM survey_responses "
+            "WHERE seq >= ? ORDER BY seq LIMIT ?",
+            (cursor, limit),
+        ).fetchall()
+        responses = [{**self._row_to_dict(row), "seq": row[4]} for row in rows]
+        return responses, rows[-1][4] + 1 if rows else cursor
+
+    def answered_questions(self, survey_id: str, customer_id: str) -> List[Tuple[int, str]]:
+        rows = self._connection().execute(
+            "SELECT question_id, answer FROM survey_responses WHERE survey_id = ? AND customer_id = ? ORDER BY seq",
+            (survey_id, customer_id),
+        ).fetchall()
+        return [(question_id, answer) for question_id, answer in rows]
+
+
+def create_storage_engine(data: Dict[str, Any], surveys: Dict[str, Dict[str, Any]]) -> StorageEngine:
+    """
+    Build the storage engine selected by the environment.
+
+    `SURVEY_STORAGE_BACKEND=sqlite` keeps customers, surveys, responses and sessions in the
+    file named by `SURVEY_STORAGE_DB` (default `survey.db`), seeded from `data` and `surveys`
+    on first use; otherwise they stay in process memory and sessions follow
+    `create_session_store`.
+    """
+    if os.environ.get("SURVEY_STORAGE_BACKEND", "memory") == "sqlite":
+        return SQLiteStorageEngine(
+            os.environ.get("SURVEY_STORAGE_DB", "survey.db"), seed_surveys=surveys, seed_customers=data["customers"]
+        )
+    return InMemoryStorageEngine(data, surveys, create_session_store(data["conversations"]))
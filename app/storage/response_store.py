@@ -0,0 +1,125 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class ResponseRecord:
+    """Compact, immutable-by-convention survey response record."""
+    __slots__ = ("seq", "survey_id", "customer_id", "question_id", "answer")
+
+    def __init__(self, seq: int, survey_id: Optional[str], customer_id: str, question_id: int, answer: str):
+        self.seq = seq
+        self.survey_id = survey_id
+        self.customer_id = customer_id
+        self.question_id = question_id
+        self.answer = answer
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the public representation of the response."""
+        return {
+            "customer_id": self.customer_id,
+            "survey_id": self.survey_id,
+            "question_id": self.question_id,
+            "answer": self.answer,
+        }
+
+
+class ResponseStore:
+    """
+    Append-only survey response store with secondary indexes.
+
+    Every index maps a key to the ascending list of record sequence numbers, so a filtered
+    page is served from the most selective index instead of scanning every response.
+    """
+
+    def __init__(self, responses: Iterable[Dict[str, Any]] = ()):
+        self._records: List[ResponseRecord] = []
+        self._by_survey: Dict[str, List[int]] = {}
+        self._by_customer: Dict[str, List[int]] = {}
+        self._by_question: Dict[Tuple[str, int], List[int]] = {}
+        self._by_survey_customer: Dict[Tuple[str, str], List[int]] = {}
+        self.extend(responses)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (record.to_dict() for record in self._records)
+
+    def append(self, response: Dict[str, Any]) -> ResponseRecord:
+        """Store a response and index it."""
+        seq = len(self._records)
+        record = ResponseRecord(
+            seq,
+            response.get("survey_id"),
+            response["customer_id"],
+            response["question_id"],
+            response["answer"],
+        )
+        self._records.append(record)
+        self._by_survey.setdefault(record.survey_id, []).append(seq)
+        self._by_customer.setdefault(record.customer_id, []).append(seq)
+        self._by_question.setdefault((record.survey_id, record.question_id), []).append(seq)
+        self._by_survey_customer.setdefault((record.survey_id, record.customer_id), []).append(seq)
+        return record
+
+    def extend(self, responses: Iterable[Dict[str, Any]]):
+        """Store a batch of responses."""
+        for response in responses:
+            self.append(response)
+
+    def _candidates(self, filters: Dict[str, Any]) -> Optional[List[int]]:
+        """Return the smallest posting list covering the filters, or None to scan everything."""
+        survey_id = filters.get("survey_id")
+        customer_id = filters.get("customer_id")
+        question_id = filters.get("question_id")
+        postings = []
+        if survey_id is not None and question_id is not None:
+            postings.append(self._by_question.get((survey_id, question_id), []))
+        if survey_id is not None and customer_id is not None:
+            postings.append(self._by_survey_customer.get((survey_id, customer_id), []))
+        if survey_id is not None:
+            postings.append(self._by_survey.get(survey_id, []))
+        if customer_id is not None:
+            postings.append(self._by_customer.get(customer_id, []))
+        return min(postings, key=len) if postings else None
+
+    def query(
+        self, filters: Dict[str, Any], cursor: Optional[int], limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Return one page of responses matching every filter, in insertion order.
+
+        :param filters: Values for any of survey_id, customer_id and question_id.
+        :param cursor: Sequence number to resume from, as returned by the previous page.
+        :param limit: Maximum number of responses in the page.
+        :return: The page and the cursor of the next page (None when exhausted).
+        """
+        start = cursor or 0
+        candidates = self._candidates(filters)
+        if candidates is None:
+            candidates = range(len(self._records))
+        position = bisect_left(candidates, start)
+        page = []
+        while position < len(candidates) and len(page) < limit:
+            record = self._records[candidates[position]]
+            position += 1
+            if all(getattr(record, field) == value for field, value in filters.items()):
+                page.append(record.to_dict())
+        next_cursor = candidates[position] if position < len(candidates) else None
+        return page, next_cursor
+
+    def scan(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Return up to `limit` responses stored from sequence number `cursor` on, with their `seq`.
+
+        :return: The responses and the cursor to continue from (unchanged when none are left).
+        """
+        records = self._records[cursor:cursor + limit]
+        return [{**record.to_dict(), "seq": record.seq} for record in records], cursor + len(records)
+
+    def answered_questions(self, survey_id: str, customer_id: str) -> List[Tuple[int, str]]:
+        """Return the (question id, answer) pairs a customer has recorded in a survey, in answer order."""
+        return [
+            (self._records[seq].question_id, self._records[seq].answer)
+            for seq in self._by_survey_customer.get((survey_id, customer_id), [])
+        ]
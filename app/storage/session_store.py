@@ -0,0 +1,245 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+from app.storage.sqlite import SQLiteDatabase
+
+
+class StateConflictError(Exception):
+    """Raised when a conversation state write is based on a stale version."""
+
+
+class SessionStore(ABC):
+    """
+    Conversation state and ownership leases shared by every worker.
+
+    Implementations are synchronous; `blocking` tells the async storage layer whether calls
+    must be moved off the event loop. `shared` stores are written by several worker processes.
+    """
+
+    blocking = False
+    shared = False
+
+    @abstractmethod
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the stored record of a conversation."""
+
+    @abstractmethod
+    def put(self, conversation_id: str, record: Dict[str, Any]) -> None:
+        """Store a full conversation record."""
+
+    @abstractmethod
+    def apply_delta(self, conversation_id: str, delta: Dict[str, Any], expected_version: int) -> int:
+        """
+        Apply a cursor update and append new answer references to a stored conversation.
+
+        :param delta: The `customer_id` and `survey_id`, the `current_question` and `completed`
+            cursor fields, and the `answers` ([question_id, answer] pairs) recorded since the last save.
+        :param expected_version: Version the writer last observed; 0 creates the conversation
+            if it was never stored.
+        :return: The new version of the conversation.
+        :raises StateConflictError: If another writer updated the conversation first.
+        """
+
+    @abstractmethod
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Take ownership of `key` for `ttl` seconds unless another owner holds a live lease."""
+
+    @abstractmethod
+    def renew_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Extend a lease still held by `owner`; returns False if it was lost."""
+
+    @abstractmethod
+    def release_lease(self, key: str, owner: str) -> None:
+        """Release a lease held by `owner` (no-op otherwise)."""
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local session store; only suitable for a single worker."""
+
+    def __init__(self, conversations: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.conversations = conversations if conversations is not None else {}
+        self.leases: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        return self.conversations.get(conversation_id)
+
+    def put(self, conversation_id: str, record: Dict[str, Any]) -> None:
+        self.conversations[conversation_id] = record
+
+    def apply_delta(self, conversation_id: str, delta: Dict[str, Any], expected_version: int) -> int:
+        record = self.conversations.get(conversation_id)
+        if record is None and expected_version == 0 and "customer_id" in delta:
+            record = self.conversations[conversation_id] = {
+                "customer_id": delta["customer_id"],
+                "survey_id": delta["survey_id"],
+                "version": 0,
+                "answers": [],
+            }
+        if record is None or record.get("version", 0) != expected_version:
+            raise StateConflictError(f"Conversation {conversation_id} was modified by another writer")
+        record["current_question"] = delta["current_question"]
+        record["completed"] = delta["completed"]
+        record.setdefault("answers", []).extend(delta.get("answers", []))
+        record["version"] = expected_version + 1
+        return record["version"]
+
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        holder = self.leases.get(key)
+        if holder is not None and holder[0] != owner and holder[1] > now:
+            return False
+        self.leases[key] = (owner, now + ttl)
+        return True
+
+    def renew_lease(self, key: str, owner: str, ttl: float) -> bool:
+        holder = self.leases.get(key)
+        if holder is None or holder[0] != owner:
+            return False
+        self.leases[key] = (owner, time.time() + ttl)
+        return True
+
+    def release_lease(self, key: str, owner: str) -> None:
+        holder = self.leases.get(key)
+        if holder is not None and holder[0] == owner:
+            del self.leases[key]
+
+
+class SQLiteSessionStore(SQLiteDatabase, SessionStore):
+    """
+    Session store backed by a SQLite file in WAL mode.
+
+    Every worker process on a node opens the same file, so a customer reconnecting to
+    another worker resumes the same conversation. Writes use `BEGIN IMMEDIATE` so version
+    checks and lease takeovers are atomic across processes.
+    """
+
+    blocking = True
+    shared = True
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS conversations (
+            conversation_id TEXT PRIMARY KEY,
+            customer_id TEXT NOT NULL,
+            survey_id TEXT NOT NULL,
+            current_question INTEGER,
+            completed INTEGER NOT NULL,
+            version INTEGER NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS conversation_answers (
+            conversation_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            answer TEXT NOT NULL,
+            PRIMARY KEY (conversation_id, seq)
+        )""",
+        """CREATE TABLE IF NOT EXISTS leases (
+            lease_key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )""",
+    )
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        with self._transaction("DEFERRED") as conn:
+            row = conn.execute(
+                "SELECT customer_id, survey_id, current_question, completed, version "
+                "FROM conversations WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            answers = conn.execute(
+                "SELECT question_id, answer FROM conversation_answers WHERE conversation_id = ? ORDER BY seq",
+                (conversation_id,),
+            ).fetchall()
+        return {
+            "customer_id": row[0],
+            "survey_id": row[1],
+            "current_question": row[2],
+            "completed": bool(row[3]),
+            "version": row[4],
+            "answers": [[question_id, answer] for question_id, answer in answers],
+        }
+
+    def put(self, conversation_id: str, record: Dict[str, Any]) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO conversations "
+                "(conversation_id, customer_id, survey_id, current_question, completed, version) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    conversation_id,
+                    record["customer_id"],
+                    record["survey_id"],
+                    record["current_question"],
+                    int(record["completed"]),
+                    record.get("version", 0),
+                ),
+            )
+            conn.execute("DELETE FROM conversation_answers WHERE conversation_id = ?", (conversation_id,))
+            conn.executemany(
+                "INSERT INTO conversation_answers (conversation_id, seq, question_id, answer) VALUES (?, ?, ?, ?)",
+                [(conversation_id, seq, question_id, answer) for seq, (question_id, answer) in enumerate(record.get("answers", []))],
+            )
+
+    def apply_delta(self, conversation_id: str, delta: Dict[str, Any], expected_version: int) -> int:
+        with self._transaction() as conn:
+            if expected_version == 0 and "customer_id" in delta:
+                conn.execute(
+                    "INSERT OR IGNORE INTO conversations "
+                    "(conversation_id, customer_id, survey_id, current_question, completed, version) "
+                    "VALUES (?, ?, ?, ?, ?, 0)",
+                    (conversation_id, delta["customer_id"], delta["survey_id"], delta["current_question"], 0),
+                )
+            updated = conn.execute(
+                "UPDATE conversations SET current_question = ?, completed = ?, version = version + 1 "
+                "WHERE conversation_id = ? AND version = ?",
+                (delta["current_question"], int(delta["completed"]), conversation_id, expected_version),
+            ).rowcount
+            if not updated:
+                raise StateConflictError(f"Conversation {conversation_id} was modified by another writer")
+            answers = delta.get("answers", [])
+            if answers:
+                (count,) = conn.execute(
+                    "SELECT COUNT(*) FROM conversation_answers WHERE conversation_id = ?", (conversation_id,)
+                ).fetchone()
+                conn.executemany(
+                    "INSERT INTO conversation_answers (conversation_id, seq, question_id, answer) VALUES (?, ?, ?, ?)",
+                    [(conversation_id, count + i, question_id, answer) for i, (question_id, answer) in enumerate(answers)],
+                )
+        return expected_version + 1
+
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE lease_key = ?", (key,)).fetchone()
+            if row is not None and row[0] != owner and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (lease_key, owner, expires_at) VALUES (?, ?, ?)", (key, owner, now + ttl)
+            )
+        return True
+
+    def renew_lease(self, key: str, owner: str, ttl: float) -> bool:
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE lease_key = ? AND owner = ?", (time.time() + ttl, key, owner)
+            ).rowcount
+        return bool(updated)
+
+    def release_lease(self, key: str, owner: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE lease_key = ? AND owner = ?", (key, owner))
+
+
+def create_session_store(conversations: Optional[Dict[str, Dict[str, Any]]] = None) -> SessionStore:
+    """
+    Build the session store selected by the environment.
+
+    `SURVEY_SESSION_BACKEND=sqlite` shares state across workers through the file named by
+    `SURVEY_SESSION_DB` (default `sessions.db`); otherwise state stays in process memory.
+    """
+    if os.environ.get("SURVEY_SESSION_BACKEND", "memory") == "sqlite":
+        return SQLiteSessionStore(os.environ.get("SURVEY_SESSION_DB", "sessions.db"))
+    return InMemorySessionStore(conversations)
@@ -0,0 +1,96 @@
+import asyncio
+import contextvars
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+# Time (in seconds) to wait for another writer's lock; well below the retrier's per-attempt
+# timeout (2 s), so a blocked write fails and is retried within its attempt
+DEFAULT_BUSY_TIMEOUT = 1.0
+
+# Set once the caller of the blocking call running in this context stopped waiting for it
+_call_abandoned: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "sqlite_call_abandoned", default=None
+)
+
+
+class StorageBusyError(ConnectionError):
+    """Raised when a write could not take the database lock, or was abandoned before it committed."""
+
+
+async def run_blocking_call(func, *args):
+    """
+    Run a blocking storage call in a thread.
+
+    Cancelling the awaiting task (e.g. on an attempt timeout) cannot stop the thread, so a
+    transaction that has not committed yet is rolled back instead: a retried write never
+    also commits in the background.
+    """
+    abandoned = threading.Event()
+    token = _call_abandoned.set(abandoned)
+    try:
+        return await asyncio.to_thread(func, *args)
+    except asyncio.CancelledError:
+        abandoned.set()
+        raise
+    finally:
+        _call_abandoned.reset(token)
+
+
+class SQLiteDatabase:
+    """
+    Thread-local SQLite connections in WAL mode, shared by the SQLite-backed stores.
+
+    Statements are issued as constant parameterized SQL, so each connection's statement
+    cache reuses the prepared statements across calls.
+    """
+
+    SCHEMA: Tuple[str, ...] = ()
+
+    def __init__(self, path: str, busy_timeout: float = DEFAULT_BUSY_TIMEOUT):
+        """
+        Open (and create if needed) the database.
+
+        :param path: Path of the SQLite file shared by the workers.
+        :param busy_timeout: Time (in seconds) to wait for another writer's lock.
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._transaction() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self, mode: str = "IMMEDIATE"):
+        """
+        Run the block in a transaction; IMMEDIATE takes the write lock up front.
+
+        :raises StorageBusyError: If the lock was not acquired within `busy_timeout`, or the
+            caller abandoned the call before it committed.
+        """
+        conn = self._connection()
+        try:
+            conn.execute(f"BEGIN {mode}")
+        except sqlite3.OperationalError as e:
+            raise StorageBusyError(f"SQLite database is busy: {e}") from e
+        try:
+            yield conn
+            abandoned = _call_abandoned.get()
+            if abandoned is not None and abandoned.is_set():
+                raise StorageBusyError("SQLite call abandoned by its caller before commit")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
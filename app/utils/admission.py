@@ -0,0 +1,144 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a worker is at its session limit and cannot queue another session."""
+
+
+class SessionInterruptedError(Exception):
+    """Base class of the reasons a live session stops waiting for the customer."""
+
+
+class SessionIdleTimeoutError(SessionInterruptedError):
+    """Raised when the customer sent nothing within the idle timeout."""
+
+
+class SessionSupersededError(SessionInterruptedError):
+    """Raised when the same customer opened a newer session."""
+
+
+def _wake(future: asyncio.Future):
+    """Resolve a waiter, possibly from another event loop's thread."""
+    def resolve():
+        if not future.done():
+            future.set_result(None)
+    try:
+        future.get_loop().call_soon_threadsafe(resolve)
+    except RuntimeError:
+        pass  # The waiter's event loop is already closed
+
+
+class SessionSlot:
+    """An admitted session; `superseded` resolves when a newer session of the customer arrives."""
+
+    def __init__(self, customer_id: str):
+        self.customer_id = customer_id
+        self.superseded: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._close_waiters: List[asyncio.Future] = []
+        self.released = False
+
+
+class SessionAdmission:
+    """
+    Bounds the chatbot sessions of a worker.
+
+    At most `max_sessions` sessions are active; up to `max_waiting` more wait (at most
+    `wait_timeout` seconds) for a free slot and any further session is rejected immediately.
+    Each customer keeps a single session: a new connection supersedes the previous one and
+    waits (at most `supersede_timeout` seconds) for it to checkpoint and close.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_waiting: int = 0,
+        wait_timeout: float = 5.0,
+        supersede_timeout: float = 5.0,
+    ):
+        """
+        Initialize the admission controller.
+
+        :param max_sessions: Maximum number of concurrently active sessions.
+        :param max_waiting: Maximum number of sessions queued for a free slot (0 rejects at once).
+        :param wait_timeout: Time (in seconds) a queued session waits before it is rejected.
+        :param supersede_timeout: Time (in seconds) to wait for a customer's previous session to close.
+        """
+        self.max_sessions = max_sessions
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.supersede_timeout = supersede_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._by_customer: Dict[str, SessionSlot] = {}
+        self._counters = {"admitted": 0, "rejected": 0, "superseded": 0}
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the admission counters and current occupancy."""
+        return {**self._counters, "active": self.active, "waiting": self.waiting}
+
+    async def _supersede(self, customer_id: str):
+        """Interrupt the customer's previous session and wait for it to close."""
+        previous = self._by_customer.get(customer_id)
+        if previous is None:
+            return
+        self._counters["superseded"] += 1
+        closed = asyncio.get_running_loop().create_future()
+        previous._close_waiters.append(closed)
+        _wake(previous.superseded)
+        try:
+            await asyncio.wait_for(closed, self.supersede_timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _wait_for_slot(self):
+        """Queue for a free slot, or raise AdmissionRejectedError."""
+        if len(self._waiters) >= self.max_waiting:
+            raise AdmissionRejectedError("Session limit reached")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.wait_timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejectedError("Timed out waiting for a session slot")
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    async def acquire(self, customer_id: str) -> SessionSlot:
+        """
+        Admit a session of `customer_id`.
+
+        :raises AdmissionRejectedError: If no slot frees up in time.
+        """
+        await self._supersede(customer_id)
+        try:
+            while self.active >= self.max_sessions:
+                await self._wait_for_slot()
+        except AdmissionRejectedError:
+            self._counters["rejected"] += 1
+            raise
+        self.active += 1
+        self._counters["admitted"] += 1
+        slot = SessionSlot(customer_id)
+        self._by_customer[customer_id] = slot
+        return slot
+
+    def release(self, slot: SessionSlot):
+        """Free the slot of a finished session and wake the next queued session."""
+        if slot.released:
+            return
+        slot.released = True
+        self.active -= 1
+        if self._by_customer.get(slot.customer_id) is slot:
+            del self._by_customer[slot.customer_id]
+        for waiter in slot._close_waiters:
+            _wake(waiter)
+        if self._waiters:
+            _wake(self._waiters.popleft())
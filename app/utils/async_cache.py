@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class AsyncTTLCache:
+    """
+    Bounded async cache with TTL expiry, LRU eviction, negative caching and single-flight loads.
+
+    A loader returning None is cached as a negative entry for `negative_ttl` seconds.
+    Loader exceptions are propagated to every waiter and never cached.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 60.0,
+        negative_ttl: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the cache.
+
+        :param max_size: Maximum number of entries kept before evicting the least recently used.
+        :param ttl: Lifetime (in seconds) of positive entries.
+        :param negative_ttl: Lifetime (in seconds) of negative (None) entries.
+        :param clock: Monotonic clock, overridable for tests.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._counters = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the hit/miss/eviction counters and current size."""
+        return {**self._counters, "size": len(self._entries)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a fresh entry is cached for `key`."""
+        return self._lookup(key)[0]
+
+    def _lookup(self, key: Hashable):
+        """Return (found, value) for a fresh entry, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._counters["expirations"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting least recently used entries when full."""
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self._entries[key] = (value, self._clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, loading it at most once across concurrent callers.
+
+        :param key: Cache key.
+        :param loader: Coroutine function producing the value on a miss.
+        """
+        found, value = self._lookup(key)
+        if found:
+            self._counters["hits" if value is not None else "negative_hits"] += 1
+            return value
+
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+        if task is not None and task.get_loop() is loop:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        self._counters["misses"] += 1
+        task = loop.create_task(loader())
+        self._in_flight[key] = task
+
+        def on_done(done: asyncio.Task):
+            if self._in_flight.get(key) is done:
+                del self._in_flight[key]
+            if not done.cancelled() and done.exception() is None:
+                self.set(key, done.result())
+
+        task.add_done_callback(on_done)
+        # Shield the shared load so one cancelled caller does not fail the others
+        return await asyncio.shield(task)
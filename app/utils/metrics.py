@@ -0,0 +1,246 @@
+import os
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Default latency buckets (in seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a Prometheus label set."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """Base class of labelled metrics; every update is a no-op while the registry is disabled."""
+    type = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str, labelnames: Iterable[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Return the exposition lines of every series."""
+
+    @abstractmethod
+    def reset(self):
+        """Drop every recorded value."""
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        """Increase the value of the labelled series."""
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of the labelled series."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in self._values.items()]
+
+    def reset(self):
+        self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str):
+        """Decrease the value of the labelled series."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        """Set the value of the labelled series."""
+        if not self.registry.enabled:
+            return
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """Cumulative bucketed histogram."""
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str):
+        """Record one observation in the labelled series."""
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        """Return the number of observations in the labelled series."""
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (bucket_counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def reset(self):
+        self._series.clear()
+
+
+class CallbackGauge(Metric):
+    """Gauge whose labelled values are read from a callback at scrape time."""
+    type = "gauge"
+
+    def __init__(self, *args, callback: Callable[[], Dict[Tuple[str, ...], float]], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in self.callback().items()]
+
+    def reset(self):
+        pass
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help, labelnames, buckets=buckets))
+
+    def callback_gauge(
+        self, name: str, help: str, callback: Callable[[], Dict[Tuple[str, ...], float]], labelnames: Iterable[str] = ()
+    ) -> CallbackGauge:
+        return self._register(CallbackGauge(self, name, help, labelnames, callback=callback))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def reset(self):
+        """Clear every recorded value (metric definitions are kept)."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry; set METRICS_ENABLED=0 to turn every update into a no-op
+registry = MetricsRegistry(enabled=os.environ.get("METRICS_ENABLED", "1") != "0")
+
+storage_call_seconds = registry.histogram(
+    "survey_storage_call_seconds",
+    "Duration of storage operations, including retries.",
+    ("operation", "outcome"),
+)
+storage_call_attempts = registry.histogram(
+    "survey_storage_call_attempts",
+    "Number of attempts per storage operation.",
+    ("operation",),
+    buckets=(1, 2, 3, 5),
+)
+storage_queue_wait_seconds = registry.histogram(
+    "survey_storage_queue_wait_seconds",
+    "Time storage calls waited for a scheduler slot, by priority class.",
+    ("priority",),
+)
+chatbot_turn_seconds = registry.histogram(
+    "chatbot_turn_seconds",
+    "Time from receiving a customer's message to sending the chatbot's reply.",
+)
+chatbot_active_sessions = registry.gauge(
+    "chatbot_active_sessions",
+    "Chatbot WebSocket sessions currently open.",
+)
+chatbot_session_resumes = registry.counter(
+    "chatbot_session_resumes_total",
+    "Reconnects presenting a resume token, by path taken (fast or full bootstrap).",
+    ("path",),
+)
+chatbot_idle_sessions_closed = registry.counter(
+    "chatbot_idle_sessions_closed_total",
+    "Chatbot sessions closed after the idle timeout.",
+)
+chatbot_surveys_completed = registry.counter(
+    "chatbot_surveys_completed_total",
+    "Surveys completed through the chatbot.",
+)
+survey_responses_exported = registry.counter(
+    "survey_responses_exported_total",
+    "Survey responses written to the columnar export.",
+)
+chatbot_surveys_abandoned = registry.counter(
+    "chatbot_surveys_abandoned_total",
+    "Chatbot sessions that disconnected before completing their survey.",
+)
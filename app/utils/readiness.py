@@ -0,0 +1,28 @@
+from typing import Any, Dict, Optional
+
+
+class Readiness:
+    """Whether this worker has finished warming up and should receive traffic."""
+
+    def __init__(self):
+        self.ready = False
+        self.status = "starting"
+        self.details: Dict[str, Any] = {}
+
+    def mark_ready(self, details: Optional[Dict[str, Any]] = None):
+        """Report the worker as ready, with a summary of its warm-up."""
+        self.ready = True
+        self.status = "ready"
+        self.details = details or {}
+
+    def mark_not_ready(self, status: str):
+        """Stop routing traffic to the worker (e.g. "warming_up" or "shutting_down")."""
+        self.ready = False
+        self.status = status
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"status": self.status, **self.details}
+
+
+# Readiness of this worker, reported by the health endpoints
+readiness = Readiness()
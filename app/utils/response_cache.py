@@ -0,0 +1,68 @@
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A serialized JSON response body and its entity tag."""
+    body: bytes
+    etag: str
+
+
+def serialize(payload: Any) -> CachedBody:
+    """Serialize a payload to compact JSON and derive its strong ETag from the content."""
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return CachedBody(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+class VersionedBodyCache:
+    """
+    Serialized response bodies, each valid while its resource version is unchanged.
+
+    Versions are bumped by this worker's write paths; `ttl` bounds how long a body may hide
+    a write made through another worker.
+    """
+
+    def __init__(self, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+
+        :param ttl: Maximum age (in seconds) of a cached body.
+        :param clock: Monotonic time source (injectable for tests).
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: Dict[Hashable, Tuple[int, float, CachedBody]] = {}
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedBody]:
+        """Return the cached body if it was built for `version` and has not expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version or self.clock() - entry[1] > self.ttl:
+            return None
+        return entry[2]
+
+    def put(self, key: Hashable, version: int, payload: Any) -> CachedBody:
+        """
+        Serialize and cache a payload.
+
+        :param version: The version observed before the payload was fetched; a body built from
+            data a concurrent write may have changed is never served for the newer version.
+        """
+        cached = serialize(payload)
+        self._entries[key] = (version, self.clock(), cached)
+        return cached
+
+    def clear(self):
+        """Drop every cached body."""
+        self._entries.clear()
@@ -0,0 +1,243 @@
+import asyncio
+import fcntl
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from app.utils.metrics import survey_responses_exported
+
+# pyarrow is optional: without it the export falls back to gzipped JSON columns
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns of every exported file; survey_id and date are encoded in the partition path
+EXPORT_COLUMNS = ("seq", "customer_id", "question_id", "answer")
+
+# Partition value of responses stored without a survey id (the Hive convention)
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# File suffix of every export format
+FORMAT_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "json": ".columns.json.gz"}
+
+CHECKPOINT_FILE = "_checkpoint.json"
+LOCK_FILE = "_export.lock"
+
+
+def resolve_format(export_format: str) -> str:
+    """
+    Pick the file format: "auto" is Parquet when pyarrow is installed, column-oriented gzipped JSON otherwise.
+
+    :raises ValueError: If the format is unknown or needs pyarrow and it is not installed.
+    """
+    if export_format == "auto":
+        return "parquet" if pyarrow is not None else "json"
+    if export_format not in FORMAT_SUFFIXES:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if export_format != "json" and pyarrow is None:
+        raise ValueError(f"The {export_format} export format requires pyarrow")
+    return export_format
+
+
+def write_columns(path: str, columns: Dict[str, List[Any]], export_format: str):
+    """Write one file of columns, atomically (readers never see a partial file)."""
+    tmp_path = f"{path}.tmp"
+    if export_format == "json":
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"columns": columns}, f, separators=(",", ":"))
+    else:
+        schema = pyarrow.schema([
+            ("seq", pyarrow.int64()),
+            ("customer_id", pyarrow.string()),
+            ("question_id", pyarrow.int64()),
+            ("answer", pyarrow.string()),
+        ])
+        table = pyarrow.Table.from_pydict(columns, schema=schema)
+        if export_format == "parquet":
+            pyarrow.parquet.write_table(table, tmp_path, compression="zstd")
+        else:
+            # Uncompressed Arrow IPC files can be memory-mapped without decoding
+            with pyarrow.OSFile(tmp_path, "wb") as sink, pyarrow.ipc.new_file(sink, schema) as writer:
+                writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+class ResponseExporter:
+    """
+    Background export of stored survey responses to columnar files for offline analytics.
+
+    Each run scans the responses committed since the last checkpoint in pages of `batch_size`
+    and writes every page as one file per survey under
+    `<directory>/survey_id=<survey>/date=<export date>/part-<first seq>.<format>`, then
+    advances the checkpoint. A file lock keeps concurrent workers from exporting the same
+    responses twice. The checkpoint records the store it indexes; a directory holding the
+    export of another store is never written to.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        store_id: str,
+        scan_func: Callable[[int, int], Awaitable[Tuple[List[Dict[str, Any]], int]]],
+        export_format: str = "auto",
+        batch_size: int = 10_000,
+        interval: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the exporter.
+
+        :param directory: Root directory of the partitioned export.
+        :param store_id: Identity of the store the responses are read from.
+        :param scan_func: Coroutine function returning the responses stored from a cursor on and the next cursor.
+        :param export_format: "parquet", "arrow", "json" or "auto".
+        :param batch_size: Maximum number of responses read (and held in memory) per page.
+        :param interval: Time (in seconds) between two background runs.
+        :param clock: Source of the export timestamps, for tests.
+        :raises ValueError: If the export format is not available.
+        """
+        self.directory = directory
+        self.store_id = store_id
+        self.scan_func = scan_func
+        self.export_format = resolve_format(export_format)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.clock = clock
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.directory, CHECKPOINT_FILE)
+
+    def read_checkpoint(self) -> int:
+        """
+        Return the cursor of the first response not exported yet.
+
+        :raises ValueError: If the checkpoint belongs to another store, whose cursors mean nothing here.
+        """
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return 0
+        if checkpoint.get("store_id") != self.store_id:
+            raise ValueError(f"{self.directory} holds the export of another store; export to a new directory")
+        return checkpoint["cursor"]
+
+    def _write_checkpoint(self, cursor: int):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"store_id": self.store_id, "cursor": cursor, "exported_at": self.clock()}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _write_page(self, responses: List[Dict[str, Any]]) -> List[str]:
+        """Write a page of responses as one file per survey and return the file paths."""
+        date = datetime.fromtimestamp(self.clock(), timezone.utc).strftime("%Y-%m-%d")
+        by_survey: Dict[Optional[str], Dict[str, List[Any]]] = {}
+        for response in responses:
+            columns = by_survey.get(response["survey_id"])
+            if columns is None:
+                columns = by_survey[response["survey_id"]] = {column: [] for column in EXPORT_COLUMNS}
+            for column in EXPORT_COLUMNS:
+                columns[column].append(response[column])
+        paths = []
+        for survey_id, columns in by_survey.items():
+            partition = NULL_PARTITION if survey_id is None else quote(survey_id, safe="")
+            partition_dir = os.path.join(self.directory, f"survey_id={partition}", f"date={date}")
+            os.makedirs(partition_dir, exist_ok=True)
+            path = os.path.join(partition_dir, f"part-{columns['seq'][0]:012d}{FORMAT_SUFFIXES[self.export_format]}")
+            write_columns(path, columns, self.export_format)
+            paths.append(path)
+        return paths
+
+    async def export_once(self) -> int:
+        """
+        Export every response committed since the checkpoint.
+
+        :return: The number of responses exported (0 if another worker is exporting).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILE), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            exported = 0
+            cursor = self.read_checkpoint()
+            while True:
+                responses, next_cursor = await self.scan_func(cursor, self.batch_size)
+                if not responses:
+                    break
+                # File writes and compression stay off the event loop
+                await asyncio.to_thread(self._write_page, responses)
+                await asyncio.to_thread(self._write_checkpoint, next_cursor)
+                survey_responses_exported.inc(len(responses))
+                exported += len(responses)
+                cursor = next_cursor
+                if len(responses) < self.batch_size:
+                    break
+            return exported
+
+    async def _run(self):
+        while True:
+            try:
+                exported = await self.export_once()
+                if exported:
+                    logger.info(f"Exported {exported} survey responses to {self.directory}")
+            except (ConnectionError, OSError) as e:
+                logger.warning(f"Survey response export failed: {e}. Retrying in {self.interval}s.")
+            except ValueError as e:
+                logger.error(f"Survey response export skipped: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Run the export every `interval` seconds in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the background export."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_response_exporter(scan_func, store_id: Optional[str]) -> Optional[ResponseExporter]:
+    """
+    Build the exporter configured by the environment, or None when `RESPONSE_EXPORT_DIR` is unset.
+
+    `RESPONSE_EXPORT_FORMAT` (default "auto"), `RESPONSE_EXPORT_INTERVAL` (seconds, default 300)
+    and `RESPONSE_EXPORT_BATCH_SIZE` (default 10000) tune the export.
+
+    :param store_id: Identity of the store exported from, or None if it is not durable: process
+        memory restarts its sequence numbers and differs per worker, so it is not exported.
+    """
+    directory = os.environ.get("RESPONSE_EXPORT_DIR")
+    if not directory:
+        return None
+    if store_id is None:
+        logger.warning("Response export requires a durable storage engine (SURVEY_STORAGE_BACKEND=sqlite); disabled.")
+        return None
+    return ResponseExporter(
+        directory,
+        store_id,
+        scan_func,
+        export_format=os.environ.get("RESPONSE_EXPORT_FORMAT", "auto"),
+        batch_size=int(os.environ.get("RESPONSE_EXPORT_BATCH_SIZE", "10000")),
+        interval=float(os.environ.get("RESPONSE_EXPORT_INTERVAL", "300")),
+    )
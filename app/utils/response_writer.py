@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ResponseQueueFullError(ConnectionError):
+    """Raised when the write-behind queue is full and could not be drained."""
+
+
+class ResponseBatchWriter:
+    """
+    Write-behind pipeline for survey responses.
+
+    Responses are acknowledged as soon as they are queued in memory and are flushed
+    to storage in batches, either when `batch_size` responses are pending or every
+    `flush_interval` seconds. A failed or cancelled flush puts the batch back at the
+    head of the queue so it is retried by the next flush.
+    """
+
+    def __init__(
+        self,
+        flush_func: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_pending: int = 10_000,
+        flush_on_shutdown: bool = True,
+    ):
+        """
+        Initialize the writer.
+
+        :param flush_func: Coroutine function persisting a batch of responses.
+        :param batch_size: Number of pending responses that triggers an immediate flush.
+        :param flush_interval: Maximum time (in seconds) a response waits before being flushed.
+        :param max_pending: Queue bound; producers flush inline (backpressure) when it is reached.
+        :param flush_on_shutdown: Whether `close()` drains the queue before returning.
+        """
+        self.flush_func = flush_func
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flush_on_shutdown = flush_on_shutdown
+        self._buffer: List[Dict[str, Any]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        # Background flushes in flight; the event loop only keeps weak references to tasks
+        self._flushes: Set[asyncio.Task] = set()
+        self._counters = {"submitted": 0, "flushed": 0, "batches": 0, "failed_flushes": 0}
+
+    @property
+    def pending(self) -> int:
+        """Number of responses waiting to be flushed."""
+        return len(self._buffer)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the pipeline counters."""
+        return {**self._counters, "pending": self.pending}
+
+    def _ensure_flusher(self):
+        """Start the periodic flusher on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            self._flusher = loop.create_task(self._run_periodic_flush())
+
+    async def _run_periodic_flush(self):
+        """Flush pending responses every `flush_interval` seconds."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._buffer:
+                # Shielded so that stopping the flusher never interrupts a write in progress
+                await asyncio.shield(self._start_flush())
+
+    def _start_flush(self) -> asyncio.Task:
+        """Flush in a background task that `close()` waits for."""
+        task = asyncio.get_running_loop().create_task(self._flush_quietly())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+        return task
+
+    async def submit(self, response: Dict[str, Any]):
+        """
+        Queue a response for writing.
+
+        :raises ResponseQueueFullError: If the queue is full and an inline flush failed.
+        """
+        self._ensure_flusher()
+        if len(self._buffer) >= self.max_pending:
+            try:
+                await self.flush()
+            except ConnectionError:
+                raise ResponseQueueFullError("Survey response queue is full")
+        self._buffer.append(response)
+        self._counters["submitted"] += 1
+        if len(self._buffer) >= self.batch_size:
+            self._start_flush()
+
+    async def _flush_quietly(self):
+        """Flush in the background, leaving failed batches queued."""
+        try:
+            await self.flush()
+        except ConnectionError:
+            pass  # Already logged; the batch stays queued for the next round
+
+    async def flush(self) -> int:
+        """
+        Write every pending response in one batch.
+
+        :return: The number of responses written.
+        :raises: The storage error (or cancellation) if the batch could not be written;
+            the batch is re-queued.
+        """
+        if not self._buffer:
+            return 0
+        batch, self._buffer = self._buffer, []
+        try:
+            await self.flush_func(batch)
+        except BaseException as e:
+            self._buffer[:0] = batch
+            if isinstance(e, ConnectionError):
+                self._counters["failed_flushes"] += 1
+                logger.warning(f"Failed to flush {len(batch)} survey responses: {e}")
+            raise
+        self._counters["flushed"] += len(batch)
+        self._counters["batches"] += 1
+        return len(batch)
+
+    async def close(self):
+        """Stop the periodic flusher, wait for flushes in progress and, if configured, drain the queue."""
+        loop = asyncio.get_running_loop()
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None and not flusher.done():
+            flusher.cancel()
+            if flusher.get_loop() is loop:
+                await asyncio.gather(flusher, return_exceptions=True)
+        in_flight = [task for task in self._flushes if task.get_loop() is loop]
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        if self.flush_on_shutdown and self._buffer:
+            await self.flush()
@@ -0,0 +1,72 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class ResumeToken:
+    """Claims of a conversation snapshot handed to the client."""
+    conversation_id: str
+    survey_fingerprint: str
+    current_question: int
+    version: int
+    issued_at: float
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class ResumeTokenSigner:
+    """Issues and verifies HMAC-SHA256 signed resume tokens."""
+
+    def __init__(self, secret: bytes, ttl: float = 24 * 3600, clock: Callable[[], float] = time.time):
+        """
+        Initialize the signer.
+
+        :param secret: Key shared by every worker that must accept the tokens.
+        :param ttl: Time (in seconds) a token stays valid after it is issued.
+        :param clock: Wall-clock time source (injectable for tests).
+        """
+        self.secret = secret
+        self.ttl = ttl
+        self.clock = clock
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self.secret, payload.encode(), hashlib.sha256).digest())
+
+    def issue(self, conversation_id: str, survey_fingerprint: str, current_question: int, version: int) -> str:
+        """Return a token for the given conversation snapshot."""
+        claims = [conversation_id, survey_fingerprint, current_question, version, int(self.clock())]
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token: str) -> Optional[ResumeToken]:
+        """Return the claims of a valid token, or None if it is malformed, forged or expired."""
+        payload, _, signature = token.partition(".")
+        if not signature or not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        try:
+            claims = ResumeToken(*json.loads(_b64decode(payload)))
+        except (ValueError, TypeError):
+            return None
+        if self.clock() - claims.issued_at > self.ttl:
+            return None
+        return claims
+
+
+# Workers must share RESUME_TOKEN_SECRET to accept each other's tokens; without it every
+# process signs with its own random key
+resume_tokens = ResumeTokenSigner(
+    os.environ["RESUME_TOKEN_SECRET"].encode() if os.environ.get("RESUME_TOKEN_SECRET") else secrets.token_bytes(32)
+)
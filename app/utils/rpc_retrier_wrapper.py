@@ -1,40 +1,306 @@
 import asyncio
+import contextvars
+import inspect
 import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+from app.utils.metrics import registry, storage_call_attempts, storage_call_seconds
+from app.utils.storage_scheduler import BULK, INTERACTIVE, PriorityClass, SchedulerTimeoutError, StorageScheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Absolute (monotonic) deadline of the request currently being served, if any
+_request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class RPCTimeoutError(ConnectionError):
+    """Raised when a single RPC attempt exceeds its timeout."""
+
+
+class DeadlineExceededError(ConnectionError):
+    """Raised when the caller's overall time budget is exhausted."""
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without calling the backend while an operation's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-operation circuit breaker that fails fast while a backend is down.
+
+    Once `reset_timeout` has passed, the circuit is half-open: a single trial call is let
+    through and every other call keeps failing fast until the trial succeeds (closing the
+    circuit) or fails (re-opening it).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        """
+        Initialize the breaker.
+
+        :param failure_threshold: Consecutive failures that open the circuit.
+        :param reset_timeout: Time (in seconds) before a half-open trial call is allowed.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # Start of the half-open trial call in flight; a trial that never resolves expires after reset_timeout
+        self.trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """Return "closed", "open" or "half_open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted right now; while half-open, only the trial call is."""
+        state = self.state
+        if state != "half_open":
+            return state == "closed"
+        now = time.monotonic()
+        if self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout:
+            return False
+        self.trial_started_at = now
+        return True
+
+    def end_trial(self):
+        """Let another trial call through after one ended without telling whether the backend is up."""
+        self.trial_started_at = None
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self):
+        """Count a failure, opening (or re-opening) the circuit at the threshold."""
+        self.failures += 1
+        self.trial_started_at = None
+        if self.failures >= self.failure_threshold or self.state == "half_open":
+            self.opened_at = time.monotonic()
+
+
 class RPCRetrier:
     """A utility class to handle retry logic for RPC calls."""
-    def __init__(self, max_retries: int = 3, retry_delay: int = 1):
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_delay: float = 1,
+        max_delay: float = 5.0,
+        call_timeout: Optional[float] = None,
+        hedge_operations: Iterable[str] = (),
+        hedge_delay: float = 0.3,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        scheduler: Optional[StorageScheduler] = None,
+    ):
         """
         Initialize the retrier with retry configuration.
 
         :param max_retries: Maximum number of retry attempts.
-        :param retry_delay: Delay (in seconds) between retries.
+        :param retry_delay: Base delay (in seconds) of the exponential backoff between retries.
+        :param max_delay: Upper bound (in seconds) of a single backoff.
+        :param call_timeout: Timeout (in seconds) of a single attempt, or None for no timeout.
+        :param hedge_operations: Names of idempotent operations that may be hedged.
+        :param hedge_delay: Time (in seconds) before a hedged operation sends a second request.
+        :param failure_threshold: Consecutive failures that open an operation's circuit.
+        :param reset_timeout: Time (in seconds) an open circuit waits before a trial call.
+        :param scheduler: Scheduler every attempt must get a slot from, by the caller's priority class.
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_delay = max_delay
+        self.call_timeout = call_timeout
+        self.hedge_operations = frozenset(hedge_operations)
+        self.hedge_delay = hedge_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.scheduler = scheduler
+
+    @staticmethod
+    @contextmanager
+    def deadline(seconds: float):
+        """
+        Bound every RPC made inside the block (including retries) by a time budget.
+
+        Nested deadlines never extend an outer one.
+        """
+        deadline = time.monotonic() + seconds
+        outer = _request_deadline.get()
+        if outer is not None:
+            deadline = min(deadline, outer)
+        token = _request_deadline.set(deadline)
+        try:
+            yield
+        finally:
+            _request_deadline.reset(token)
+
+    def breaker(self, operation: str) -> CircuitBreaker:
+        """Return the circuit breaker of an operation."""
+        breaker = self.breakers.get(operation)
+        if breaker is None:
+            breaker = self.breakers[operation] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (zero-based) attempt."""
+        return random.uniform(0, min(self.max_delay, self.retry_delay * 2 ** attempt))
+
+    @staticmethod
+    def _remaining() -> Optional[float]:
+        """Seconds left before the request deadline, or None without one."""
+        deadline = _request_deadline.get()
+        return None if deadline is None else deadline - time.monotonic()
+
+    def _attempt_timeout(self) -> Optional[float]:
+        """Timeout of the next attempt: the per-call timeout, capped by the request deadline."""
+        remaining = self._remaining()
+        if remaining is None:
+            return self.call_timeout
+        return remaining if self.call_timeout is None else min(self.call_timeout, remaining)
+
+    async def _attempt(self, invoke, func, args, kwargs):
+        """Run one attempt, holding a scheduler slot (waited for within the request deadline) while it runs."""
+        if self.scheduler is None:
+            return await invoke(func, args, kwargs, self._attempt_timeout())
+        async with self.scheduler.slot(timeout=self._remaining()):
+            return await invoke(func, args, kwargs, self._attempt_timeout())
+
+    async def _invoke(self, func, args, kwargs, timeout: Optional[float]):
+        """Run one attempt, awaiting coroutine results under the attempt timeout."""
+        result = func(*args, **kwargs)
+        if inspect.isawaitable(result):
+            if timeout is None:
+                result = await result
+            else:
+                try:
+                    result = await asyncio.wait_for(result, timeout)
+                except asyncio.TimeoutError:
+                    raise RPCTimeoutError(f"RPC call timed out after {timeout:.2f}s")
+        return result
+
+    async def _hedged_invoke(self, func, args, kwargs, timeout: Optional[float]):
+        """Run one attempt, sending a second request if the first is slower than `hedge_delay`."""
+        first = asyncio.ensure_future(self._invoke(func, args, kwargs, timeout))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay)
+            if done:
+                return first.result()
+            pending.add(asyncio.ensure_future(self._invoke(func, args, kwargs, timeout)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def call(self, func, *args, **kwargs):
         """
         Execute the given function with retry logic.
 
-        :param func: The function to execute.
+        Attempts are bounded by the per-call timeout and the request deadline, retries back off
+        exponentially with jitter, idempotent operations listed in `hedge_operations` are hedged,
+        and calls fail fast with CircuitOpenError while the operation's circuit is open.
+
+        :param func: The function to execute. Coroutine functions are awaited.
         :param args: Positional arguments for the function.
         :param kwargs: Keyword arguments for the function.
         :return: The result of the function if successful.
         :raises: The last exception if all retries fail.
         """
-        for attempt in range(self.max_retries):
-            try:
-                return func(*args, **kwargs)
-            except ConnectionError as e:
-                if attempt < self.max_retries - 1:
+        operation = getattr(func, "__name__", repr(func))
+        breaker = self.breaker(operation)
+        invoke = self._hedged_invoke if operation in self.hedge_operations else self._invoke
+        start = time.perf_counter()
+        attempts, outcome = 0, "error"
+        try:
+            for attempt in range(self.max_retries):
+                trial = breaker.state == "half_open"
+                if not breaker.allow():
+                    raise CircuitOpenError(f"Circuit open for {operation}")
+                remaining = self._remaining()
+                if remaining is not None and remaining <= 0:
+                    raise DeadlineExceededError(f"Deadline exceeded before calling {operation}")
+                try:
+                    attempts += 1
+                    result = await self._attempt(invoke, func, args, kwargs)
+                    breaker.record_success()
+                    outcome = "success"
+                    return result
+                except SchedulerTimeoutError as e:
+                    # Waiting for a slot says nothing about the backend's health
+                    if trial:
+                        breaker.end_trial()
+                    raise DeadlineExceededError(f"Deadline exceeded waiting to call {operation}") from e
+                except ConnectionError as e:
+                    breaker.record_failure()
+                    if attempt == self.max_retries - 1:
+                        logger.error(f"RPC call failed after {self.max_retries} attempts: {e}")
+                        raise
+                    delay = self.backoff(attempt)
+                    remaining = self._remaining()
+                    if remaining is not None and delay >= remaining:
+                        logger.error(f"RPC call failed and the request deadline leaves no time to retry: {e}")
+                        raise DeadlineExceededError(f"Deadline exceeded while calling {operation}") from e
                     logger.warning(f"RPC call failed: {e}. Retrying... ({attempt + 1}/{self.max_retries})")
-                    await asyncio.sleep(self.retry_delay)
-                else:
-                    logger.error(f"RPC call failed after {self.max_retries} attempts: {e}")
+                    await asyncio.sleep(delay)
+                except BaseException:
+                    # E.g. cancelled, or an application error such as a version conflict
+                    if trial:
+                        breaker.end_trial()
                     raise
-                
\ No newline at end of file
+        finally:
+            if registry.enabled:
+                storage_call_seconds.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+                storage_call_attempts.observe(attempts, operation=operation)
+
+
+# Storage call slots shared by every service: chatbot sessions run in the interactive class;
+# admin endpoints and background jobs opt into the bulk class with `storage_scheduler.priority(BULK)`
+STORAGE_MAX_CONCURRENCY = int(os.environ.get("STORAGE_MAX_CONCURRENCY", "256"))
+storage_scheduler = StorageScheduler(
+    capacity=STORAGE_MAX_CONCURRENCY,
+    classes={
+        INTERACTIVE: PriorityClass(limit=STORAGE_MAX_CONCURRENCY, weight=9),
+        BULK: PriorityClass(limit=int(os.environ.get("STORAGE_BULK_CONCURRENCY", "4")), weight=1),
+    },
+)
+registry.callback_gauge(
+    "survey_storage_scheduler_calls",
+    "Storage calls running or queued in the scheduler, by priority class.",
+    lambda: {
+        (priority, state): value
+        for priority, counts in storage_scheduler.stats.items()
+        for state, value in counts.items()
+    },
+    ("priority", "state"),
+)
+
+# Shared retrier used by every service
+retrier = RPCRetrier(
+    max_retries=3,
+    retry_delay=0.1,
+    max_delay=1.0,
+    call_timeout=2.0,
+    hedge_operations={"get_survey_info", "get_survey_questions", "get_customer_info"},
+    hedge_delay=0.4,
+    scheduler=storage_scheduler,
+)
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi import WebSocket, WebSocketDisconnect
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marker queued to a channel whose session was closed by the client or the connection
+_DISCONNECTED = object()
+
+
+class MuxChannel:
+    """
+    One logical chatbot session carried by a multiplexed connection.
+
+    Exposes the part of the WebSocket interface the chatbot uses (`accept`, `send_text`,
+    `receive_text`, `close`), so sessions run the regular chatbot logic unchanged.
+    """
+
+    def __init__(self, mux: "SessionMultiplexer", session_id: str, max_pending: int):
+        self.mux = mux
+        self.session_id = session_id
+        self.closed = False
+        self._inbox: asyncio.Queue = asyncio.Queue(max_pending)
+
+    async def accept(self):
+        """The connection is already accepted."""
+
+    async def send_text(self, text: str):
+        if self.closed or self.mux.disconnected:
+            raise WebSocketDisconnect(1001)
+        await self.mux.send_frame({"type": "message", "session": self.session_id, "text": text})
+
+    async def receive_text(self) -> str:
+        message = await self._inbox.get()
+        if message is _DISCONNECTED:
+            # Later reads fail the same way, like a closed socket
+            self._inbox.put_nowait(_DISCONNECTED)
+            raise WebSocketDisconnect(1000)
+        return message
+
+    async def close(self, code: int = 1000):
+        """End the session; the connection and its other sessions stay open."""
+        if self.closed:
+            return
+        self.closed = True
+        if not self.mux.disconnected:
+            await self.mux.send_frame({"type": "closed", "session": self.session_id, "code": code})
+
+    def deliver(self, text: str) -> bool:
+        """Queue a customer message; False if the session already has too many unread messages."""
+        try:
+            self._inbox.put_nowait(text)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def disconnect(self):
+        """Make the session's pending and next reads fail with WebSocketDisconnect."""
+        while True:
+            try:
+                self._inbox.put_nowait(_DISCONNECTED)
+                return
+            except asyncio.QueueFull:
+                # Unread messages of a closed session are dropped
+                self._inbox.get_nowait()
+
+
+class SessionMultiplexer:
+    """
+    Runs many chatbot sessions over one WebSocket connection using JSON frames.
+
+    Client frames are `{"type": "open", "session", "customer_id", "survey_id", "resume"?,
+    "resume_token"?}`, `{"type": "message", "session", "text"}` and `{"type": "close", "session"}`.
+    The server answers with `{"type": "message", "session", "text"}`, `{"type": "closed",
+    "session", "code"}` once a session ends, and `{"type": "error", "session"?, "detail"}`
+    for frames it cannot handle.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        run_session: Callable[[MuxChannel, Dict[str, Any]], Awaitable[None]],
+        max_sessions: int = 1000,
+        max_pending: int = 16,
+    ):
+        """
+        Initialize the multiplexer of an accepted connection.
+
+        :param websocket: The gateway's connection.
+        :param run_session: Coroutine function driving one session from its open frame.
+        :param max_sessions: Maximum number of sessions open at once on the connection.
+        :param max_pending: Maximum number of unread messages per session.
+        """
+        self.websocket = websocket
+        self.run_session = run_session
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending
+        self.disconnected = False
+        self.channels: Dict[str, MuxChannel] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._send_lock = asyncio.Lock()
+
+    async def send_frame(self, frame: Dict[str, Any]):
+        """Send one frame; sessions share the socket, so sends are serialized."""
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(frame, separators=(",", ":")))
+
+    async def _error(self, detail: str, session_id: Optional[str] = None):
+        frame = {"type": "error", "detail": detail}
+        if session_id is not None:
+            frame["session"] = session_id
+        await self.send_frame(frame)
+
+    async def _run_channel(self, channel: MuxChannel, frame: Dict[str, Any]):
+        try:
+            await self.run_session(channel, frame)
+        except Exception:
+            logger.exception(f"Multiplexed session {channel.session_id} failed")
+        finally:
+            del self.channels[channel.session_id]
+            del self._tasks[channel.session_id]
+            if not self.disconnected:
+                try:
+                    await channel.close()
+                except (WebSocketDisconnect, RuntimeError):
+                    pass
+
+    async def _open(self, session_id: str, frame: Dict[str, Any]):
+        if session_id in self.channels:
+            await self._error("Session is already open.", session_id)
+            return
+        if len(self.channels) >= self.max_sessions:
+            await self._error("Too many sessions on this connection.", session_id)
+            return
+        if not isinstance(frame.get("customer_id"), str) or not isinstance(frame.get("survey_id"), str):
+            await self._error("customer_id and survey_id are required.", session_id)
+            return
+        channel = self.channels[session_id] = MuxChannel(self, session_id, self.max_pending)
+        self._tasks[session_id] = asyncio.create_task(self._run_channel(channel, frame))
+
+    async def _dispatch(self, frame: Dict[str, Any]):
+        session_id = frame.get("session")
+        if not isinstance(session_id, str):
+            await self._error("Every frame needs a session id.")
+            return
+        frame_type = frame.get("type")
+        if frame_type == "open":
+            await self._open(session_id, frame)
+            return
+        channel = self.channels.get(session_id)
+        if channel is None:
+            await self._error("Unknown session.", session_id)
+        elif frame_type == "message" and isinstance(frame.get("text"), str):
+            if not channel.deliver(frame["text"]):
+                await self._error("Too many unread messages; message dropped.", session_id)
+        elif frame_type == "close":
+            channel.disconnect()
+        else:
+            await self._error("Unsupported frame.", session_id)
+
+    async def run(self):
+        """Serve the connection until the gateway disconnects, then let every session checkpoint."""
+        try:
+            while True:
+                raw = await self.websocket.receive_text()
+                try:
+                    frame = json.loads(raw)
+                except ValueError:
+                    frame = None
+                if not isinstance(frame, dict):
+                    await self._error("Frames must be JSON objects.")
+                    continue
+                await self._dispatch(frame)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.disconnected = True
+            for channel in list(self.channels.values()):
+                channel.disconnect()
+            if self._tasks:
+                await asyncio.gather(*self._tasks.values(), return_exceptions=True)
@@ -0,0 +1,165 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+from app.utils.metrics import storage_queue_wait_seconds
+
+# Priority classes: live chatbot sessions, and admin or background bulk work
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# Priority class of the storage calls made in the current context
+_priority_class: contextvars.ContextVar[str] = contextvars.ContextVar("storage_priority_class", default=INTERACTIVE)
+
+
+class SchedulerTimeoutError(ConnectionError):
+    """Raised when a storage call waited too long for a slot."""
+
+
+@dataclass
+class PriorityClass:
+    """Concurrency limit and fair-share weight of a priority class."""
+    limit: int
+    weight: float
+    active: int = 0
+    # Virtual time at which the class's next slot may start; advances by 1/weight per slot
+    vtime: float = 0.0
+
+
+class StorageScheduler:
+    """
+    Admission of storage calls by priority class.
+
+    At most `capacity` calls run at once and each class at most its own `limit`. When calls
+    queue, freed slots go to the backlogged class with the lowest virtual time, which grows
+    by 1/weight per granted slot: classes share contended slots in proportion to their
+    weights (ties go to the class declared first), so bulk work cannot crowd out
+    interactive calls yet is never starved.
+    """
+
+    def __init__(self, capacity: int, classes: Dict[str, PriorityClass]):
+        """
+        Initialize the scheduler.
+
+        :param capacity: Maximum number of storage calls running at once, across classes.
+        :param classes: Priority classes by name, in tie-breaking order.
+        """
+        self.capacity = capacity
+        self.classes = classes
+        self.active = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {name: deque() for name in classes}
+        # Virtual start time of the last granted slot; idle classes do not bank credit before it
+        self._vtime = 0.0
+
+    @staticmethod
+    @contextmanager
+    def priority(name: str):
+        """Run the storage calls made inside the block in priority class `name`."""
+        token = _priority_class.set(name)
+        try:
+            yield
+        finally:
+            _priority_class.reset(token)
+
+    @staticmethod
+    def use_priority(name: str):
+        """Run the rest of the current task's storage calls (e.g. a request's) in priority class `name`."""
+        _priority_class.set(name)
+
+    @staticmethod
+    def current_class() -> str:
+        return _priority_class.get()
+
+    def queue_depth(self, name: str) -> int:
+        """Number of calls of a class waiting for a slot."""
+        return len(self._queues[name])
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Running and queued calls per class."""
+        return {name: {"active": cls.active, "queued": len(self._queues[name])} for name, cls in self.classes.items()}
+
+    def _can_run(self, name: str) -> bool:
+        return self.active < self.capacity and self.classes[name].active < self.classes[name].limit
+
+    def _start_time(self, name: str) -> float:
+        return max(self.classes[name].vtime, self._vtime)
+
+    def _grant(self, name: str):
+        cls = self.classes[name]
+        start = self._start_time(name)
+        cls.vtime = start + 1.0 / cls.weight
+        self._vtime = start
+        cls.active += 1
+        self.active += 1
+
+    def _dispatch(self):
+        """Hand free slots to queued calls by fair share."""
+        while self.active < self.capacity:
+            candidates = [name for name, queue in self._queues.items() if queue and self._can_run(name)]
+            if not candidates:
+                return
+            name = min(candidates, key=self._start_time)
+            self._grant(name)
+            self._deliver(name, self._queues[name].popleft())
+
+    def _deliver(self, name: str, waiter: asyncio.Future):
+        """Wake a waiter granted a slot, possibly from another event loop's thread."""
+        def resolve():
+            if waiter.done():
+                # The caller gave up after the slot was granted: hand it on
+                self.release(name)
+            else:
+                waiter.set_result(None)
+        try:
+            waiter.get_loop().call_soon_threadsafe(resolve)
+        except RuntimeError:
+            self.release(name)  # The waiter's event loop is already closed
+
+    async def acquire(self, name: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        """
+        Wait for a slot of a class (the current context's class by default).
+
+        :return: The class the slot was granted in; pass it to `release`.
+        :raises SchedulerTimeoutError: If no slot was granted within `timeout` seconds.
+        """
+        name = name or _priority_class.get()
+        if not self._queues[name] and self._can_run(name):
+            self._grant(name)
+            return name
+        queue = self._queues[name]
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the caller gave up: hand the slot on
+                self.release(name)
+            elif waiter in queue:
+                queue.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise SchedulerTimeoutError(f"No {name} storage slot within {timeout:.2f}s") from None
+            raise
+        finally:
+            storage_queue_wait_seconds.observe(time.perf_counter() - start, priority=name)
+        return name
+
+    def release(self, name: str):
+        """Free a slot granted by `acquire`."""
+        self.classes[name].active -= 1
+        self.active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, name: Optional[str] = None, timeout: Optional[float] = None):
+        """Hold a slot for the duration of the block."""
+        granted = await self.acquire(name, timeout)
+        try:
+            yield
+        finally:
+            self.release(granted)
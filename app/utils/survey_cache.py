@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.models.models import SurveyQuestion
+from app.utils.survey_flow import SurveyFlow, compile_flow
+
+
+@dataclass(frozen=True)
+class CompiledQuestion:
+    """A validated survey question with its chatbot prompt already rendered."""
+    id: int
+    question: str
+    options: Tuple[str, ...]
+    prompt: str
+    type: str = "choice"
+
+
+@dataclass(frozen=True)
+class CompiledSurvey:
+    """An immutable, validated survey definition pinned to a catalog version."""
+    survey_id: str
+    version: int
+    title: Optional[str]
+    questions: Tuple[CompiledQuestion, ...]
+    # Digest of the questions, identical on every worker for the same definition
+    fingerprint: str = ""
+    # Transition table driving the conversation through the questions
+    flow: Optional[SurveyFlow] = None
+
+
+def render_question_prompt(question: SurveyQuestion) -> str:
+    """Render the message the chatbot sends for a question."""
+    if question.type == "text":
+        return f"BOT: {question.question}\nPlease reply in text form."
+    options_text = "\n".join([f"{i + 1} - {option}" for i, option in enumerate(question.options)])
+    return (
+        f"BOT: {question.question}\nHere are your options:\n{options_text}\n\n"
+        "Please reply with the number corresponding to your choice."
+    )
+
+
+def compile_survey(survey_id: str, survey_data: Dict[str, Any], version: int) -> CompiledSurvey:
+    """
+    Validate a raw survey definition once, pre-render its prompts and compile its flow.
+
+    :raises ValueError: If the definition or its flow rules are invalid.
+    """
+    parsed = [SurveyQuestion(**raw_question) for raw_question in survey_data.get("questions", [])]
+    questions = []
+    for question in parsed:
+        questions.append(
+            CompiledQuestion(
+                id=question.id,
+                question=question.question,
+                options=tuple(question.options),
+                prompt=render_question_prompt(question),
+                type=question.type,
+            )
+        )
+    digest = hashlib.sha256(
+        json.dumps([question.model_dump() for question in parsed], separators=(",", ":"), sort_keys=True).encode()
+    ).hexdigest()[:16]
+    return CompiledSurvey(
+        survey_id=survey_id,
+        version=version,
+        title=survey_data.get("title"),
+        questions=tuple(questions),
+        fingerprint=digest,
+        flow=compile_flow(parsed),
+    )
+
+
+class SurveyCache:
+    """
+    In-process cache of compiled surveys, invalidated by per-survey version numbers.
+
+    Versions are bumped by this worker's write paths; `ttl` bounds how long a compiled survey
+    may hide a write made through another worker.
+    """
+
+    def __init__(self, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+
+        :param ttl: Maximum age (in seconds) of a compiled survey.
+        :param clock: Monotonic time source (injectable for tests).
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[str, Tuple[float, CompiledSurvey]] = {}
+        self._catalog_version = 0
+
+    def version(self, survey_id: str) -> int:
+        """Return the current version of a survey."""
+        return self._versions.get(survey_id, 0)
+
+    @property
+    def catalog_version(self) -> int:
+        """Version of the whole survey catalog, bumped with every survey."""
+        return self._catalog_version
+
+    def bump_version(self, survey_id: str) -> int:
+        """Invalidate a survey after an admin write and return its new version."""
+        version = self.version(survey_id) + 1
+        self._versions[survey_id] = version
+        self._catalog_version += 1
+        self._entries.pop(survey_id, None)
+        return version
+
+    def get(self, survey_id: str) -> Optional[CompiledSurvey]:
+        """Return the compiled survey if it matches the current version and has not expired."""
+        entry = self._entries.get(survey_id)
+        if entry is None or self.clock() - entry[0] > self.ttl:
+            return None
+        compiled = entry[1]
+        return compiled if compiled.version == self.version(survey_id) else None
+
+    def put(self, survey_id: str, survey_data: Dict[str, Any], version: int) -> CompiledSurvey:
+        """
+        Compile and cache a survey definition.
+
+        :param version: The version observed before the definition was fetched. If an admin
+            write bumped it in the meantime, the result is returned but not cached.
+        """
+        compiled = compile_survey(survey_id, survey_data, version)
+        if version == self.version(survey_id):
+            self._entries[survey_id] = (self.clock(), compiled)
+        return compiled
+
+    async def get_or_fetch(
+        self, survey_id: str, fetch: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[CompiledSurvey]:
+        """
+        Return the compiled survey, fetching and compiling the definition only on a miss.
+
+        :param fetch: Coroutine function returning the raw survey definition (or None).
+        :return: The compiled survey, or None if the survey does not exist or has no questions.
+        """
+        compiled = self.get(survey_id)
+        if compiled is not None:
+            return compiled
+        version = self.version(survey_id)
+        survey_data = await fetch(survey_id)
+        if not survey_data or not survey_data.get("questions"):
+            return None
+        return self.put(survey_id, survey_data, version)
+
+    def clear(self):
+        """Drop all compiled surveys."""
+        self._entries.clear()
+
+
+# Shared cache instance
+survey_cache = SurveyCache(ttl=float(os.environ.get("SURVEY_CACHE_TTL", "30")))
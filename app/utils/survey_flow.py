@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from app.models.models import FlowTarget, SurveyQuestion
+
+FEEDBACK_PROMPT_MESSAGE = "BOT: Please provide your feedback in text form."
+
+
+@dataclass(frozen=True)
+class Transition:
+    """What a reply to a question records and where the conversation goes next."""
+    # Recorded answer; None records the customer's text (the reply itself, or the follow-up)
+    answer: Optional[str]
+    # Position (1-based) of the next question; past the last question completes the survey
+    next_state: int
+    # Prompt asking for free text before the answer is recorded
+    follow_up: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SurveyFlow:
+    """
+    Transition table of a survey.
+
+    `choices` maps (position, reply) to a transition; `text` maps the position of a free-text
+    question to the transition taken by any reply. Either lookup is O(1).
+    """
+    choices: Mapping[Tuple[int, str], Transition]
+    text: Mapping[int, Transition]
+
+    def step(self, position: int, reply: str) -> Optional[Transition]:
+        """Return the transition for a reply, or None if the reply is not valid at `position`."""
+        transition = self.text.get(position)
+        if transition is not None:
+            return transition
+        return self.choices.get((position, reply.strip()))
+
+    def replay(self, questions: Sequence[Any], answers: Mapping[int, str]) -> int:
+        """
+        Return the position reached by following recorded answers from the first question.
+
+        Each answer (keyed by question id) takes the transition it was recorded through, so
+        branches, skips and "end" rules are honoured; the first question without a usable
+        answer is where the conversation continues.
+
+        :return: A position; past the last question means the survey is complete.
+        """
+        position = 1
+        while position <= len(questions):
+            question = questions[position - 1]
+            answer = answers.get(question.id)
+            if answer is None:
+                break
+            if question.type == "text":
+                transition = self.text.get(position)
+            elif answer in question.options:
+                transition = self.choices.get((position, str(question.options.index(answer) + 1)))
+            else:
+                # Free text recorded through a follow-up prompt (the legacy feedback rule)
+                transition = self.choices.get((position, "1"))
+                if transition is not None and transition.follow_up is None:
+                    transition = None
+            if transition is None:
+                break
+            position = transition.next_state
+        return position
+
+
+def compile_flow(questions: List[SurveyQuestion]) -> SurveyFlow:
+    """
+    Compile branching, skip and free-text rules into a transition table.
+
+    Without explicit rules, questions follow each other in order and the legacy feedback rule
+    applies: replying "1" to a last question offering "Yes" asks for free-text feedback,
+    which is recorded as the answer.
+
+    :raises ValueError: If a rule targets an unknown question or does not move forward.
+    """
+    positions = {question.id: position for position, question in enumerate(questions, start=1)}
+    end = len(questions) + 1
+
+    def resolve(position: int, target: Optional[FlowTarget]) -> int:
+        if target is None:
+            return position + 1
+        if target == "end":
+            return end
+        if target not in positions:
+            raise ValueError(f"Question {questions[position - 1].id} targets unknown question {target}")
+        if positions[target] <= position:
+            raise ValueError(f"Question {questions[position - 1].id} must continue with a later question")
+        return positions[target]
+
+    choices: Dict[Tuple[int, str], Transition] = {}
+    text: Dict[int, Transition] = {}
+    for position, question in enumerate(questions, start=1):
+        default_next = resolve(position, question.next)
+        if question.type == "text":
+            text[position] = Transition(answer=None, next_state=default_next)
+            continue
+        for number, option in enumerate(question.options, start=1):
+            choices[(position, str(number))] = Transition(
+                answer=option, next_state=resolve(position, question.branches.get(option, question.next))
+            )
+        legacy_feedback = (
+            position == len(questions) and "Yes" in question.options and not question.branches and question.next is None
+        )
+        if legacy_feedback:
+            choices[(position, "1")] = Transition(answer=None, next_state=end, follow_up=FEEDBACK_PROMPT_MESSAGE)
+    return SurveyFlow(choices=MappingProxyType(choices), text=MappingProxyType(text))
@@ -0,0 +1,113 @@
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, Set, Tuple
+from app.utils.survey_cache import CompiledSurvey
+
+# Distinct free-text answers tracked per question; further ones are only counted as "other"
+MAX_DISTINCT_ANSWERS = 100
+
+OTHER_ANSWERS = "__other__"
+
+
+class SurveyStats:
+    """
+    Per-question answer counters, updated incrementally from the stored responses.
+
+    The counters follow storage order: `position` is the sequence number of the next stored
+    response to count, so workers reading the same storage engine report the same counts.
+    Answers matching a declared option are always counted; only free text is capped.
+    """
+
+    def __init__(self):
+        self._counts: Dict[Tuple[str, int], Counter] = {}
+        self._totals: Dict[Tuple[str, int], int] = {}
+        self._free_text: Dict[Tuple[str, int], int] = {}
+        self._options: Dict[Tuple[str, int], FrozenSet[str]] = {}
+        self._declared: Set[str] = set()
+        self.position = 0
+
+    def declare(self, survey: CompiledSurvey):
+        """Register the options of a survey's questions, which are never capped."""
+        for question in survey.questions:
+            self._options[(survey.survey_id, question.id)] = frozenset(question.options)
+        self._declared.add(survey.survey_id)
+
+    def is_declared(self, survey_id: str) -> bool:
+        """Whether the options of a survey were registered."""
+        return survey_id in self._declared
+
+    def record(self, response: Dict[str, Any]):
+        """Count one committed response."""
+        key = (response.get("survey_id"), response["question_id"])
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = Counter()
+        answer = response["answer"]
+        if answer not in counts and answer not in self._options.get(key, ()):
+            distinct = self._free_text.get(key, 0)
+            if distinct >= MAX_DISTINCT_ANSWERS:
+                answer = OTHER_ANSWERS
+            else:
+                self._free_text[key] = distinct + 1
+        counts[answer] += 1
+        self._totals[key] = self._totals.get(key, 0) + 1
+
+    def record_batch(self, responses: Iterable[Dict[str, Any]]):
+        """Count a batch of committed responses."""
+        for response in responses:
+            self.record(response)
+
+    def record_page(self, cursor: int, responses: Iterable[Dict[str, Any]], next_cursor: int) -> bool:
+        """
+        Count a page of stored responses scanned from `cursor`, and move on to `next_cursor`.
+
+        :return: False, counting nothing, if the page does not start at `position` (e.g. a
+            concurrent refresh counted it first).
+        """
+        if cursor != self.position:
+            return False
+        self.record_batch(responses)
+        self.position = next_cursor
+        return True
+
+    def clear(self):
+        """Drop every counter and start over from the first stored response."""
+        self._counts.clear()
+        self._totals.clear()
+        self._free_text.clear()
+        self.position = 0
+
+    def summarize(self, survey: CompiledSurvey) -> Dict[str, Any]:
+        """
+        Return option counts for every question of a survey.
+
+        Answers that are not one of the question's options (e.g. open feedback) are
+        reported in the question's `other` count. The legacy feedback rule records the
+        feedback text instead of the first option, so those answers also count toward it.
+        """
+        self.declare(survey)
+        questions = []
+        total_responses = 0
+        for position, question in enumerate(survey.questions, start=1):
+            key = (survey.survey_id, question.id)
+            counts = self._counts.get(key, Counter())
+            total = self._totals.get(key, 0)
+            options = {option: counts.get(option, 0) for option in question.options}
+            other = total - sum(options.values())
+            feedback = survey.flow.choices.get((position, "1"))
+            if feedback is not None and feedback.follow_up is not None:
+                options[question.options[0]] += other
+            questions.append(
+                {
+                    "question_id": question.id,
+                    "question": question.question,
+                    "options": options,
+                    "other": other,
+                    "total": total,
+                }
+            )
+            total_responses += total
+        return {"survey_id": survey.survey_id, "total_responses": total_responses, "questions": questions}
+
+
+# Shared statistics instance
+survey_stats = SurveyStats()
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional
+from app.models.models import ConversationState
+
+# Messages that do not depend on the session, rendered once
+INVALID_RESPONSE_MESSAGE = "BOT: Invalid response. Please reply with the number corresponding to your choice."
+
+
+class ConversationSession:
+    """
+    Conversation state of a live session, held as plain values.
+
+    Answers are `[question_id, answer]` pairs, the same shape as the stored answer log, so
+    turns never build pydantic models; `ConversationState` is only used to load state.
+    """
+    __slots__ = ("customer_id", "survey_id", "current_question", "completed", "version", "answers", "_persisted")
+
+    def __init__(
+        self,
+        customer_id: str,
+        survey_id: str,
+        current_question: int,
+        completed: bool = False,
+        version: int = 0,
+        answers: Optional[List[List[Any]]] = None,
+        persisted: int = 0,
+    ):
+        self.customer_id = customer_id
+        self.survey_id = survey_id
+        self.current_question = current_question
+        self.completed = completed
+        self.version = version
+        self.answers = answers if answers is not None else []
+        self._persisted = persisted
+
+    @classmethod
+    def from_state(cls, state: ConversationState) -> "ConversationSession":
+        """Take over a loaded conversation state, whose answers are all stored."""
+        return cls(
+            customer_id=state.customer_id,
+            survey_id=state.survey_id,
+            current_question=state.current_question,
+            completed=state.completed,
+            version=state.version,
+            answers=[[response.question_id, response.answer] for response in state.responses],
+            persisted=len(state.responses),
+        )
+
+    def record_answer(self, question_id: int, answer: str) -> Dict[str, Any]:
+        """Append an answer to the log and return it as a survey response record."""
+        self.answers.append([question_id, answer])
+        return {"customer_id": self.customer_id, "question_id": question_id, "answer": answer, "survey_id": self.survey_id}
+
+    @property
+    def saved(self) -> bool:
+        """Whether every current answer has been stored."""
+        return self._persisted == len(self.answers)
+
+    def to_record(self) -> Dict[str, Any]:
+        """Serialize to the compact storage format, as of the last save."""
+        return {
+            "customer_id": self.customer_id,
+            "survey_id": self.survey_id,
+            "current_question": self.current_question,
+            "completed": self.completed,
+            "version": self.version,
+            "answers": list(self.answers),
+        }
+
+    def to_delta(self) -> Dict[str, Any]:
+        """Build a constant-size update: the ids and cursor fields plus answers not yet persisted."""
+        return {
+            "customer_id": self.customer_id,
+            "survey_id": self.survey_id,
+            "current_question": self.current_question,
+            "completed": self.completed,
+            "answers": self.answers[self._persisted:],
+        }
+
+    def mark_persisted(self, version: int):
+        """Record that every current answer has been stored at `version`."""
+        self.version = version
+        self._persisted = len(self.answers)
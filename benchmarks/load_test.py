@@ -0,0 +1,222 @@
+"""
+Load-generation benchmark for the chatbot WebSocket and the admin API.
+
+Runs `app.main:app` in-process under uvicorn and drives simulated customers through
+`/ws/{customer_id}/{survey_id}` with scripted answers, mixed with admin traffic:
+
+    python -m benchmarks.load_test --sessions 2000 --concurrency 500 --latency 0.01 0.05 --failure-rate 0 --seed 42
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+import websockets
+
+from app.db import store
+from app.main import app
+
+TECHNICAL_DIFFICULTIES_MESSAGE = "We are experiencing technical difficulties. Please try again later."
+
+
+@dataclass
+class BenchmarkResults:
+    """Raw measurements collected during a run."""
+    time_to_first_question: List[float] = field(default_factory=list)
+    turn_latencies: List[float] = field(default_factory=list)
+    admin_latencies: List[float] = field(default_factory=list)
+    completed_sessions: int = 0
+    failed_sessions: int = 0
+    admin_errors: int = 0
+    failures: Counter = field(default_factory=Counter)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of `values` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Latency summary in milliseconds."""
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+    return {
+        "count": len(values),
+        "p50_ms": ms(percentile(values, 50)),
+        "p90_ms": ms(percentile(values, 90)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(max(values) if values else None),
+    }
+
+
+def seed_customers(count: int) -> List[str]:
+    """Register `count` benchmark customers in the storage engine."""
+    customers = {f"bench_{i}": {"name": f"Customer {i}", "email": f"customer{i}@example.com"} for i in range(count)}
+    store.engine.put_customers(customers)
+    return list(customers)
+
+
+def scripted_answer(message: str, rng: random.Random) -> str:
+    """Answer a chatbot prompt: free text for feedback requests, otherwise a random option."""
+    if "Please provide your feedback" in message:
+        return "Benchmark feedback."
+    options = [line for line in message.splitlines() if " - " in line and line.split(" - ", 1)[0].isdigit()]
+    return str(rng.randint(1, len(options))) if options else "1"
+
+
+async def run_session(base_url: str, customer_id: str, survey_id: str, seed: int, results: BenchmarkResults):
+    """Drive one customer through a survey, recording time-to-first-question and turn latencies."""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    try:
+        async with websockets.connect(f"{base_url}/ws/{customer_id}/{survey_id}", open_timeout=30) as websocket:
+            message = await websocket.recv()
+            results.time_to_first_question.append(time.perf_counter() - start)
+            while True:
+                if TECHNICAL_DIFFICULTIES_MESSAGE in message:
+                    results.failures["technical_difficulties"] += 1
+                    results.failed_sessions += 1
+                    return
+                if "Thank you for your time" in message or "already completed" in message:
+                    results.completed_sessions += 1
+                    return
+                if not message.startswith("BOT:"):
+                    results.failures["unexpected_message"] += 1
+                    results.failed_sessions += 1
+                    return
+                sent_at = time.perf_counter()
+                await websocket.send(scripted_answer(message, rng))
+                message = await websocket.recv()
+                results.turn_latencies.append(time.perf_counter() - sent_at)
+    except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+        results.failures[type(e).__name__] += 1
+        results.failed_sessions += 1
+
+
+async def run_admin_traffic(base_url: str, interval: float, stop: asyncio.Event, results: BenchmarkResults):
+    """Poll the admin endpoints until `stop` is set."""
+    paths = ["/admin/surveys", "/admin/survey_responses?limit=100"]
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                response = await client.get(paths[i % len(paths)])
+                if response.status_code != 200:
+                    results.admin_errors += 1
+            except httpx.HTTPError:
+                results.admin_errors += 1
+            results.admin_latencies.append(time.perf_counter() - start)
+            i += 1
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict:
+    """Start the app in-process, run the load and return the report."""
+    store.configure(latency=tuple(args.latency), failure_rate=args.failure_rate, seed=args.seed)
+    customer_ids = seed_customers(args.sessions)
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", ws_max_queue=32)
+    server = uvicorn.Server(config)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    http_url, ws_url = f"http://127.0.0.1:{port}", f"ws://127.0.0.1:{port}"
+
+    results = BenchmarkResults()
+    store.rpc_counts.clear()
+    stop_admin = asyncio.Event()
+    admin_tasks = [
+        asyncio.create_task(run_admin_traffic(http_url, args.admin_interval, stop_admin, results))
+        for _ in range(args.admin_clients)
+    ]
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(i: int, customer_id: str):
+        async with semaphore:
+            await run_session(ws_url, customer_id, args.surveys[i % len(args.surveys)], args.seed + i, results)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited(i, customer_id) for i, customer_id in enumerate(customer_ids)))
+    elapsed = time.perf_counter() - start
+
+    stop_admin.set()
+    await asyncio.gather(*admin_tasks)
+    server.should_exit = True
+    await server_task
+
+    return {
+        "config": {
+            "sessions": args.sessions,
+            "concurrency": args.concurrency,
+            "admin_clients": args.admin_clients,
+            "latency": list(args.latency),
+            "failure_rate": args.failure_rate,
+            "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "sessions_per_s": round(args.sessions / elapsed, 2) if elapsed else None,
+        "completed_sessions": results.completed_sessions,
+        "failed_sessions": results.failed_sessions,
+        "failures": dict(results.failures),
+        "time_to_first_question": summarize(results.time_to_first_question),
+        "turn_latency": summarize(results.turn_latencies),
+        "admin_latency": {**summarize(results.admin_latencies), "errors": results.admin_errors},
+        "rpc_counts": dict(sorted(store.rpc_counts.items())),
+        "rpc_total": sum(store.rpc_counts.values()),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000, help="Number of simulated customers.")
+    parser.add_argument("--concurrency", type=int, default=200, help="Maximum simultaneously open sockets.")
+    parser.add_argument("--surveys", nargs="+", default=["ice_cream_preferences", "cake_preferences", "beer_preferences"])
+    parser.add_argument("--admin-clients", type=int, default=2, help="Concurrent admin pollers.")
+    parser.add_argument("--admin-interval", type=float, default=0.1, help="Pause (in seconds) between admin requests.")
+    parser.add_argument("--latency", type=float, nargs=2, default=[0.1, 0.5], metavar=("MIN", "MAX"),
+                        help="Simulated RPC latency range in seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Simulated RPC failure probability.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for RPC simulation and scripted answers.")
+    parser.add_argument("--port", type=int, default=0, help="Port to serve on (0 picks a free port).")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    # Retried RPC failures are expected under simulated faults; keep the report readable
+    logging.getLogger("app").setLevel(logging.ERROR)
+    report = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"Sessions: {report['completed_sessions']} completed, {report['failed_sessions']} failed "
+          f"in {report['elapsed_s']}s ({report['sessions_per_s']} sessions/s)")
+    for name in ("time_to_first_question", "turn_latency", "admin_latency"):
+        summary = report[name]
+        print(f"{name:>24}: n={summary['count']} p50={summary['p50_ms']}ms p90={summary['p90_ms']}ms "
+              f"p99={summary['p99_ms']}ms max={summary['max_ms']}ms")
+    print(f"RPC calls: {report['rpc_total']} {report['rpc_counts']}")
+    if report["failures"]:
+        print(f"Failures: {report['failures']}")
+
+
+if __name__ == "__main__":
+    main()
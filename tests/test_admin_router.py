@@ -1,6 +1,16 @@
+import asyncio
+import json
+import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch
+from app.db import AsyncMockRPCDatabase, mock_db
 from app.main import app
+from app.services.admin_service import AdminService, survey_bodies
+from app.storage.response_store import ResponseStore
+from app.utils.rpc_retrier_wrapper import RPCRetrier
+from app.utils.survey_cache import compile_survey
+from app.utils.survey_stats import MAX_DISTINCT_ANSWERS, SurveyStats
+from app.utils.surveys import SURVEYS
 
 client = TestClient(app)
 
@@ -68,6 +78,28 @@ def test_update_survey():
     assert response.json() == {"message": "Survey updated successfully."}
 
 
+def test_single_survey_writes_validate_flow_rules():
+    """Test that creating or updating one survey rejects flow rules that cannot be compiled."""
+    looping = [{"id": 1, "question": "Q1", "options": ["A"]}, {"id": 2, "question": "Q2", "options": ["A"], "next": 1}]
+    response = client.post("/admin/surveys", json={**test_survey, "survey_id": "loop", "questions": looping})
+    assert response.status_code == 400
+    assert "flow" in response.json()["detail"]
+    assert "loop" not in SURVEYS
+
+    client.post("/admin/surveys", json=test_survey)
+    response = client.put(f"/admin/surveys/{test_survey['survey_id']}", json={**test_survey_update, "questions": looping})
+    assert response.status_code == 400
+
+
+def test_stats_of_invalid_stored_survey_is_an_http_error():
+    """Test that a stored survey whose flow cannot be compiled is reported as an error, not a crash."""
+    looping = [{"id": 1, "question": "Q1", "options": ["A"]}, {"id": 2, "question": "Q2", "options": ["A"], "next": 1}]
+    with patch.dict(SURVEYS, {"legacy_loop": {"id": "legacy_loop", "questions": looping}}):
+        response = client.get("/admin/surveys/legacy_loop/stats")
+    assert response.status_code == 500
+    assert "Invalid survey definition" in response.json()["detail"]
+
+
 def test_delete_survey():
     """Test deleting an existing survey."""
     # Create the survey first
@@ -77,3 +109,217 @@ def test_delete_survey():
     response = client.delete(f"/admin/surveys/{test_survey['survey_id']}")
     assert response.status_code == 200
     assert response.json() == {"message": "Survey deleted successfully."}
+
+
+test_responses = [
+    {"customer_id": str(i % 2), "survey_id": "ice_cream_preferences", "question_id": 1, "answer": "Vanilla"}
+    for i in range(5)
+]
+
+
+def test_get_survey_responses_paginated_and_filtered():
+    """Test paging through filtered survey responses with the next-page cursor."""
+    with patch.dict(mock_db, {"survey_responses": ResponseStore(test_responses)}):
+        response = client.get("/admin/survey_responses", params={"customer_id": "0", "limit": 2})
+        assert response.status_code == 200
+        assert response.json() == [test_responses[0], test_responses[2]]
+
+        cursor = response.headers["X-Next-Cursor"]
+        response = client.get("/admin/survey_responses", params={"customer_id": "0", "limit": 2, "cursor": cursor})
+        assert response.json() == [test_responses[4]]
+        assert "X-Next-Cursor" not in response.headers
+
+
+def test_stream_survey_responses_as_ndjson():
+    """Test streaming every survey response as NDJSON."""
+    with patch.dict(mock_db, {"survey_responses": ResponseStore(test_responses)}):
+        response = client.get("/admin/survey_responses", params={"format": "ndjson"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line) for line in response.text.splitlines()] == test_responses
+
+
+def test_stream_ends_with_resume_cursor_when_storage_fails():
+    """Test that a stream cut short by storage errors ends with an error line holding the resume cursor."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    query = db.query_survey_responses
+    calls = []
+
+    async def flaky_query(filters, cursor, limit):
+        calls.append(cursor)
+        # The second page fails once and is retried; the third page keeps failing
+        if len(calls) == 2 or len(calls) > 3:
+            raise ConnectionError("RPC call failed")
+        return await query(filters, cursor, limit)
+
+    async def collect():
+        return [line async for line in AdminService.stream_survey_responses({}, page_size=2)]
+
+    with patch.dict(mock_db, {"survey_responses": ResponseStore(test_responses)}), \
+            patch("app.services.admin_service.db", db), patch.object(db, "query_survey_responses", flaky_query), \
+            patch("app.services.admin_service.retrier", RPCRetrier(max_retries=1, retry_delay=0)):
+        lines = [json.loads(line) for line in asyncio.run(collect())]
+
+    assert lines[:4] == test_responses[:4]
+    assert lines[4]["error"] and lines[4]["next_cursor"] == "4"
+    assert len(lines) == 5
+
+
+def test_get_survey_stats():
+    """Test reading option counts that catch up with the stored responses on each request."""
+    responses = test_responses + [
+        {"customer_id": "2", "survey_id": "ice_cream_preferences", "question_id": 2, "answer": "Loved it"}
+    ]
+    store = ResponseStore(responses)
+    with patch.dict(mock_db, {"survey_responses": store}), \
+            patch("app.services.admin_service.survey_stats", SurveyStats()):
+        response = client.get("/admin/surveys/ice_cream_preferences/stats")
+        # E.g. committed by another worker sharing the storage engine
+        store.append({"customer_id": "3", "survey_id": "ice_cream_preferences", "question_id": 1, "answer": "Chocolate"})
+        refreshed = client.get("/admin/surveys/ice_cream_preferences/stats")
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total_responses"] == 6
+    assert stats["questions"][0]["options"] == {"Vanilla": 5, "Chocolate": 0, "Strawberry": 0}
+    assert stats["questions"][1]["other"] == 1
+    assert refreshed.json()["questions"][0]["options"] == {"Vanilla": 5, "Chocolate": 1, "Strawberry": 0}
+
+
+def test_stats_cap_free_text_but_not_declared_options():
+    """Test that many distinct feedback texts neither hide a later option answer nor leave "Yes" at 0."""
+    responses = [
+        {"customer_id": str(i), "survey_id": "ice_cream_preferences", "question_id": 2, "answer": f"Feedback {i}"}
+        for i in range(MAX_DISTINCT_ANSWERS + 1)
+    ] + [{"customer_id": "x", "survey_id": "ice_cream_preferences", "question_id": 2, "answer": "No"}]
+    with patch.dict(mock_db, {"survey_responses": ResponseStore(responses)}), \
+            patch("app.services.admin_service.survey_stats", SurveyStats()):
+        response = client.get("/admin/surveys/ice_cream_preferences/stats")
+
+    feedback = response.json()["questions"][1]
+    assert feedback["options"] == {"Yes": MAX_DISTINCT_ANSWERS + 1, "No": 1}
+    assert feedback["other"] == MAX_DISTINCT_ANSWERS + 1
+    assert feedback["total"] == MAX_DISTINCT_ANSWERS + 2
+
+
+def test_failed_stats_refresh_continues_from_the_last_page_read():
+    """Test that a refresh interrupted by a storage error resumes without counting a page twice."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    scan = db.scan_survey_responses
+    pages = []
+
+    async def flaky_scan(cursor, limit):
+        pages.append(cursor)
+        if len(pages) == 2:
+            raise ConnectionError("RPC call failed")
+        return await scan(cursor, limit)
+
+    stats = SurveyStats()
+    survey = compile_survey("ice_cream_preferences", SURVEYS["ice_cream_preferences"], 0)
+    with patch.dict(mock_db, {"survey_responses": ResponseStore(test_responses)}), \
+            patch("app.services.admin_service.db", db), patch.object(db, "scan_survey_responses", flaky_scan), \
+            patch("app.services.admin_service.retrier", RPCRetrier(max_retries=1, retry_delay=0)), \
+            patch("app.services.admin_service.survey_stats", stats):
+        with pytest.raises(ConnectionError):
+            asyncio.run(AdminService.refresh_survey_stats(page_size=2))
+        assert stats.summarize(survey)["total_responses"] == 2
+        assert asyncio.run(AdminService.refresh_survey_stats(page_size=2)) == 3
+
+    assert pages == [0, 2, 2, 4]
+    assert stats.summarize(survey)["total_responses"] == 5
+
+
+def test_concurrent_stats_refreshes_count_each_response_once():
+    """Test that overlapping refreshes (e.g. two stats requests) do not double-count a page."""
+    stats = SurveyStats()
+    survey = compile_survey("ice_cream_preferences", SURVEYS["ice_cream_preferences"], 0)
+
+    async def run():
+        return await asyncio.gather(AdminService.refresh_survey_stats(), AdminService.refresh_survey_stats())
+
+    db = AsyncMockRPCDatabase(latency=(0.01, 0.01), failure_rate=0)
+    with patch.dict(mock_db, {"survey_responses": ResponseStore(test_responses)}), \
+            patch("app.services.admin_service.db", db), \
+            patch("app.services.admin_service.survey_stats", stats):
+        counted = asyncio.run(run())
+
+    assert sorted(counted) == [0, 5]
+    assert stats.summarize(survey)["total_responses"] == 5
+
+
+def test_get_stats_for_unknown_survey():
+    """Test that stats for a missing survey return 404."""
+    response = client.get("/admin/surveys/unknown_survey/stats")
+    assert response.status_code == 404
+
+
+def test_batch_create_and_update_surveys():
+    """Test that batch writes validate up front and report a result per survey."""
+    batch = [
+        {**test_survey, "survey_id": "batch_survey_1"},
+        {**test_survey, "survey_id": "batch_survey_2"},
+        {**test_survey, "survey_id": "ice_cream_preferences"},
+    ]
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    try:
+        with patch("app.services.admin_service.db", db):
+            response = client.post("/admin/surveys:batch", json=batch)
+            assert response.status_code == 200
+            body = response.json()
+            assert body["written"] == 2
+            assert [result["status"] for result in body["results"]] == ["created", "created", "error"]
+            assert db.rpc_counts["get_surveys_info"] == 1
+            assert db.rpc_counts["save_surveys"] == 1
+
+            update = [{**test_survey_update, "survey_id": "batch_survey_1"}, {**test_survey_update, "survey_id": "missing"}]
+            body = client.put("/admin/surveys:batch", json=update).json()
+            assert [result["status"] for result in body["results"]] == ["updated", "error"]
+            assert SURVEYS["batch_survey_1"]["title"] == "Updated Test Survey"
+
+            invalid = [{**test_survey, "survey_id": "batch_survey_3", "questions": [{"id": "x"}]}]
+            response = client.post("/admin/surveys:batch", json=invalid)
+            assert response.status_code == 400
+            assert response.json()["detail"][0]["survey_id"] == "batch_survey_3"
+            assert "batch_survey_3" not in SURVEYS
+
+            looping = [{"id": 1, "question": "Q1", "options": ["A"]}, {"id": 2, "question": "Q2", "options": ["A"], "next": 1}]
+            response = client.post("/admin/surveys:batch", json=[{**test_survey, "survey_id": "batch_survey_3", "questions": looping}])
+            assert response.status_code == 400
+            assert "flow" in response.json()["detail"][0]["detail"]
+    finally:
+        SURVEYS.pop("batch_survey_1", None)
+        SURVEYS.pop("batch_survey_2", None)
+
+
+def test_survey_list_conditional_get():
+    """Test that unchanged surveys are answered with 304 without touching storage."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    survey_bodies.clear()
+    try:
+        with patch("app.services.admin_service.db", db):
+            response = client.get("/admin/surveys")
+            assert response.status_code == 200
+            etag = response.headers["ETag"]
+
+            response = client.get("/admin/surveys", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert db.rpc_counts["get_all_surveys"] == 1
+
+            client.post("/admin/surveys", json={**test_survey, "survey_id": "etag_survey"})
+            response = client.get("/admin/surveys", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["ETag"] != etag
+            assert any(survey.get("survey_id") == "etag_survey" for survey in response.json())
+    finally:
+        SURVEYS.pop("etag_survey", None)
+
+
+def test_single_survey_conditional_get():
+    """Test the per-survey endpoint and its ETag."""
+    with patch("app.services.admin_service.db", AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)):
+        response = client.get("/admin/surveys/cake_preferences")
+        assert response.json()["title"] == "Cake Preferences Survey"
+        etag = response.headers["ETag"]
+        response = client.get("/admin/surveys/cake_preferences", headers={"If-None-Match": f"W/{etag}"})
+        assert response.status_code == 304
+        assert client.get("/admin/surveys/missing_survey").status_code == 404
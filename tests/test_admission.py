@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from app.utils.admission import AdmissionRejectedError, SessionAdmission
+
+
+def test_rejects_when_full_without_queue():
+    """Sessions beyond the limit are rejected at once when queueing is disabled."""
+    admission = SessionAdmission(max_sessions=1)
+
+    async def run():
+        await admission.acquire("1")
+        with pytest.raises(AdmissionRejectedError):
+            await admission.acquire("2")
+
+    asyncio.run(run())
+    assert admission.stats["rejected"] == 1
+    assert admission.active == 1
+
+
+def test_queued_session_gets_released_slot():
+    """A queued session is admitted as soon as an active session ends."""
+    admission = SessionAdmission(max_sessions=1, max_waiting=1, wait_timeout=1.0)
+
+    async def run():
+        first = await admission.acquire("1")
+        queued = asyncio.ensure_future(admission.acquire("2"))
+        await asyncio.sleep(0.01)
+        assert admission.waiting == 1
+        with pytest.raises(AdmissionRejectedError):
+            await admission.acquire("3")
+        admission.release(first)
+        return await queued
+
+    slot = asyncio.run(run())
+    assert slot.customer_id == "2"
+    assert admission.active == 1
+
+
+def test_new_session_supersedes_previous_one():
+    """A customer's new session interrupts the previous one and waits for it to close."""
+    admission = SessionAdmission(max_sessions=10, supersede_timeout=1.0)
+
+    async def run():
+        first = await admission.acquire("1")
+
+        async def previous_session():
+            await first.superseded
+            admission.release(first)
+
+        closing = asyncio.ensure_future(previous_session())
+        second = await admission.acquire("1")
+        await closing
+        return second
+
+    second = asyncio.run(run())
+    assert not second.superseded.done()
+    assert admission.stats == {"admitted": 2, "rejected": 0, "superseded": 1, "active": 1, "waiting": 0}
@@ -0,0 +1,70 @@
+import asyncio
+from app.utils.async_cache import AsyncTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    """Positive and negative entries expire after their own TTLs."""
+    clock = FakeClock()
+    cache = AsyncTTLCache(ttl=60, negative_ttl=5, clock=clock)
+    calls = []
+
+    async def loader(value):
+        calls.append(value)
+        return value
+
+    async def run():
+        await cache.get_or_load("known", lambda: loader("profile"))
+        await cache.get_or_load("unknown", lambda: loader(None))
+        clock.now = 10
+        await cache.get_or_load("known", lambda: loader("profile"))
+        await cache.get_or_load("unknown", lambda: loader(None))
+        clock.now = 100
+        await cache.get_or_load("known", lambda: loader("profile"))
+
+    asyncio.run(run())
+    assert calls == ["profile", None, None, "profile"]
+    assert cache.stats["hits"] == 1
+    assert cache.stats["expirations"] == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    """The cache stays bounded by evicting the least recently used entry."""
+    cache = AsyncTTLCache(max_size=2)
+
+    async def run():
+        async def load(key):
+            return key
+        for key in ("a", "b", "a", "c"):
+            await cache.get_or_load(key, lambda key=key: load(key))
+
+    asyncio.run(run())
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["size"] == 2
+    assert cache._lookup("b") == (False, None)
+
+
+def test_concurrent_loads_share_one_call():
+    """Concurrent misses for one key are coalesced into a single load."""
+    cache = AsyncTTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"name": "John Doe"}
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("1", loader) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"name": "John Doe"} for result in results)
+    assert cache.stats["coalesced"] == 9
@@ -1,5 +1,11 @@
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
+from app.db import AsyncMockRPCDatabase, StateConflictError, mock_db, store
 from app.main import app
+from app.services.chatbot_service import ChatbotService
+from app.storage.response_store import ResponseStore
+from app.utils.admission import SessionAdmission
+from app.utils.surveys import SURVEYS
 
 client = TestClient(app)
 
@@ -34,4 +40,179 @@ def test_websocket_chatbot():
 
         except Exception as e:
             # If an unexpected error occurs, fail the test with the error message
-            assert False, f"Unexpected error during test: {e}"
\ No newline at end of file
+            assert False, f"Unexpected error during test: {e}"
+
+def test_websocket_follows_survey_branches():
+    """Test that a branching survey skips questions and records free-text answers."""
+    survey = {
+        "id": "pet_preferences",
+        "title": "Pet Survey",
+        "questions": [
+            {"id": 1, "question": "Which pet do you have?", "options": ["Cat", "Dog"], "branches": {"Cat": 3}},
+            {"id": 2, "question": "Which breed is your dog?", "type": "text", "next": "end"},
+            {"id": 3, "question": "What is your cat called?", "type": "text"},
+        ],
+    }
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    with patch("app.services.chatbot_service.db", db), patch.dict(SURVEYS, {"pet_preferences": survey}), \
+            patch.dict(mock_db, {"survey_responses": ResponseStore()}):
+        with client.websocket_connect("/ws/1/pet_preferences") as websocket:
+            assert "Which pet do you have?" in websocket.receive_text()
+            websocket.send_text("1")
+            assert "What is your cat called?" in websocket.receive_text()
+            websocket.send_text("Tom")
+            assert "Thank you for your time, John Doe!" in websocket.receive_text()
+        assert [(r["question_id"], r["answer"]) for r in mock_db["survey_responses"]] == [(1, "Cat"), (3, "Tom")]
+
+
+def test_multiplexed_sessions_share_one_connection():
+    """Test that interleaved sessions on the multiplexed endpoint each run the survey independently."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+
+    def receive(websocket):
+        frame = websocket.receive_json()
+        return frame["session"], frame.get("text", frame["type"])
+
+    customers = {
+        "mux_1": {"name": "Grace Hopper", "email": "grace@example.com"},
+        "mux_2": {"name": "Alan Turing", "email": "alan@example.com"},
+    }
+    with patch("app.services.chatbot_service.db", db), patch.dict(mock_db["customers"], customers), \
+            client.websocket_connect("/ws/mux") as websocket:
+        websocket.send_json({"type": "open", "session": "a", "customer_id": "mux_1", "survey_id": "ice_cream_preferences"})
+        session, text = receive(websocket)
+        assert session == "a" and "Which flavor of ice cream" in text
+        websocket.send_json({"type": "open", "session": "b", "customer_id": "mux_2", "survey_id": "cake_preferences"})
+        session, text = receive(websocket)
+        assert session == "b" and "Which type of cake" in text
+
+        websocket.send_json({"type": "message", "session": "b", "text": "3"})
+        session, text = receive(websocket)
+        assert session == "b" and "Would you like to provide feedback" in text
+        websocket.send_json({"type": "message", "session": "a", "text": "2"})
+        session, text = receive(websocket)
+        assert session == "a" and "Would you like to provide feedback" in text
+
+        websocket.send_json({"type": "message", "session": "unknown", "text": "1"})
+        assert receive(websocket) == ("unknown", "error")
+        websocket.send_json({"type": "close", "session": "b"})
+        assert receive(websocket) == ("b", "closed")
+
+        websocket.send_json({"type": "message", "session": "a", "text": "2"})
+        assert receive(websocket) == ("a", "BOT: Thank you for your time, Grace Hopper! Your response has been recorded. Have a wonderful day!")
+        assert receive(websocket) == ("a", "closed")
+
+
+def test_websocket_drops_answer_rejected_by_conflicting_save():
+    """Test that an answer whose state save conflicts is not recorded as a survey response."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    conflict = AsyncMock(side_effect=StateConflictError("conversation moved on"))
+    with patch("app.services.chatbot_service.db", db), patch.object(db, "save_conversation_delta", conflict), \
+            patch.dict(mock_db, {"survey_responses": ResponseStore()}):
+        with client.websocket_connect("/ws/2/ice_cream_preferences") as websocket:
+            assert "Which flavor of ice cream do you prefer?" in websocket.receive_text()
+            websocket.send_text("2")
+            assert "This survey is being answered in another session." in websocket.receive_text()
+        assert list(mock_db["survey_responses"]) == []
+
+
+def test_websocket_rejects_conversation_owned_by_another_session():
+    """Test that a second socket cannot take over a conversation whose lease is held."""
+    store.sessions.acquire_lease("conv_2_beer_preferences", "other-worker:session", ttl=60)
+    try:
+        with client.websocket_connect("/ws/2/beer_preferences") as websocket:
+            data = websocket.receive_text()
+            assert "This survey is being answered in another session." in data
+    finally:
+        store.sessions.release_lease("conv_2_beer_preferences", "other-worker:session")
+
+
+def test_websocket_resumes_from_token_without_bootstrap():
+    """Test that a reconnect presenting a resume token continues without the bootstrap lookups."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    with patch("app.services.chatbot_service.db", db), \
+            patch.dict(mock_db["customers"], {"resume_1": {"name": "Ada Lovelace", "email": "ada@example.com"}}):
+        with client.websocket_connect("/ws/resume_1/cake_preferences?resume=true") as websocket:
+            assert websocket.receive_text().startswith("TOKEN: ")
+            assert "Which type of cake do you prefer?" in websocket.receive_text()
+            websocket.send_text("1")
+            token = websocket.receive_text()[len("TOKEN: "):]
+            assert "Would you like to provide feedback" in websocket.receive_text()
+        # The test client cancels the server task on disconnect, before the lease is released
+        db.sessions.leases.clear()
+
+        with patch.object(ChatbotService, "bootstrap_session", side_effect=AssertionError("bootstrap ran")), \
+                client.websocket_connect(f"/ws/resume_1/cake_preferences?resume_token={token}") as websocket:
+            assert websocket.receive_text().startswith("TOKEN: ")
+            assert "Would you like to provide feedback" in websocket.receive_text()
+            websocket.send_text("2")
+            assert "Thank you for your time, Ada Lovelace!" in websocket.receive_text()
+
+
+def test_websocket_resume_with_stale_token_continues_from_storage():
+    """Test that a token issued before the last saved answer falls back to the stored conversation."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    with patch("app.services.chatbot_service.db", db), \
+            patch.dict(mock_db["customers"], {"resume_2": {"name": "Edsger Dijkstra", "email": "edsger@example.com"}}), \
+            patch.dict(mock_db, {"survey_responses": ResponseStore()}):
+        with client.websocket_connect("/ws/resume_2/cake_preferences?resume=true") as websocket:
+            stale_token = websocket.receive_text()[len("TOKEN: "):]
+            assert "Which type of cake do you prefer?" in websocket.receive_text()
+            websocket.send_text("1")
+            assert websocket.receive_text().startswith("TOKEN: ")
+            assert "Would you like to provide feedback" in websocket.receive_text()
+        db.sessions.leases.clear()
+
+        for _ in range(2):
+            with client.websocket_connect(f"/ws/resume_2/cake_preferences?resume_token={stale_token}") as websocket:
+                assert websocket.receive_text().startswith("TOKEN: ")
+                assert "Which type of cake do you prefer?" in websocket.receive_text()
+                websocket.send_text("2")
+                # The reply to the already answered question is dropped
+                assert websocket.receive_text().startswith("TOKEN: ")
+                assert "Would you like to provide feedback" in websocket.receive_text()
+            db.sessions.leases.clear()
+
+        with client.websocket_connect(f"/ws/resume_2/cake_preferences?resume_token={stale_token}") as websocket:
+            websocket.receive_text()
+            websocket.receive_text()
+            websocket.send_text("2")
+            websocket.receive_text()
+            websocket.receive_text()
+            websocket.send_text("2")
+            assert "Thank you for your time, Edsger Dijkstra!" in websocket.receive_text()
+        answers = [(r["question_id"], r["answer"]) for r in mock_db["survey_responses"]]
+        assert (1, "Tiramisu Cake") not in answers and answers[-1] == (2, "No")
+
+
+def test_websocket_ignores_forged_resume_token():
+    """Test that an invalid resume token falls back to the regular session bootstrap."""
+    with client.websocket_connect("/ws/2/cake_preferences?resume_token=forged.token") as websocket:
+        data = websocket.receive_text()
+        if "technical difficulties" not in data:
+            assert data.startswith("TOKEN: ")
+            assert "BOT:" in websocket.receive_text()
+
+
+def test_websocket_rejects_sessions_beyond_worker_limit():
+    """Test that a worker at its session limit turns new connections away immediately."""
+    with patch("app.services.chatbot_service.session_admission", SessionAdmission(max_sessions=0)):
+        with client.websocket_connect("/ws/1/ice_cream_preferences") as websocket:
+            assert "The chatbot is busy right now" in websocket.receive_text()
+
+
+def test_websocket_closes_idle_session():
+    """Test that a session waiting too long for the customer is checkpointed and closed."""
+    with patch("app.services.chatbot_service.db", AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)), \
+            patch("app.services.chatbot_service.SESSION_IDLE_TIMEOUT", 0.2):
+        with client.websocket_connect("/ws/2/ice_cream_preferences") as websocket:
+            assert "Which flavor of ice cream do you prefer?" in websocket.receive_text()
+            assert "Closing this chat due to inactivity" in websocket.receive_text()
+
+
+def test_websocket_reports_survey_that_cannot_be_compiled():
+    """Test that a stored survey with invalid flow rules ends the session with an error message."""
+    looping = [{"id": 1, "question": "Q1", "options": ["A"]}, {"id": 2, "question": "Q2", "options": ["A"], "next": 1}]
+    with patch.dict(SURVEYS, {"legacy_loop": {"id": "legacy_loop", "questions": looping}}):
+        with client.websocket_connect("/ws/1/legacy_loop") as websocket:
+            assert "technical difficulties" in websocket.receive_text()
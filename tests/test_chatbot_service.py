@@ -0,0 +1,130 @@
+import asyncio
+import os
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from app.db import AsyncMockRPCDatabase, mock_db
+from app.services.chatbot_service import ChatbotService, create_conversation_state_cache, store_survey_responses
+from app.storage.response_store import ResponseStore
+from app.storage.session_store import InMemorySessionStore, SQLiteSessionStore
+from app.utils.async_cache import AsyncTTLCache
+from app.utils.survey_cache import survey_cache
+from app.utils.surveys import SURVEYS
+from app.utils.turn_engine import ConversationSession
+
+
+def test_bootstrap_session_runs_lookups_concurrently():
+    """Time-to-first-question is bounded by the slowest lookup, not their sum."""
+    survey_cache.clear()
+    with patch("app.services.chatbot_service.db", AsyncMockRPCDatabase(latency=(0.2, 0.2), failure_rate=0)), \
+            patch("app.services.chatbot_service.customer_cache", AsyncTTLCache()):
+        bootstrap = asyncio.run(ChatbotService.bootstrap_session("2", "cake_preferences"))
+
+    assert bootstrap.customer_info["name"] == "Jane Smith"
+    assert bootstrap.state.current_question == 1
+    assert set(bootstrap.timings) == {"customer_info", "survey", "conversation_state", "total"}
+    assert bootstrap.timings["total"] < sum(
+        bootstrap.timings[phase] for phase in ("customer_info", "survey", "conversation_state")
+    )
+
+
+def test_bootstrap_session_fails_fast_on_unknown_customer():
+    """A 404 from one lookup cancels the others and is re-raised."""
+    with patch("app.services.chatbot_service.db", AsyncMockRPCDatabase(latency=(0.05, 0.05), failure_rate=0)):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(ChatbotService.bootstrap_session("unknown", "cake_preferences"))
+
+    assert exc_info.value.status_code == 404
+
+
+def test_new_conversation_is_stored_on_first_answer_and_written_through():
+    """A new conversation costs no initial save, and a saved state is re-read from the cache."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0, sessions=InMemorySessionStore())
+    conversation_id = "conv_3_cake_preferences"
+
+    async def run():
+        state = await ChatbotService.get_or_initialize_conversation_state("3", "cake_preferences")
+        assert db.sessions.get(conversation_id) is None
+        session = ConversationSession.from_state(state)
+        session.record_answer(1, "Red Velvet")
+        session.current_question = 2
+        await ChatbotService.save_conversation_state(conversation_id, session)
+        return await ChatbotService.get_or_initialize_conversation_state("3", "cake_preferences")
+
+    with patch("app.services.chatbot_service.db", db), \
+            patch("app.services.chatbot_service.conversation_state_cache", AsyncTTLCache()):
+        reloaded = asyncio.run(run())
+
+    assert reloaded.current_question == 2 and reloaded.version == 1
+    assert db.sessions.get(conversation_id)["answers"] == [[1, "Red Velvet"]]
+    assert db.rpc_counts["get_conversation_state"] == 1
+    assert db.rpc_counts["save_conversation_state"] == 0
+
+
+def test_fresh_conversation_state_costs_one_storage_round_trip():
+    """The answered-questions lookup of a conversation without stored state runs alongside the state read."""
+    db = AsyncMockRPCDatabase(latency=(0.2, 0.2), failure_rate=0, sessions=InMemorySessionStore())
+
+    async def run():
+        await ChatbotService.get_compiled_survey("cake_preferences")
+        start = time.perf_counter()
+        state = await ChatbotService.get_or_initialize_conversation_state("4", "cake_preferences")
+        return state, time.perf_counter() - start
+
+    with patch("app.services.chatbot_service.db", db), \
+            patch("app.services.chatbot_service.conversation_state_cache", AsyncTTLCache()):
+        state, elapsed = asyncio.run(run())
+
+    assert state.current_question == 1 and state.version == 0
+    assert db.rpc_counts["get_conversation_state"] == 1 and db.rpc_counts["get_answered_questions"] == 1
+    assert elapsed < 0.35
+
+
+def test_conversation_without_state_resumes_where_recorded_answers_lead():
+    """Answers stored while their state save failed resume on the branch taken, not after the furthest answer."""
+    survey = {
+        "questions": [
+            {"id": 1, "question": "Which pet do you have?", "options": ["Cat", "Dog"], "branches": {"Cat": 3}},
+            {"id": 2, "question": "Which breed is your dog?", "type": "text", "next": "end"},
+            {"id": 3, "question": "What is your cat called?", "type": "text"},
+            {"id": 4, "question": "Anything else?", "type": "text"},
+        ],
+    }
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0, sessions=InMemorySessionStore())
+    responses = ResponseStore([{"customer_id": "1", "survey_id": "pet_preferences", "question_id": 1, "answer": "Dog"}])
+    with patch("app.services.chatbot_service.db", db), patch.dict(SURVEYS, {"pet_preferences": survey}), \
+            patch.dict(mock_db, {"survey_responses": responses}), \
+            patch("app.services.chatbot_service.conversation_state_cache", AsyncTTLCache()):
+        survey_cache.bump_version("pet_preferences")
+        state = asyncio.run(ChatbotService.get_or_initialize_conversation_state("1", "pet_preferences"))
+        assert state.current_question == 2
+        responses.append({"customer_id": "1", "survey_id": "pet_preferences", "question_id": 2, "answer": "Poodle"})
+        state = asyncio.run(ChatbotService.get_or_initialize_conversation_state("1", "pet_preferences"))
+        assert state.current_question == 5
+
+
+def test_invalid_survey_responses_are_dropped_at_the_storage_boundary():
+    """A batch is validated once before it is stored; invalid responses are dropped instead of blocking the queue."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    batch = [
+        {"customer_id": "1", "question_id": 1, "answer": "Vanilla", "survey_id": "ice_cream_preferences"},
+        {"customer_id": "1", "question_id": "first", "answer": "Chocolate", "survey_id": "ice_cream_preferences"},
+        {"customer_id": "2", "question_id": 1, "answer": "Strawberry", "survey_id": "ice_cream_preferences"},
+    ]
+    with patch("app.services.chatbot_service.db", db), patch.dict(mock_db, {"survey_responses": ResponseStore()}):
+        asyncio.run(store_survey_responses(batch))
+        stored = [response["answer"] for response in mock_db["survey_responses"]]
+
+    assert stored == ["Vanilla", "Strawberry"]
+    assert db.rpc_counts["save_survey_responses"] == 1
+
+
+def test_state_cache_is_disabled_by_default_for_shared_session_stores(tmp_path):
+    """A worker does not cache conversation records another worker may advance."""
+    with patch.dict(os.environ):
+        os.environ.pop("CHATBOT_STATE_CACHE_TTL", None)
+        assert create_conversation_state_cache(InMemorySessionStore()).ttl == 60
+        assert create_conversation_state_cache(SQLiteSessionStore(str(tmp_path / "sessions.db"))).ttl == 0
+        os.environ["CHATBOT_STATE_CACHE_TTL"] = "30"
+        assert create_conversation_state_cache(SQLiteSessionStore(str(tmp_path / "sessions.db"))).ttl == 30
@@ -0,0 +1,122 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+from unittest.mock import patch
+from app.db import (
+    AsyncMockRPCDatabase,
+    MockRPCDatabase,
+    StateConflictError,
+    ThreadPoolSurveyStore,
+)
+from app.models.models import ConversationState
+from app.storage.session_store import InMemorySessionStore, SQLiteSessionStore
+from app.utils.rpc_retrier_wrapper import RPCRetrier
+from app.utils.turn_engine import ConversationSession
+
+
+def test_async_mock_calls_overlap():
+    """Concurrent calls on the async mock share the simulated latency instead of queuing."""
+    db = AsyncMockRPCDatabase(latency=(0.2, 0.2), failure_rate=0)
+
+    async def run():
+        start = time.perf_counter()
+        results = await asyncio.gather(*(db.get_customer_info("1") for _ in range(20)))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    assert all(result["name"] == "John Doe" for result in results)
+    assert elapsed < 1.0
+
+
+def test_thread_pool_store_wraps_sync_backend():
+    """The thread-pool adapter exposes the legacy sync mock through the async interface."""
+    store = ThreadPoolSurveyStore(MockRPCDatabase(), max_workers=10)
+
+    async def run():
+        return await asyncio.gather(*(store.get_survey_info("ice_cream_preferences") for _ in range(5)))
+
+    with patch.object(MockRPCDatabase, "simulate_rpc_call"):
+        results = asyncio.run(run())
+    assert all(result["id"] == "ice_cream_preferences" for result in results)
+
+
+def test_conversation_delta_appends_answers_and_detects_conflicts():
+    """Deltas carry only new answers and are rejected when based on a stale version."""
+    state = ConversationState(customer_id="1", survey_id="ice_cream_preferences", current_question=1)
+    sessions = InMemorySessionStore({"conv_1": state.to_record()})
+
+    session = ConversationSession.from_state(state)
+    session.record_answer(1, "Vanilla")
+    session.current_question = 2
+    delta = session.to_delta()
+    assert delta["answers"] == [[1, "Vanilla"]]
+    session.mark_persisted(sessions.apply_delta("conv_1", delta, session.version))
+    assert session.to_delta()["answers"] == []
+
+    restored = ConversationState.from_record(sessions.get("conv_1"))
+    assert restored.current_question == 2
+    assert restored.responses[0].answer == "Vanilla"
+
+    with pytest.raises(StateConflictError):
+        sessions.apply_delta("conv_1", delta, expected_version=0)
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_first_delta_creates_the_conversation(tmp_path, backend):
+    """A delta at version 0 stores a conversation that was never saved, but only once."""
+    sessions = SQLiteSessionStore(str(tmp_path / "sessions.db")) if backend == "sqlite" else InMemorySessionStore()
+    session = ConversationSession("1", "ice_cream_preferences", current_question=1)
+    session.record_answer(1, "Vanilla")
+    session.current_question = 2
+    assert sessions.apply_delta("conv_1", session.to_delta(), 0) == 1
+
+    record = sessions.get("conv_1")
+    assert record["customer_id"] == "1" and record["current_question"] == 2
+    assert record["answers"] == [[1, "Vanilla"]]
+    with pytest.raises(StateConflictError):
+        sessions.apply_delta("conv_1", session.to_delta(), 0)
+
+
+def test_sqlite_session_store_is_shared_between_workers(tmp_path):
+    """Two workers opening the same SQLite file see one conversation and one lease holder."""
+    path = str(tmp_path / "sessions.db")
+    worker_a, worker_b = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    state = ConversationState(customer_id="1", survey_id="ice_cream_preferences", current_question=1)
+    worker_a.put("conv_1", state.to_record())
+    worker_a.apply_delta("conv_1", {"current_question": 2, "completed": False, "answers": [[1, "Vanilla"]]}, 0)
+
+    record = worker_b.get("conv_1")
+    assert record["current_question"] == 2
+    assert record["answers"] == [[1, "Vanilla"]]
+    with pytest.raises(StateConflictError):
+        worker_b.apply_delta("conv_1", {"current_question": 2, "completed": False, "answers": []}, 0)
+
+    assert worker_a.acquire_lease("conv_1", "session-a", ttl=30)
+    assert not worker_b.acquire_lease("conv_1", "session-b", ttl=30)
+    worker_a.release_lease("conv_1", "session-a")
+    assert worker_b.acquire_lease("conv_1", "session-b", ttl=30)
+    assert not worker_a.renew_lease("conv_1", "session-a", ttl=30)
+
+
+def test_timed_out_sqlite_write_does_not_commit_behind_its_caller(tmp_path):
+    """A write abandoned by its attempt timeout while waiting for the lock is rolled back rather than committed later."""
+    path = str(tmp_path / "sessions.db")
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0, sessions=SQLiteSessionStore(path, busy_timeout=5.0))
+    retrier = RPCRetrier(max_retries=2, retry_delay=0.05, max_delay=0.05, call_timeout=0.2)
+    delta = {"customer_id": "1", "survey_id": "ice_cream_preferences", "current_question": 2, "completed": False,
+             "answers": [[1, "Vanilla"]]}
+
+    async def run():
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute("BEGIN IMMEDIATE")
+        asyncio.get_running_loop().call_later(0.6, holder.execute, "COMMIT")
+        with pytest.raises(ConnectionError):
+            await retrier.call(db.save_conversation_delta, "conv_1", delta, 0)
+        await asyncio.sleep(0.5)  # The lock is released and the abandoned attempts finish
+        holder.close()
+        assert db.sessions.get("conv_1") is None
+        return await retrier.call(db.save_conversation_delta, "conv_1", delta, 0)
+
+    assert asyncio.run(run()) == 1
+    assert db.sessions.get("conv_1")["answers"] == [[1, "Vanilla"]]
@@ -0,0 +1,35 @@
+import time
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.db import AsyncMockRPCDatabase, mock_db
+from app.main import app
+from app.utils.readiness import readiness
+from app.utils.survey_cache import survey_cache
+
+
+def test_not_ready_until_warmed_up():
+    """Test that readiness fails while the worker warms up, while liveness succeeds."""
+    readiness.mark_not_ready("warming_up")
+    client = TestClient(app)
+    assert client.get("/health/live").json() == {"status": "alive"}
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+
+def test_lifespan_warm_up_compiles_surveys_and_reports_ready():
+    """Test that startup compiles the survey catalog and counts the stored responses before the worker reports ready."""
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0)
+    survey_cache.clear()
+    with patch("app.services.chatbot_service.db", db), patch("app.services.admin_service.db", db), \
+            TestClient(app) as client:
+        deadline = time.monotonic() + 5
+        while client.get("/health/ready").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        body = client.get("/health/ready").json()
+        assert body["status"] == "ready"
+        assert body["surveys"] >= 3
+        assert body["responses"] == len(mock_db["survey_responses"])
+        assert survey_cache.get("ice_cream_preferences") is not None
+        assert db.rpc_counts["get_all_surveys"] == 1
+    assert readiness.snapshot()["status"] == "shutting_down"
@@ -0,0 +1,18 @@
+import asyncio
+from benchmarks.load_test import parse_args, run_benchmark
+
+
+def test_benchmark_smoke_run():
+    """Test that a small benchmark run completes every session and reports RPC counts."""
+    args = parse_args(["--sessions", "5", "--concurrency", "5", "--admin-clients", "1",
+                       "--latency", "0", "0.001", "--failure-rate", "0", "--seed", "7"])
+    try:
+        report = asyncio.run(run_benchmark(args))
+    finally:
+        from app.db import store
+        store.configure(latency=(0.1, 0.5), failure_rate=0.1)
+
+    assert report["completed_sessions"] == 5
+    assert report["failed_sessions"] == 0
+    assert report["time_to_first_question"]["count"] == 5
+    assert report["rpc_counts"]["get_customer_info"] >= 1
@@ -0,0 +1,67 @@
+import asyncio
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.metrics import MetricsRegistry, registry
+from app.utils.rpc_retrier_wrapper import RPCRetrier
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Histogram buckets are cumulative and labelled."""
+    metrics = MetricsRegistry()
+    histogram = metrics.histogram("op_seconds", "Operation latency.", ("operation",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, operation="read")
+    histogram.observe(0.5, operation="read")
+    histogram.observe(5.0, operation="read")
+
+    text = metrics.render()
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{operation="read",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{operation="read",le="1.0"} 2' in text
+    assert 'op_seconds_bucket{operation="read",le="+Inf"} 3' in text
+    assert 'op_seconds_count{operation="read"} 3' in text
+
+
+def test_disabled_registry_records_nothing():
+    """Updates are no-ops while the registry is disabled."""
+    metrics = MetricsRegistry(enabled=False)
+    counter = metrics.counter("events_total", "Events.")
+    histogram = metrics.histogram("latency_seconds", "Latency.")
+    counter.inc()
+    histogram.observe(0.1)
+    assert counter.value() == 0
+    assert histogram.count() == 0
+
+
+def test_retrier_records_attempts_and_outcome():
+    """Storage calls are timed with their outcome and number of attempts."""
+    attempts = 0
+
+    async def flaky_operation():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 2:
+            raise ConnectionError("RPC call failed")
+        return "ok"
+
+    seconds = registry.get("survey_storage_call_seconds")
+    tries = registry.get("survey_storage_call_attempts")
+    before = seconds.count(operation="flaky_operation", outcome="success")
+    assert asyncio.run(RPCRetrier(max_retries=3, retry_delay=0).call(flaky_operation)) == "ok"
+    assert seconds.count(operation="flaky_operation", outcome="success") == before + 1
+    assert 'survey_storage_call_attempts_bucket{operation="flaky_operation",le="2"}' in registry.render()
+    assert tries.count(operation="flaky_operation") >= 1
+
+
+def test_metrics_endpoint():
+    """The endpoint serves the text exposition format and 404s when disabled."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE chatbot_turn_seconds histogram" in response.text
+    assert "# TYPE chatbot_active_sessions gauge" in response.text
+
+    with patch.object(registry, "enabled", False):
+        assert client.get("/metrics").status_code == 404
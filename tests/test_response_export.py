@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+import json
+import os
+import pytest
+from unittest.mock import patch
+from app.db import AsyncMockRPCDatabase
+from app.storage.engine import InMemoryStorageEngine, SQLiteStorageEngine
+from app.storage.response_store import ResponseStore
+from app.storage.session_store import create_session_store
+from app.utils.response_export import ResponseExporter, create_response_exporter
+
+# 2026-03-01T12:00:00Z
+EXPORT_TIME = 1772366400.0
+
+
+def make_responses(count, survey_ids=("ice_cream_preferences", "cake_preferences")):
+    return [
+        {"customer_id": str(i), "survey_id": survey_ids[i % len(survey_ids)], "question_id": 1, "answer": f"A{i}"}
+        for i in range(count)
+    ]
+
+
+def read_json_export(directory):
+    """Read every exported JSON file back as rows keyed by survey partition."""
+    rows = {}
+    for path in sorted(directory.glob("survey_id=*/date=*/*.columns.json.gz")):
+        with gzip.open(path, "rt") as f:
+            columns = json.load(f)["columns"]
+        partition = path.parent.parent.name.split("=", 1)[1]
+        rows.setdefault(partition, []).extend(zip(*(columns[name] for name in ("seq", "customer_id", "answer"))))
+    return rows
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_export_is_incremental_and_partitioned(tmp_path, backend):
+    """Each run writes only the responses committed since the checkpoint, split per survey and date."""
+    if backend == "sqlite":
+        engine = SQLiteStorageEngine(str(tmp_path / "survey.db"))
+    else:
+        engine = InMemoryStorageEngine({"customers": {}, "survey_responses": ResponseStore()}, {}, create_session_store({}))
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0, engine=engine)
+    export_dir = tmp_path / "export"
+    exporter = ResponseExporter(
+        str(export_dir), engine.store_id, db.scan_survey_responses, export_format="json", batch_size=3,
+        clock=lambda: EXPORT_TIME,
+    )
+
+    async def run():
+        await db.save_survey_responses(make_responses(5))
+        first = await exporter.export_once()
+        second = await exporter.export_once()
+        await db.save_survey_responses(make_responses(2, ("beer_preferences",)))
+        third = await exporter.export_once()
+        return first, second, third
+
+    assert asyncio.run(run()) == (5, 0, 2)
+    rows = read_json_export(export_dir)
+    assert sorted(rows) == ["beer_preferences", "cake_preferences", "ice_cream_preferences"]
+    assert [answer for _, _, answer in rows["ice_cream_preferences"]] == ["A0", "A2", "A4"]
+    assert [answer for _, _, answer in rows["cake_preferences"]] == ["A1", "A3"]
+    assert len(rows["beer_preferences"]) == 2
+    assert all(path.name == "date=2026-03-01" for path in export_dir.glob("survey_id=*/date=*"))
+    assert exporter.read_checkpoint() == (8 if backend == "sqlite" else 7)
+
+
+def test_checkpoint_of_another_store_is_never_reused(tmp_path):
+    """A directory exported from one store is not resumed from another store's cursors."""
+    export_dir = str(tmp_path / "export")
+    sqlite_path = str(tmp_path / "survey.db")
+
+    async def export(engine):
+        db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0, engine=engine)
+        await db.save_survey_responses(make_responses(2))
+        return await ResponseExporter(export_dir, engine.store_id, db.scan_survey_responses, export_format="json").export_once()
+
+    assert asyncio.run(export(SQLiteStorageEngine(sqlite_path))) == 2
+    # The same database file is the same store, even from a new worker
+    assert SQLiteStorageEngine(sqlite_path).store_id == SQLiteStorageEngine(sqlite_path).store_id
+    other = InMemoryStorageEngine({"customers": {}, "survey_responses": ResponseStore()}, {}, create_session_store({}))
+    with pytest.raises(ValueError):
+        asyncio.run(export(other))
+
+
+def test_export_is_disabled_without_durable_storage(tmp_path):
+    """Process-memory responses are not exported: their sequence numbers restart and differ per worker."""
+    with patch.dict(os.environ, {"RESPONSE_EXPORT_DIR": str(tmp_path / "export")}):
+        assert create_response_exporter(lambda cursor, limit: None, None) is None
+        assert create_response_exporter(lambda cursor, limit: None, "store") is not None
+
+
+def test_parquet_export_reads_back_as_hive_dataset(tmp_path):
+    """With pyarrow installed, the export is a Parquet dataset partitioned by survey and date."""
+    pyarrow = pytest.importorskip("pyarrow")
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0, engine=SQLiteStorageEngine(str(tmp_path / "survey.db")))
+    exporter = ResponseExporter(
+        str(tmp_path / "export"), db.engine.store_id, db.scan_survey_responses, export_format="parquet"
+    )
+
+    async def run():
+        await db.save_survey_responses(make_responses(4))
+        return await exporter.export_once()
+
+    assert asyncio.run(run()) == 4
+    import pyarrow.dataset
+    table = pyarrow.dataset.dataset(str(tmp_path / "export"), format="parquet", partitioning="hive").to_table()
+    assert table.num_rows == 4
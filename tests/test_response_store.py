@@ -0,0 +1,32 @@
+from app.storage.response_store import ResponseStore
+
+
+def make_store():
+    store = ResponseStore()
+    for customer_id in ("1", "2", "3"):
+        for survey_id in ("ice_cream_preferences", "cake_preferences"):
+            for question_id in (1, 2):
+                store.append(
+                    {"customer_id": customer_id, "survey_id": survey_id, "question_id": question_id, "answer": "Yes"}
+                )
+    return store
+
+
+def test_query_uses_indexes_and_paginates():
+    """Filtered pages come from the secondary indexes and resume from the cursor."""
+    store = make_store()
+
+    page, cursor = store.query({"survey_id": "cake_preferences", "question_id": 2}, None, 2)
+    assert [row["customer_id"] for row in page] == ["1", "2"]
+    assert all(row["survey_id"] == "cake_preferences" and row["question_id"] == 2 for row in page)
+
+    page, cursor = store.query({"survey_id": "cake_preferences", "question_id": 2}, cursor, 2)
+    assert [row["customer_id"] for row in page] == ["3"]
+    assert cursor is None
+
+
+def test_answered_questions_per_customer_and_survey():
+    """Completion checks are answered from the (survey, customer) index."""
+    store = make_store()
+    assert store.answered_questions("ice_cream_preferences", "2") == [(1, "Yes"), (2, "Yes")]
+    assert store.answered_questions("beer_preferences", "2") == []
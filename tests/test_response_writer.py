@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from app.utils.response_writer import ResponseBatchWriter, ResponseQueueFullError
+
+
+def test_responses_are_flushed_in_batches():
+    """Responses are written in size-triggered batches and drained on close."""
+    batches = []
+
+    async def flush(batch):
+        batches.append(list(batch))
+
+    writer = ResponseBatchWriter(flush, batch_size=3, flush_interval=10)
+
+    async def run():
+        for i in range(7):
+            await writer.submit({"question_id": i})
+            await asyncio.sleep(0)
+        await writer.close()
+
+    asyncio.run(run())
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert writer.stats["flushed"] == 7
+
+
+def test_failed_flush_requeues_batch():
+    """A failed flush keeps the batch queued, and a full queue pushes back on producers."""
+    async def flush(batch):
+        raise ConnectionError("RPC call failed")
+
+    writer = ResponseBatchWriter(flush, batch_size=100, flush_interval=10, max_pending=2, flush_on_shutdown=False)
+
+    async def run():
+        await writer.submit({"question_id": 1})
+        await writer.submit({"question_id": 2})
+        with pytest.raises(ResponseQueueFullError):
+            await writer.submit({"question_id": 3})
+        await writer.close()
+
+    asyncio.run(run())
+    assert writer.pending == 2
+    assert writer.stats["failed_flushes"] == 1
+
+
+def test_close_waits_for_a_flush_in_progress():
+    """Closing while the periodic flush is writing neither cancels nor loses that batch."""
+    stored, started = [], []
+
+    async def flush(batch):
+        started.append(len(batch))
+        await asyncio.sleep(0.05)
+        stored.extend(batch)
+
+    writer = ResponseBatchWriter(flush, batch_size=100, flush_interval=0.01)
+
+    async def run():
+        await writer.submit({"question_id": 1})
+        await writer.submit({"question_id": 2})
+        while not started:
+            await asyncio.sleep(0.005)
+        await writer.close()
+
+    asyncio.run(run())
+    assert [response["question_id"] for response in stored] == [1, 2]
+    assert writer.pending == 0
+
+
+def test_cancelled_flush_requeues_batch():
+    """A flush cancelled mid-write (e.g. a session torn down at shutdown) keeps its batch queued."""
+    async def flush(batch):
+        await asyncio.sleep(10)
+
+    writer = ResponseBatchWriter(flush, batch_size=100, flush_interval=10, flush_on_shutdown=False)
+
+    async def run():
+        await writer.submit({"question_id": 1})
+        task = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await writer.close()
+
+    asyncio.run(run())
+    assert writer.pending == 1
+    assert writer.stats["failed_flushes"] == 0
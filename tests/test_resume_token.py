@@ -0,0 +1,31 @@
+from app.utils.resume_token import ResumeTokenSigner
+
+
+def test_token_round_trip():
+    """A token issued by a signer is accepted with its claims."""
+    signer = ResumeTokenSigner(b"secret")
+    claims = signer.verify(signer.issue("conv_1_cake_preferences", "abc123", 2, 5))
+    assert claims.conversation_id == "conv_1_cake_preferences"
+    assert claims.survey_fingerprint == "abc123"
+    assert (claims.current_question, claims.version) == (2, 5)
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    """Tokens with a modified payload, a different key or a broken format are refused."""
+    signer = ResumeTokenSigner(b"secret")
+    token = signer.issue("conv_1_cake_preferences", "abc123", 2, 5)
+    payload, signature = token.split(".")
+    forged_payload = ResumeTokenSigner(b"other").issue("conv_1_cake_preferences", "abc123", 3, 5).split(".")[0]
+
+    assert signer.verify(f"{forged_payload}.{signature}") is None
+    assert ResumeTokenSigner(b"other").verify(token) is None
+    assert signer.verify("not-a-token") is None
+
+
+def test_expired_tokens_are_rejected():
+    """Tokens older than the TTL are refused."""
+    now = [1000.0]
+    signer = ResumeTokenSigner(b"secret", ttl=60, clock=lambda: now[0])
+    token = signer.issue("conv_1_cake_preferences", "abc123", 1, 0)
+    now[0] += 61
+    assert signer.verify(token) is None
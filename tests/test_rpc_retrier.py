@@ -0,0 +1,98 @@
+import asyncio
+import time
+import pytest
+from app.utils.rpc_retrier_wrapper import CircuitOpenError, DeadlineExceededError, RPCRetrier
+
+
+def test_retries_until_success_with_backoff():
+    """Transient failures are retried with a bounded, jittered backoff."""
+    retrier = RPCRetrier(max_retries=3, retry_delay=0.01, max_delay=0.02)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("RPC call failed")
+        return "ok"
+
+    assert asyncio.run(retrier.call(flaky)) == "ok"
+    assert len(attempts) == 3
+    assert all(0 <= retrier.backoff(attempt) <= 0.02 for attempt in range(5))
+
+
+def test_circuit_opens_after_repeated_failures():
+    """Once the failure threshold is hit, calls fail fast without reaching the backend."""
+    retrier = RPCRetrier(max_retries=1, failure_threshold=2, reset_timeout=60)
+    attempts = []
+
+    async def down():
+        attempts.append(1)
+        raise ConnectionError("RPC call failed")
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await retrier.call(down)
+        with pytest.raises(CircuitOpenError):
+            await retrier.call(down)
+
+    asyncio.run(run())
+    assert len(attempts) == 2
+    assert retrier.breaker("down").state == "open"
+
+
+def test_half_open_circuit_lets_a_single_trial_call_through():
+    """After the reset timeout, one trial call probes the backend while concurrent calls fail fast."""
+    retrier = RPCRetrier(max_retries=1, failure_threshold=1, reset_timeout=0.05)
+    attempts = []
+
+    async def lookup():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("RPC call failed")
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await retrier.call(lookup)
+        await asyncio.sleep(0.06)
+        results = await asyncio.gather(*(retrier.call(lookup) for _ in range(5)), return_exceptions=True)
+        return results
+
+    results = asyncio.run(run())
+    assert results[0] == "ok"
+    assert all(isinstance(result, CircuitOpenError) for result in results[1:])
+    assert len(attempts) == 2
+    assert retrier.breaker("lookup").state == "closed"
+
+
+def test_request_deadline_bounds_slow_calls():
+    """A slow call is abandoned once the request deadline passes."""
+    retrier = RPCRetrier(max_retries=3, retry_delay=0.01)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def run():
+        with retrier.deadline(0.1):
+            await retrier.call(slow)
+
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(run())
+    assert time.perf_counter() - start < 0.5
+
+
+def test_hedged_call_returns_fastest_response():
+    """A hedged read sends a second request when the first one is slow."""
+    retrier = RPCRetrier(hedge_operations={"get_survey_info"}, hedge_delay=0.05)
+    delays = [1.0, 0.01]
+
+    async def get_survey_info():
+        await asyncio.sleep(delays.pop(0))
+        return {"id": "ice_cream_preferences"}
+
+    start = time.perf_counter()
+    assert asyncio.run(retrier.call(get_survey_info)) == {"id": "ice_cream_preferences"}
+    assert time.perf_counter() - start < 0.5
@@ -0,0 +1,74 @@
+import asyncio
+from app.db import AsyncMockRPCDatabase
+from app.storage.engine import SQLiteStorageEngine
+from app.utils.surveys import SURVEYS
+
+CUSTOMERS = {"1": {"name": "John Doe", "email": "john.doe@example.com"}}
+
+
+def make_responses():
+    return [
+        {"customer_id": customer_id, "survey_id": survey_id, "question_id": question_id, "answer": "Yes"}
+        for customer_id in ("1", "2", "3")
+        for survey_id in ("ice_cream_preferences", "cake_preferences")
+        for question_id in (1, 2)
+    ]
+
+
+def test_sqlite_engine_persists_across_restarts(tmp_path):
+    """Surveys, customers and responses survive reopening the database; seeding happens once."""
+    path = str(tmp_path / "survey.db")
+    engine = SQLiteStorageEngine(path, seed_surveys=SURVEYS, seed_customers=CUSTOMERS)
+    engine.append_responses(make_responses())
+    engine.delete_survey("beer_preferences")
+    engine.put_survey("tea", {"id": "tea", "title": "Tea", "questions": []})
+
+    reopened = SQLiteStorageEngine(path, seed_surveys=SURVEYS, seed_customers=CUSTOMERS)
+    assert reopened.get_customer("1")["name"] == "John Doe"
+    assert reopened.get_survey("beer_preferences") is None
+    assert reopened.get_survey("tea")["title"] == "Tea"
+    assert reopened.get_survey_questions("ice_cream_preferences")[0].options == ["Vanilla", "Chocolate", "Strawberry"]
+    assert len(list(reopened.iter_responses())) == 12
+
+
+def test_sqlite_engine_queries_paginate(tmp_path):
+    """Filtered pages are served in insertion order and resume from the cursor."""
+    engine = SQLiteStorageEngine(str(tmp_path / "survey.db"))
+    engine.append_responses(make_responses())
+
+    page, cursor = engine.query_responses({"survey_id": "cake_preferences", "question_id": 2}, None, 2)
+    assert [row["customer_id"] for row in page] == ["1", "2"]
+    page, cursor = engine.query_responses({"survey_id": "cake_preferences", "question_id": 2}, cursor, 2)
+    assert [row["customer_id"] for row in page] == ["3"]
+    assert cursor is None
+    assert [question_id for question_id, _ in engine.answered_questions("ice_cream_preferences", "2")] == [1, 2]
+
+
+def test_async_mock_over_sqlite_engine(tmp_path):
+    """The async mock serves the RPC method set from a blocking engine."""
+    engine = SQLiteStorageEngine(str(tmp_path / "survey.db"), seed_surveys=SURVEYS, seed_customers=CUSTOMERS)
+    db = AsyncMockRPCDatabase(latency=(0, 0), failure_rate=0, engine=engine)
+
+    async def run():
+        await db.save_survey_responses(make_responses()[:2])
+        return (
+            await db.get_customer_info("1"),
+            await db.get_survey_info("cake_preferences"),
+            await db.get_all_survey_responses(),
+        )
+
+    customer, survey, responses = asyncio.run(run())
+    assert customer["email"] == "john.doe@example.com"
+    assert survey["title"] == "Cake Preferences Survey"
+    assert len(responses) == 2
+    assert db.sessions is engine.sessions
+
+
+def test_sqlite_engine_multi_get_and_batch_put(tmp_path):
+    """Several surveys are looked up in one query and written in one transaction."""
+    engine = SQLiteStorageEngine(str(tmp_path / "survey.db"), seed_surveys=SURVEYS)
+    engine.put_surveys({f"survey_{i}": {"id": f"survey_{i}", "questions": []} for i in range(1200)})
+
+    found = engine.get_surveys(["cake_preferences", "survey_0", "survey_1199", "missing"])
+    assert sorted(found) == ["cake_preferences", "survey_0", "survey_1199"]
+    assert len(engine.get_surveys([f"survey_{i}" for i in range(1200)])) == 1200
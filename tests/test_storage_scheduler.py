@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from app.utils.rpc_retrier_wrapper import DeadlineExceededError, RPCRetrier
+from app.utils.storage_scheduler import BULK, INTERACTIVE, PriorityClass, SchedulerTimeoutError, StorageScheduler
+
+
+def make_scheduler(capacity: int, bulk_limit: int) -> StorageScheduler:
+    return StorageScheduler(
+        capacity=capacity,
+        classes={
+            INTERACTIVE: PriorityClass(limit=capacity, weight=3),
+            BULK: PriorityClass(limit=bulk_limit, weight=1),
+        },
+    )
+
+
+def test_class_limit_caps_bulk_calls_but_not_interactive_ones():
+    """Bulk calls beyond their class limit queue while interactive calls still run."""
+    scheduler = make_scheduler(capacity=4, bulk_limit=1)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def call(name):
+            async with scheduler.slot(name):
+                await release.wait()
+
+        tasks = [asyncio.create_task(call(BULK)) for _ in range(3)]
+        tasks.append(asyncio.create_task(call(INTERACTIVE)))
+        await asyncio.sleep(0.01)
+        stats = scheduler.stats
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats == {INTERACTIVE: {"active": 1, "queued": 0}, BULK: {"active": 1, "queued": 2}}
+    assert scheduler.active == 0
+
+
+def test_contended_slots_are_shared_by_weight():
+    """With one slot and both classes backlogged, grants follow the 3:1 weights."""
+    scheduler = make_scheduler(capacity=1, bulk_limit=1)
+    order = []
+
+    async def call(name):
+        async with scheduler.slot(name):
+            order.append(name[0])
+            await asyncio.sleep(0)
+
+    async def run():
+        async with scheduler.slot(INTERACTIVE):
+            # Queue everything while the only slot is held
+            tasks = [asyncio.create_task(call(name)) for name in [BULK] * 4 + [INTERACTIVE] * 8]
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    # Bulk goes first (interactive just used the slot), then one bulk call per three interactive ones
+    assert "".join(order) == "biiibiiibiib"
+
+
+def test_acquire_times_out_and_leaves_the_queue():
+    """A caller that gives up waiting does not keep a place in the queue."""
+    scheduler = make_scheduler(capacity=1, bulk_limit=1)
+
+    async def run():
+        async with scheduler.slot(INTERACTIVE):
+            with pytest.raises(SchedulerTimeoutError):
+                await scheduler.acquire(BULK, timeout=0.01)
+            assert scheduler.queue_depth(BULK) == 0
+        return scheduler.active
+
+    assert asyncio.run(run()) == 0
+
+
+def test_retrier_schedules_calls_in_the_callers_class():
+    """The retrier holds a slot of the context's class per attempt and turns a queue timeout into a deadline error."""
+    scheduler = make_scheduler(capacity=4, bulk_limit=1)
+    retrier = RPCRetrier(max_retries=1, scheduler=scheduler)
+    seen = []
+
+    async def lookup():
+        seen.append(dict(scheduler.stats))
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def run():
+        with StorageScheduler.priority(BULK):
+            first = asyncio.create_task(retrier.call(lookup))
+            await asyncio.sleep(0.01)
+            with retrier.deadline(0.02), pytest.raises(DeadlineExceededError):
+                await retrier.call(lookup)
+        assert await retrier.call(lookup) == "ok"
+        return await first
+
+    assert asyncio.run(run()) == "ok"
+    assert seen[0][BULK]["active"] == 1
+    assert seen[1][INTERACTIVE]["active"] == 1 and seen[1][BULK]["active"] == 1
+    assert retrier.breaker("lookup").state == "closed"
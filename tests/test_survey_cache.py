@@ -0,0 +1,37 @@
+from app.utils.survey_cache import SurveyCache
+from app.utils.surveys import SURVEYS
+
+
+def test_compiled_survey_is_cached_until_version_bump():
+    """A compiled survey is reused until an admin write bumps its version."""
+    cache = SurveyCache()
+    compiled = cache.put("ice_cream_preferences", SURVEYS["ice_cream_preferences"], cache.version("ice_cream_preferences"))
+
+    assert cache.get("ice_cream_preferences") is compiled
+    assert compiled.questions[0].prompt.startswith("BOT: Which flavor of ice cream do you prefer?")
+    assert "1 - Vanilla\n2 - Chocolate\n3 - Strawberry" in compiled.questions[0].prompt
+
+    cache.bump_version("ice_cream_preferences")
+    assert cache.get("ice_cream_preferences") is None
+
+
+def test_stale_compilation_is_not_cached():
+    """A definition fetched before a concurrent admin write is never cached."""
+    cache = SurveyCache()
+    version = cache.version("cake_preferences")
+    cache.bump_version("cake_preferences")
+    cache.put("cake_preferences", SURVEYS["cake_preferences"], version)
+
+    assert cache.get("cake_preferences") is None
+
+
+def test_compiled_survey_expires_after_ttl():
+    """A compiled survey is refetched once it is older than the TTL, e.g. after a write through another worker."""
+    now = [0.0]
+    cache = SurveyCache(ttl=30.0, clock=lambda: now[0])
+    cache.put("beer_preferences", SURVEYS["beer_preferences"], cache.version("beer_preferences"))
+
+    now[0] = 30.0
+    assert cache.get("beer_preferences") is not None
+    now[0] = 30.5
+    assert cache.get("beer_preferences") is None
@@ -0,0 +1,77 @@
+import pytest
+from app.models.models import SurveyQuestion
+from app.utils.survey_cache import compile_survey
+from app.utils.survey_flow import FEEDBACK_PROMPT_MESSAGE, compile_flow
+from app.utils.surveys import SURVEYS
+
+
+def test_default_flow_keeps_the_legacy_feedback_rule():
+    """Surveys without flow rules run in order, and "Yes" on the last question asks for feedback."""
+    flow = compile_survey("ice_cream_preferences", SURVEYS["ice_cream_preferences"], 0).flow
+    assert flow.step(1, " 2 ").answer == "Chocolate"
+    assert flow.step(1, "2").next_state == 2
+    assert flow.step(1, "4") is None
+    assert flow.step(1, "chocolate") is None
+
+    feedback = flow.step(2, "1")
+    assert feedback.follow_up == FEEDBACK_PROMPT_MESSAGE and feedback.next_state == 3
+    assert flow.step(2, "2").answer == "No" and flow.step(2, "2").follow_up is None
+
+
+def test_branches_skips_and_free_text_compile_into_the_table():
+    """Branches and `next` pick the following question; text questions accept any reply."""
+    flow = compile_flow([
+        SurveyQuestion(id=1, question="Own a pet?", options=["Yes", "No"], branches={"No": "end"}),
+        SurveyQuestion(id=2, question="Which pet?", options=["Cat", "Dog"], branches={"Cat": 4}),
+        SurveyQuestion(id=3, question="Dog breed?", type="text", next="end"),
+        SurveyQuestion(id=4, question="Cat name?", type="text"),
+    ])
+    assert flow.step(1, "1").next_state == 2
+    assert flow.step(1, "2").next_state == 5
+    assert flow.step(2, "1").next_state == 4
+    assert flow.step(2, "2").next_state == 3
+    dog = flow.step(3, "Corgi")
+    assert dog.answer is None and dog.next_state == 5
+    assert flow.step(4, "Tom").next_state == 5
+    # Branching on the last question disables the implicit feedback prompt
+    assert flow.step(1, "1").follow_up is None
+
+
+def test_replay_follows_branches_through_recorded_answers():
+    """Recorded answers resume at the question their branches lead to, not after the furthest answer."""
+    survey = compile_survey("pets", {"questions": [
+        {"id": 1, "question": "Own a pet?", "options": ["Yes", "No"], "branches": {"No": "end"}},
+        {"id": 2, "question": "Which pet?", "options": ["Cat", "Dog"], "branches": {"Cat": 4}},
+        {"id": 3, "question": "Dog breed?", "type": "text", "next": "end"},
+        {"id": 4, "question": "Cat name?", "type": "text"},
+        {"id": 5, "question": "Anything else?", "type": "text"},
+    ]}, 0)
+    replay = lambda answers: survey.flow.replay(survey.questions, answers)
+    assert replay({}) == 1
+    assert replay({1: "Yes", 2: "Cat"}) == 4
+    assert replay({1: "Yes", 2: "Dog", 3: "Poodle"}) == 6
+    assert replay({1: "No"}) == 6
+    assert replay({1: "Yes", 2: "Cat", 5: "Nothing"}) == 4
+    assert replay({1: "Maybe"}) == 1
+
+    legacy = compile_survey("ice_cream_preferences", SURVEYS["ice_cream_preferences"], 0)
+    assert legacy.flow.replay(legacy.questions, {1: "Vanilla", 2: "Creamy"}) == 3
+
+
+@pytest.mark.parametrize("rule", [{"next": 1}, {"next": 9}, {"branches": {"B": 1}}])
+def test_flow_rules_must_move_forward_to_existing_questions(rule):
+    """Loops and unknown targets are rejected when the survey is compiled."""
+    with pytest.raises(ValueError):
+        compile_flow([
+            SurveyQuestion(id=1, question="Q1", options=["A", "B"]),
+            SurveyQuestion(id=2, question="Q2", options=["A", "B"], **rule),
+        ])
+
+
+def test_question_definitions_are_validated():
+    """Choice questions need options, and branches must name one of them."""
+    with pytest.raises(ValueError):
+        SurveyQuestion(id=1, question="Q1")
+    with pytest.raises(ValueError):
+        SurveyQuestion(id=1, question="Q1", options=["A"], branches={"Z": "end"})
+    assert SurveyQuestion(id=1, question="Q1", type="text").options == []
@@ -0,0 +1,30 @@
+from app.models.models import ConversationState, SurveyResponse
+from app.utils.turn_engine import ConversationSession
+
+
+def test_session_deltas_carry_only_new_answers():
+    """A session taken over from a loaded state sends only the answers recorded since."""
+    state = ConversationState(
+        customer_id="1",
+        survey_id="cake_preferences",
+        current_question=2,
+        version=3,
+        responses=[SurveyResponse(customer_id="1", question_id=1, answer="Tiramisu Cake")],
+    )
+    session = ConversationSession.from_state(state)
+    assert session.saved
+
+    record = session.record_answer(2, "Yes")
+    assert record == {"customer_id": "1", "question_id": 2, "answer": "Yes", "survey_id": "cake_preferences"}
+    session.current_question = 3
+    assert not session.saved
+    assert session.to_delta() == {
+        "customer_id": "1",
+        "survey_id": "cake_preferences",
+        "current_question": 3,
+        "completed": False,
+        "answers": [[2, "Yes"]],
+    }
+    session.mark_persisted(4)
+    assert session.saved and session.version == 4
+    assert session.to_delta()["answers"] == []